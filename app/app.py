@@ -1,4 +1,5 @@
 import sys
+import time
 from pathlib import Path
 
 import numpy as np
@@ -10,13 +11,260 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from src import config, data_prep, equilibrium
+from src import config, data_prep, market_map, scenario
+
+# Sessions share one market frame and take shallow copies of it; with
+# copy-on-write (always on from pandas 3) those are zero-copy views whose
+# writes never reach the shared frame
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def snapshot() -> str:
+    """Fingerprint of the current processed artifact (one stat per rerun)."""
+    return data_prep.processed_key()
+
+
+@st.cache_resource(max_entries=2)
+def load_market(fingerprint: str) -> pd.DataFrame:
+    """The processed table in its compact layout, one instance per snapshot.
+
+    A ``cache_resource`` is neither pickled nor copied per session: every
+    session of every user gets this same object, and a new fingerprint
+    loads the new snapshot (the previous one is evicted once unused).
+    """
+    return data_prep.load_processed(compact=True)
 
 
-@st.cache_data
 def load_data() -> pd.DataFrame:
-    """Load processed data (cached)."""
-    return data_prep.load_processed()
+    """Zero-copy view of the shared market frame for the current snapshot."""
+    return load_market(snapshot()).copy(deep=False)
+
+
+@st.cache_data(max_entries=1024)
+def load_display_fields(fingerprint: str, pos: int) -> pd.Series:
+    """Display-only columns of one asset, read from disk on demand."""
+    return data_prep.lookup_index(pos, columns=config.DISPLAY_ONLY_COLS)
+
+
+def json_row(row: pd.Series) -> dict:
+    """Row as JSON-serializable values (numpy scalars become floats)."""
+    return {
+        k: float(v) if isinstance(v, (int, float, np.number)) else v
+        for k, v in row.items()
+    }
+
+
+@st.cache_resource(max_entries=2)
+def load_asset_index(fingerprint: str) -> data_prep.AssetIndex:
+    """Symbol/id -> row offsets of the processed table (cached per snapshot)."""
+    return data_prep.load_asset_index()
+
+
+def select_asset(df: pd.DataFrame, label: str, key: str) -> int:
+    """Symbol picker returning a row offset; asks which asset on duplicates."""
+    symbols = sorted(df[config.COL_SYMBOL].unique().tolist())
+    symbol = st.selectbox(label, symbols, index=0, key=key)
+    offsets = load_asset_index(snapshot()).by_symbol(symbol)
+    if len(offsets) > 1:
+        offsets = [
+            st.selectbox(
+                f"{symbol} matches {len(offsets)} assets",
+                offsets,
+                format_func=lambda pos: (
+                    f"{df[config.COL_NAME].iloc[pos]} ({df[config.COL_ID].iloc[pos]})"
+                ),
+                key=f"{key}_offset",
+            )
+        ]
+    return offsets[0]
+
+
+@st.cache_resource(max_entries=2)
+def load_scenario_engine(fingerprint: str) -> scenario.ScenarioEngine:
+    """Scenario engine over the shared market (pre-sorted ranks, per snapshot)."""
+    return scenario.ScenarioEngine(load_market(fingerprint))
+
+
+@st.cache_resource(max_entries=2)
+def load_map_tiles(fingerprint: str) -> market_map.MapTiles:
+    """Market Map density tiles built at prepare time (cached per snapshot)."""
+    return data_prep.load_map_tiles()
+
+
+def density_chart(x_range, y_range) -> dict:
+    """Vega-Lite heatmap of ``MapTiles.cells`` clipped to the window."""
+    return {
+        "mark": {"type": "rect", "clip": True},
+        "encoding": {
+            "x": {
+                "field": "x0",
+                "type": "quantitative",
+                "title": config.COL_EQ_SHIFT,
+                "scale": {"domain": list(x_range)},
+            },
+            "x2": {"field": "x1"},
+            "y": {
+                "field": "y0",
+                "type": "quantitative",
+                "title": config.COL_TENSION_SCORE,
+                "scale": {"domain": list(y_range)},
+            },
+            "y2": {"field": "y1"},
+            "color": {
+                "field": "count",
+                "type": "quantitative",
+                "title": "assets",
+                "scale": {"type": "log"},
+            },
+            "tooltip": [{"field": "count", "type": "quantitative"}],
+        },
+    }
+
+
+@st.cache_resource
+def scenario_cache() -> scenario.ScenarioCache:
+    """Scenario results shared by every session (bounded LRU)."""
+    return scenario.ScenarioCache()
+
+
+def run_scenario(pos: int, vol_mult: float, vol24_mult: float, util_shift: float):
+    """Scenario row for the asset at ``pos``, memoized per snapshot."""
+    fingerprint = snapshot()
+    key = scenario.ScenarioCache.key(fingerprint, pos, vol_mult, vol24_mult, util_shift)
+    engine = load_scenario_engine(fingerprint)
+    return scenario_cache().get_or_compute(
+        key, lambda: engine.run_at(pos, vol_mult, vol24_mult, util_shift)
+    )
+
+
+def scenario_sliders(key: str = "scenario"):
+    """The three what-if sliders: volume, 24h volatility, utilization shift.
+
+    ``key`` prefixes the widget keys, so several tabs can have their own.
+    The utilization shift is in the units of the utilization column
+    (fraction or percent, see ``scenario.utilization_max``).
+    """
+    util_max = load_scenario_engine(snapshot()).util_max
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        vol_mult = st.slider(
+            "Volume multiplier",
+            min_value=0.1,
+            max_value=5.0,
+            value=1.0,
+            step=0.1,
+            help="Scale the total_volume for scenario.",
+            key=f"{key}_vol_mult",
+        )
+    with col2:
+        vol24_mult = st.slider(
+            "24h volatility multiplier",
+            min_value=0.1,
+            max_value=5.0,
+            value=1.0,
+            step=0.1,
+            help="Scale the 24h and 7d percent change magnitude.",
+            key=f"{key}_vol24_mult",
+        )
+    with col3:
+        util_shift = st.slider(
+            "Supply utilization shift (absolute)",
+            min_value=-0.5 * util_max,
+            max_value=0.5 * util_max,
+            value=0.0,
+            step=0.05 * util_max,
+            help=(
+                "Adjust supply utilization (scarcity) up/down, in "
+                + ("percentage points." if util_max > 1.0 else "fraction of supply.")
+            ),
+            key=f"{key}_util_shift",
+        )
+    return vol_mult, vol24_mult, util_shift
+
+
+def show_scenario(sim: pd.Series, force_cols: list, force_labels: list) -> None:
+    """Scenario metrics, force decomposition and raw row."""
+    st.markdown("### Scenario Results")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Current Price", f"{sim[config.COL_CURRENT_PRICE]:.6f}")
+    with col2:
+        st.metric("Equilibrium Center", f"{sim[config.COL_EQ_CENTER]:.6f}")
+        st.metric(
+            "Equilibrium Shift",
+            f"{sim[config.COL_EQ_SHIFT] * 100:+.2f}%",
+        )
+    with col3:
+        st.metric(
+            "Equilibrium Band",
+            f"[{sim[config.COL_EQ_LOWER]:.6f}, {sim[config.COL_EQ_UPPER]:.6f}]",
+        )
+        st.metric("Tension Score", f"{sim[config.COL_TENSION_SCORE]:.3f}")
+
+    st.markdown("### Scenario Force Decomposition")
+    scenario_force_values = [sim.get(c, np.nan) for c in force_cols]
+    scenario_force_df = pd.DataFrame(
+        {"force": force_labels, "value": scenario_force_values}
+    ).set_index("force")
+    st.bar_chart(scenario_force_df)
+
+    with st.expander("Scenario raw row"):
+        st.json(json_row(sim))
+
+
+def show_ripple(pos: int, vol_mult: float, vol24_mult: float, util_shift: float):
+    """Other assets whose forces move because this one was shocked."""
+    ripple = load_scenario_engine(snapshot()).ripple(
+        pos, vol_mult, vol24_mult, util_shift
+    )
+    others = ripple.drop(index=pos, errors="ignore")
+    with st.expander(f"Market ripple: {len(others)} other assets change rank"):
+        if others.empty:
+            return
+        shocked = scenario.SHOCKED_SUFFIX
+        change = (
+            others[config.COL_TENSION_SCORE + shocked] - others[config.COL_TENSION_SCORE]
+        )
+        top = change.abs().sort_values(ascending=False).index[:20]
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Symbol": others.loc[top, config.COL_SYMBOL].to_numpy(),
+                    "Tension": others.loc[top, config.COL_TENSION_SCORE].to_numpy(),
+                    "Scenario Tension": others.loc[
+                        top, config.COL_TENSION_SCORE + shocked
+                    ].to_numpy(),
+                    "Change": change[top].to_numpy(),
+                }
+            ).set_index("Symbol")
+        )
+
+
+# Reruns only the decorated function when its own widgets change (Streamlit
+# >= 1.37; older versions rerun the whole script)
+fragment = getattr(st, "fragment", None) or getattr(
+    st, "experimental_fragment", lambda fn: fn
+)
+
+
+@fragment
+def live_scenario(pos: int, force_cols: list, force_labels: list) -> None:
+    """Scenario results that follow the sliders.
+
+    Each slider change reruns only this fragment and is answered by the
+    pre-sorted ``ScenarioEngine`` (through the shared result cache), a few
+    milliseconds. Streamlit runs a session's script on one thread and a
+    widget change during a run stops it and reruns with the latest values,
+    so there is never more than one evaluation in flight per session.
+    """
+    vol_mult, vol24_mult, util_shift = scenario_sliders()
+    start = time.perf_counter()
+    sim = run_scenario(pos, vol_mult, vol24_mult, util_shift)
+    st.caption(f"Evaluated in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    show_scenario(sim, force_cols, force_labels)
+    show_ripple(pos, vol_mult, vol24_mult, util_shift)
 
 
 def main() -> None:
@@ -38,21 +286,20 @@ def main() -> None:
     ]
     force_labels = ["Demand", "Supply", "Volatility", "Liquidity", "Speculation"]
 
-    tab_single, tab_scenarios, tab_market = st.tabs(
-        ["Single Coin", "Scenario Simulator", "Market Map"]
+    tab_single, tab_scenarios, tab_compare, tab_market = st.tabs(
+        ["Single Coin", "Scenario Simulator", "Compare Assets", "Market Map"]
     )
 
     # ---------------------- Single Coin ----------------------
     with tab_single:
         st.subheader("Single Coin Equilibrium View")
 
-        symbols = sorted(df[config.COL_SYMBOL].unique().tolist())
-        if not symbols:
+        if df.empty:
             st.error("No symbols found in processed data.")
             return
 
-        symbol = st.selectbox("Symbol", symbols, index=0)
-        row = df[df[config.COL_SYMBOL] == symbol].iloc[0]
+        pos = select_asset(df, "Symbol", key="single_symbol")
+        row = df.iloc[pos]
 
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -88,123 +335,134 @@ def main() -> None:
         st.bar_chart(force_df)
 
         with st.expander("Raw row (debug / inspection)"):
-            st.json(
-                {
-                    k: (
-                        float(row[k])
-                        if isinstance(row[k], (int, float, np.floating))
-                        else row[k]
-                    )
-                    for k in row.index
-                }
-            )
+            st.json(json_row(pd.concat([row, load_display_fields(snapshot(), pos)])))
 
     # ---------------------- Scenario Simulator ----------------------
     with tab_scenarios:
         st.subheader("Scenario Simulator (What-If Analysis)")
 
-        symbols = sorted(df[config.COL_SYMBOL].unique().tolist())
-        symbol = st.selectbox(
-            "Symbol for Scenario", symbols, index=0, key="scenario_symbol"
-        )
-        base_row = df[df[config.COL_SYMBOL] == symbol].iloc[0]
+        pos = select_asset(df, "Symbol for Scenario", key="scenario_symbol")
 
         st.markdown("Adjust hypothetical changes to see how equilibrium responds.")
 
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            vol_mult = st.slider(
-                "Volume multiplier",
-                min_value=0.1,
-                max_value=5.0,
-                value=1.0,
-                step=0.1,
-                help="Scale the total_volume for scenario.",
-            )
-        with col2:
-            vol24_mult = st.slider(
-                "24h volatility multiplier",
-                min_value=0.1,
-                max_value=5.0,
-                value=1.0,
-                step=0.1,
-                help="Scale the 24h and 7d percent change magnitude.",
+        live = st.checkbox(
+            "Live update",
+            value=False,
+            help="Recompute as the sliders move instead of on Run Scenario.",
+        )
+        if live:
+            live_scenario(pos, force_cols, force_labels)
+        else:
+            vol_mult, vol24_mult, util_shift = scenario_sliders()
+            if st.button("Run Scenario"):
+                # Only this asset moves; the rest of the market keeps its ranks
+                sim = run_scenario(pos, vol_mult, vol24_mult, util_shift)
+                show_scenario(sim, force_cols, force_labels)
+                show_ripple(pos, vol_mult, vol24_mult, util_shift)
+
+        with st.expander("Scenario cache diagnostics"):
+            stats = scenario_cache().stats()
+            lookups = stats["hits"] + stats["misses"]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Hits", stats["hits"])
+            col2.metric("Misses", stats["misses"])
+            col3.metric(
+                "Hit rate", f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
             )
-        with col3:
-            util_shift = st.slider(
-                "Supply utilization shift (absolute)",
-                min_value=-0.5,
-                max_value=0.5,
-                value=0.0,
-                step=0.05,
-                help="Adjust supply utilization (scarcity) up/down.",
+            st.caption(
+                f"{stats['entries']} of {stats['maxsize']} cached results, shared "
+                "by all sessions; keyed on snapshot fingerprint, asset and "
+                "slider values."
             )
 
-        if st.button("Run Scenario"):
-            # Start from the base row
-            sim_row = base_row.copy()
+    # ---------------------- Compare Assets ----------------------
+    with tab_compare:
+        st.subheader("Compare Assets Under One Scenario")
 
-            # Apply scenario transformations
-            sim_row[config.COL_TOTAL_VOLUME] = max(
-                0.0, base_row[config.COL_TOTAL_VOLUME] * vol_mult
-            )
-            sim_row[config.COL_PCT_CHANGE_24H] = (
-                base_row[config.COL_PCT_CHANGE_24H] * vol24_mult
-            )
-            sim_row[config.COL_PCT_CHANGE_7D] = (
-                base_row[config.COL_PCT_CHANGE_7D] * vol24_mult
+        symbols = sorted(df[config.COL_SYMBOL].unique().tolist())
+        ranked = df.sort_values(config.COL_MARKET_CAP_RANK)[config.COL_SYMBOL]
+        picked = st.multiselect(
+            f"Symbols (up to {config.COMPARE_MAX_ASSETS})",
+            symbols,
+            default=list(dict.fromkeys(ranked.head(5).tolist())),
+            max_selections=config.COMPARE_MAX_ASSETS,
+            key="compare_symbols",
+        )
+        vol_mult, vol24_mult, util_shift = scenario_sliders(key="compare")
+
+        if picked:
+            asset_index = load_asset_index(snapshot())
+            matches = {symbol: asset_index.by_symbol(symbol) for symbol in picked}
+            shared = [symbol for symbol, offsets in matches.items() if len(offsets) > 1]
+            if shared:
+                st.caption(
+                    f"{', '.join(shared)} match several assets; the first of "
+                    "each is compared."
+                )
+            # One batched rerank for every picked asset, each shocked alone
+            compared = load_scenario_engine(snapshot()).compare(
+                [offsets[0] for offsets in matches.values()],
+                vol_mult,
+                vol24_mult,
+                util_shift,
             )
+            shocked = scenario.SHOCKED_SUFFIX
 
-            # Adjust supply utilization in [0, 1]
-            current_util = float(base_row.get(config.COL_SUPPLY_UTILIZATION, 0.0))
-            new_util = float(np.clip(current_util + util_shift, 0.0, 1.0))
-            sim_row[config.COL_SUPPLY_UTILIZATION] = new_util
-
-            # Use full market for ranking-based forces
-            df_all = df.copy()
-            mask = df_all[config.COL_SYMBOL] == symbol
-            df_all.loc[mask, sim_row.index] = sim_row.values
-
-            df_all = equilibrium.compute_engineered_features(df_all)
-            df_all = equilibrium.compute_equilibrium(df_all)
-            sim = df_all[mask].iloc[0]
-
-            st.markdown("### Scenario Results")
-
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Current Price", f"{sim[config.COL_CURRENT_PRICE]:.6f}")
-            with col2:
-                st.metric("Equilibrium Center", f"{sim[config.COL_EQ_CENTER]:.6f}")
-                st.metric(
-                    "Equilibrium Shift",
-                    f"{sim[config.COL_EQ_SHIFT] * 100:+.2f}%",
-                )
-            with col3:
-                st.metric(
-                    "Equilibrium Band",
-                    f"[{sim[config.COL_EQ_LOWER]:.6f}, {sim[config.COL_EQ_UPPER]:.6f}]",
-                )
-                st.metric("Tension Score", f"{sim[config.COL_TENSION_SCORE]:.3f}")
-
-            st.markdown("### Scenario Force Decomposition")
-            scenario_force_values = [sim.get(c, np.nan) for c in force_cols]
-            scenario_force_df = pd.DataFrame(
-                {"force": force_labels, "value": scenario_force_values}
-            ).set_index("force")
-            st.bar_chart(scenario_force_df)
-
-            with st.expander("Scenario raw row"):
-                st.json(
-                    {
-                        k: (
-                            float(sim[k])
-                            if isinstance(sim[k], (int, float, np.floating))
-                            else sim[k]
+            summary = pd.DataFrame(
+                {
+                    "Symbol": compared[config.COL_SYMBOL].to_numpy(),
+                    "Price": compared[config.COL_CURRENT_PRICE],
+                    "Center": compared[config.COL_EQ_CENTER],
+                    "Scenario Center": compared[config.COL_EQ_CENTER + shocked],
+                    "Center Change %": (
+                        compared[config.COL_EQ_CENTER + shocked]
+                        / compared[config.COL_EQ_CENTER]
+                        - 1.0
+                    )
+                    * 100,
+                    "Band": [
+                        f"[{lo:.6f}, {hi:.6f}]"
+                        for lo, hi in zip(
+                            compared[config.COL_EQ_LOWER], compared[config.COL_EQ_UPPER]
                         )
-                        for k in sim.index
-                    }
+                    ],
+                    "Scenario Band": [
+                        f"[{lo:.6f}, {hi:.6f}]"
+                        for lo, hi in zip(
+                            compared[config.COL_EQ_LOWER + shocked],
+                            compared[config.COL_EQ_UPPER + shocked],
+                        )
+                    ],
+                    "Tension": compared[config.COL_TENSION_SCORE],
+                    "Scenario Tension": compared[config.COL_TENSION_SCORE + shocked],
+                }
+            ).set_index("Symbol")
+            st.dataframe(summary)
+
+            st.markdown("### Force Decomposition")
+            view = st.radio(
+                "Forces",
+                ["Scenario", "Base", "Change"],
+                horizontal=True,
+                key="compare_forces",
+            )
+            base_forces = compared[force_cols].to_numpy()
+            shocked_forces = compared[[c + shocked for c in force_cols]].to_numpy()
+            values = {
+                "Scenario": shocked_forces,
+                "Base": base_forces,
+                "Change": shocked_forces - base_forces,
+            }[view]
+            st.bar_chart(
+                pd.DataFrame(
+                    values,
+                    index=compared[config.COL_SYMBOL].to_numpy(),
+                    columns=force_labels,
                 )
+            )
+
+            with st.expander("Comparison raw table"):
+                st.dataframe(compared)
 
     # ---------------------- Market Map ----------------------
     with tab_market:
@@ -220,22 +478,70 @@ def main() -> None:
             )
         )
 
-        plot_df = df.copy()
-        plot_df = plot_df[
-            [
-                config.COL_SYMBOL,
-                config.COL_EQ_SHIFT,
-                config.COL_TENSION_SCORE,
-                config.COL_VOLATILITY_7D,
-                config.COL_MARKET_CAP_RANK,
-            ]
-        ].dropna()
-
-        st.scatter_chart(
-            plot_df,
-            x=config.COL_EQ_SHIFT,
-            y=config.COL_TENSION_SCORE,
+        # Zoom: only the window's assets are ever sent as points; a crowded
+        # window is drawn from the pre-binned tiles at a level that resolves it
+        tiles = load_map_tiles(snapshot())
+        col1, col2 = st.columns(2)
+        with col1:
+            x_range = st.slider(
+                "Equilibrium shift range",
+                min_value=tiles.x_range[0],
+                max_value=tiles.x_range[1],
+                value=tiles.x_range,
+                step=(tiles.x_range[1] - tiles.x_range[0]) / 1000,
+                key="map_x_range",
+            )
+        with col2:
+            y_range = st.slider(
+                "Tension score range",
+                min_value=tiles.y_range[0],
+                max_value=tiles.y_range[1],
+                value=tiles.y_range,
+                step=(tiles.y_range[1] - tiles.y_range[0]) / 1000,
+                key="map_y_range",
+            )
+
+        shift = df[config.COL_EQ_SHIFT].to_numpy()
+        tension = df[config.COL_TENSION_SCORE].to_numpy()
+        in_view = (
+            (shift >= x_range[0])
+            & (shift <= x_range[1])
+            & (tension >= y_range[0])
+            & (tension <= y_range[1])
         )
+        n_view = int(in_view.sum())
+        map_cols = [
+            config.COL_SYMBOL,
+            config.COL_EQ_SHIFT,
+            config.COL_TENSION_SCORE,
+            config.COL_VOLATILITY_7D,
+            config.COL_MARKET_CAP_RANK,
+        ]
+
+        if n_view <= config.MAP_MAX_POINTS:
+            plot_df = df.loc[in_view, map_cols].dropna()
+            st.caption(f"{n_view:,} assets in view, drawn individually.")
+            st.scatter_chart(
+                plot_df,
+                x=config.COL_EQ_SHIFT,
+                y=config.COL_TENSION_SCORE,
+            )
+        else:
+            level = tiles.level_for(x_range, y_range)
+            cells = tiles.cells(x_range, y_range, level)
+            st.caption(
+                f"{n_view:,} assets in view, drawn as {len(cells):,} density "
+                f"cells ({tiles.bins(level)} bins per axis). Narrow the ranges "
+                f"to {config.MAP_MAX_POINTS:,} assets or fewer to see them "
+                "individually."
+            )
+            st.vega_lite_chart(
+                cells, density_chart(x_range, y_range), use_container_width=True
+            )
+            # Only the sampled rows are materialized, not the whole window
+            plot_df = df.iloc[
+                np.flatnonzero(in_view)[:50], df.columns.get_indexer(map_cols)
+            ].dropna()
 
         with st.expander("Sample of market data used in the map"):
             st.dataframe(plot_df.head(50))
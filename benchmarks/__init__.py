@@ -0,0 +1,4 @@
+"""Ad-hoc performance benchmarks. Run from the project root, e.g.
+
+    python -m benchmarks.bench_memory --rows 1000000
+"""
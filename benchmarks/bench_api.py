@@ -0,0 +1,182 @@
+"""Load generator for the HTTP API (``python -m src.cli serve-http``).
+
+Opens ``--connections`` keep-alive connections and sends requests as fast as
+each one is answered for ``--seconds``, drawing from a mix of single-asset
+lookups, batch POSTs, top-k and scenario queries over random symbols of the
+current processed dataset. Reports p50/p99 latency and requests per second
+per endpoint and overall. With ``--revalidate`` GETs carry the snapshot ETag
+and measure the ``304 Not Modified`` path instead.
+
+Starts its own server on a free port unless ``--url`` points at one.
+
+    python -m benchmarks.bench_api --connections 16 --seconds 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from src import config, store
+
+ENDPOINTS = ["equilibrium", "batch", "top-k", "scenario"]
+
+
+def _request(
+    kind: str, rng: random.Random, symbols: List[str]
+) -> Tuple[str, str, bytes]:
+    symbol = quote(rng.choice(symbols), safe="")
+    if kind == "equilibrium":
+        return "GET", f"/equilibrium/{symbol}", b""
+    if kind == "batch":
+        body = json.dumps({"symbols": rng.sample(symbols, 20)}).encode()
+        return "POST", "/equilibrium", body
+    if kind == "top-k":
+        return "GET", f"/top-k?k={rng.choice([10, 50])}", b""
+    vol_mult = round(rng.uniform(0.5, 2.0), 2)
+    return "GET", f"/scenario/{symbol}?vol_mult={vol_mult}&util_shift=0.05", b""
+
+
+async def _send(reader, writer, host, method, path, body, etag):
+    head = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+    if body:
+        head += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+    if etag and method == "GET":
+        head.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("etag")
+
+
+async def _worker(
+    host: str,
+    port: int,
+    deadline: float,
+    rng: random.Random,
+    symbols: List[str],
+    revalidate: bool,
+    latencies: Dict[str, List[float]],
+    errors: List[int],
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    etag: Optional[str] = None
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choice(ENDPOINTS)
+            method, path, body = _request(kind, rng, symbols)
+            start = time.perf_counter()
+            status, tag = await _send(
+                reader, writer, host, method, path, body, etag if revalidate else None
+            )
+            latencies[kind].append(time.perf_counter() - start)
+            etag = tag or etag
+            if status not in (200, 304):
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def _run(args, host: str, port: int, symbols: List[str]):
+    latencies: Dict[str, List[float]] = {kind: [] for kind in ENDPOINTS}
+    errors: List[int] = []
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    await asyncio.gather(
+        *[
+            _worker(
+                host,
+                port,
+                deadline,
+                random.Random(args.seed + i),
+                symbols,
+                args.revalidate,
+                latencies,
+                errors,
+            )
+            for i in range(args.connections)
+        ]
+    )
+    return latencies, errors, time.perf_counter() - start
+
+
+def _row(label: str, timings: List[float], elapsed: float) -> str:
+    ms = sorted(t * 1e3 for t in timings)
+    p99 = ms[int(0.99 * (len(ms) - 1))]
+    return (
+        f"{label:<12} {len(ms):>9,} {len(ms) / elapsed:>10,.0f} "
+        f"{statistics.median(ms):>8.2f} {p99:>8.2f}"
+    )
+
+
+def _start_server() -> Tuple[subprocess.Popen, str, int]:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.cli", "serve-http", "--port", "0"],
+        cwd=config.BASE_DIR,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stdout.readline()
+    if not line:
+        raise RuntimeError("The API server exited before it started listening.")
+    address = urlsplit(line.split()[-1])
+    return proc, address.hostname, address.port
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url", default=None, help="Running server, e.g. http://127.0.0.1:8000"
+    )
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--revalidate", action="store_true")
+    args = parser.parse_args()
+
+    entry = store.current_entry()
+    if entry is None:
+        sys.exit("No processed cache entry; run `python -m src.cli prepare-data`.")
+    symbols = sorted(store.AssetIndex.load(entry / store.INDEX_FILE).symbols)
+
+    server = None
+    if args.url is None:
+        server, host, port = _start_server()
+    else:
+        address = urlsplit(args.url)
+        host, port = address.hostname, address.port
+    try:
+        latencies, errors, elapsed = asyncio.run(_run(args, host, port, symbols))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(
+        f"{args.connections} connections, {elapsed:.1f} s"
+        + (", revalidating" if args.revalidate else "")
+    )
+    print(f"{'endpoint':<12} {'requests':>9} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for kind in ENDPOINTS:
+        print(_row(kind, latencies[kind], elapsed))
+    print(_row("all", [t for kind in ENDPOINTS for t in latencies[kind]], elapsed))
+    if errors:
+        print(f"{len(errors)} error responses (status {sorted(set(errors))})")
+
+
+if __name__ == "__main__":
+    main()
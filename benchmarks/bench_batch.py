@@ -0,0 +1,62 @@
+"""Many assets per ``show-equilibrium`` call vs one call per asset.
+
+Times ``--symbols-file`` with N symbols of the current processed dataset (run
+``prepare-data`` first) against N separate invocations, with the daemon
+bypassed (``--no-daemon``), plus ``--all`` for the whole market.
+
+    python -m benchmarks.bench_batch --symbols 100
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from src import config, store
+
+
+def _run(args: List[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.cli", "--no-daemon", "show-equilibrium", *args],
+        cwd=config.BASE_DIR,
+        check=True,
+        capture_output=True,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    entry = store.current_entry()
+    if entry is None:
+        sys.exit("No processed cache entry; run `python -m src.cli prepare-data`.")
+    asset_index = store.AssetIndex.load(entry / store.INDEX_FILE)
+    symbols = random.Random(args.seed).sample(sorted(asset_index.symbols), args.symbols)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "symbols.txt"
+        path.write_text("\n".join(symbols) + "\n", encoding="utf-8")
+        batch = _run(["--symbols-file", str(path), "--format", "csv"])
+    separate = sum(_run(["--symbol", symbol]) for symbol in symbols)
+    everything = _run(["--all", "--format", "csv"])
+
+    for label, seconds in [
+        (f"{args.symbols} separate calls", separate),
+        ("one --symbols-file call", batch),
+        (f"--all ({asset_index.n_rows} assets)", everything),
+    ]:
+        print(f"{label:<26} {seconds * 1e3:>9.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
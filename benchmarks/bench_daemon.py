@@ -0,0 +1,130 @@
+"""Lookup latency through the resident query daemon vs reading the store.
+
+Starts ``python -m src.cli serve`` on a temporary socket and times
+``show-equilibrium`` lookups for random symbols of the current processed
+dataset (run ``prepare-data`` first):
+
+- daemon: one request over the Unix socket (``daemon.request``)
+- store: the daemon-less warm path (index sidecar + one row-group read)
+- CLI: whole ``python -m src.cli show-equilibrium`` processes, with and
+  without the daemon, which adds interpreter startup to both
+
+Exits with status 1 when the daemon's median exceeds ``--budget-ms``.
+
+    python -m benchmarks.bench_daemon --queries 500 --budget-ms 5
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from src import config, daemon, store
+
+
+def _timings_ms(fn: Callable[[str], object], symbols: List[str]) -> List[float]:
+    timings = []
+    for symbol in symbols:
+        start = time.perf_counter()
+        fn(symbol)
+        timings.append((time.perf_counter() - start) * 1e3)
+    return timings
+
+
+def _report(label: str, timings: List[float]) -> float:
+    median = statistics.median(timings)
+    p99 = sorted(timings)[int(0.99 * (len(timings) - 1))]
+    print(f"{label:<14} {median:>9.2f} {p99:>9.2f}")
+    return median
+
+
+def _wait_for(socket_path: Path, proc: subprocess.Popen) -> None:
+    while daemon.request({"op": "ping"}, socket_path) is None:
+        if proc.poll() is not None:
+            raise RuntimeError("The daemon exited before it started listening.")
+        time.sleep(0.05)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--cli-runs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    entry = store.current_entry()
+    if entry is None:
+        sys.exit("No processed cache entry; run `python -m src.cli prepare-data`.")
+    asset_index = store.AssetIndex.load(entry / store.INDEX_FILE)
+    rng = random.Random(args.seed)
+    symbols = rng.choices(sorted(asset_index.symbols), k=args.queries)
+
+    def local(symbol: str) -> dict:
+        current = store.current_entry()
+        index = store.AssetIndex.load(current / store.INDEX_FILE)
+        offsets = store.select(index, symbols=[symbol]).offsets
+        return store.read_row(current, offsets[0], columns=config.SHOW_COLS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = Path(tmp) / "daemon.sock"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.cli"]
+            + ["--daemon-socket", str(socket_path), "serve"],
+            cwd=config.BASE_DIR,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            _wait_for(socket_path, server)
+
+            def remote(symbol: str) -> dict:
+                return daemon.request(
+                    {"op": "show", "symbols": [symbol], "columns": config.SHOW_COLS},
+                    socket_path,
+                )
+
+            def run_cli(extra: List[str]) -> Callable[[str], object]:
+                def run(symbol: str) -> object:
+                    return subprocess.run(
+                        [sys.executable, "-m", "src.cli", *extra, "show-equilibrium"]
+                        + ["--symbol", symbol],
+                        cwd=config.BASE_DIR,
+                        check=True,
+                        capture_output=True,
+                    )
+
+                return run
+
+            print(f"{'path':<14} {'median ms':>9} {'p99 ms':>9}")
+            median = _report("daemon", _timings_ms(remote, symbols))
+            _report("store", _timings_ms(local, symbols))
+            cli_symbols = symbols[: args.cli_runs]
+            _report(
+                "CLI + daemon",
+                _timings_ms(
+                    run_cli(["--daemon-socket", str(socket_path)]), cli_symbols
+                ),
+            )
+            _report(
+                "CLI, no daemon", _timings_ms(run_cli(["--no-daemon"]), cli_symbols)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    if median > args.budget_ms:
+        print(
+            f"FAIL: daemon lookup took {median:.2f} ms > {args.budget_ms:.1f} ms",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Streaming export throughput and peak memory per output format.
+
+Writes a synthetic processed store, then runs ``export.export`` for each
+format in a fresh interpreter and reports rows/s, output size and the peak
+RSS added by the export (which should not grow with the store).
+
+    python -m benchmarks.bench_export --rows 2000000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .procstat import rss_kb
+from .synthetic import make_universe
+
+TARGETS = [
+    "out.parquet",
+    "out.feather",
+    "out.csv",
+    "out.csv.gz",
+    "out.csv.zst",
+    "out.ndjson",
+    "out.ndjson.zst",
+]
+
+
+def run_child(entry: Path, out: Path) -> None:
+    from src import export
+
+    baseline = rss_kb("VmRSS")
+    start = time.perf_counter()
+    rows = export.export(out, entry=entry)
+    elapsed = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "rows": rows,
+                "seconds": elapsed,
+                "peak_mb": (rss_kb("VmHWM") - baseline) / 1024,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--targets", nargs="+", default=TARGETS)
+    parser.add_argument("--child-entry", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_entry:
+        run_child(args.child_entry, args.child_out)
+        return
+
+    from src import data_prep
+
+    with tempfile.TemporaryDirectory() as tmp:
+        entry = Path(tmp) / "entry"
+        entry.mkdir()
+        df = data_prep.clean_and_engineer(
+            make_universe(args.rows, args.seed), columnar=True
+        )
+        data_prep.write_processed(df, entry)
+        del df
+        store_mb = data_prep.processed_path(entry).stat().st_size / 2**20
+        print(f"store: {args.rows:,} rows, {store_mb:,.0f} MB", flush=True)
+
+        print(f"{'target':<16} {'rows/s':>12} {'MB':>8} {'peak MB':>9}")
+        for target in args.targets:
+            out = Path(tmp) / target
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_export",
+                    "--child-entry",
+                    str(entry),
+                    "--child-out",
+                    str(out),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(
+                f"{target:<16} {r['rows'] / r['seconds']:>12,.0f} "
+                f"{out.stat().st_size / 2**20:>8.0f} {r['peak_mb']:>9.0f}",
+                flush=True,
+            )
+            out.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Raw CSV ingestion: untyped read + coercion vs typed / projected reads.
+
+Builds a large file by concatenating the shipped snapshot's rows until it
+reaches ``--size-gb`` (5 GB by default), then times each ingestion mode in a
+fresh interpreter and reports wall time, throughput and peak RSS.
+
+    python -m benchmarks.bench_ingest --size-gb 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src import config
+
+from .procstat import rss_kb
+
+MODES = ["untyped", "typed", "projected"]
+
+
+def build_file(path: Path, size_bytes: int) -> int:
+    """Write header + repeated snapshot rows until ``size_bytes``; return rows."""
+    with open(config.DATA_RAW, "rb") as fh:
+        header = fh.readline()
+        body = fh.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    rows_per_copy = body.count(b"\n")
+    copies = max(1, size_bytes // len(body))
+    with open(path, "wb") as out:
+        out.write(header)
+        for _ in range(copies):
+            out.write(body)
+    return copies * rows_per_copy
+
+
+def run_child(mode: str, path: Path) -> None:
+    import pandas as pd
+
+    from src import data_prep
+
+    baseline = rss_kb("VmRSS")
+    start = time.perf_counter()
+    if mode == "untyped":
+        df = pd.read_csv(path)
+        for col in data_prep.NUMERIC_COLS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        failures = 0
+    else:
+        columns = config.INGEST_RAW_COLS if mode == "projected" else None
+        df, report = data_prep.load_raw_typed(path, columns=columns)
+        failures = len(report)
+    elapsed = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "rows": len(df),
+                "columns": df.shape[1],
+                "seconds": elapsed,
+                "peak_mb": (rss_kb("VmHWM") - baseline) / 1024,
+                "frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+                "failures": failures,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-gb", type=float, default=5.0)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "concatenated.csv"
+        rows = build_file(path, int(args.size_gb * 2**30))
+        size_mb = path.stat().st_size / 2**20
+        print(f"Built {size_mb:,.0f} MB file with {rows:,} rows.", flush=True)
+
+        print(
+            f"{'mode':<10} {'cols':>5} {'seconds':>8} {'MB/s':>8} "
+            f"{'peak MB':>9} {'frame MB':>9} {'bad':>5}"
+        )
+        for mode in args.modes:
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_ingest",
+                    "--child",
+                    mode,
+                    "--path",
+                    str(path),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:<10} {r['columns']:>5} {r['seconds']:>8.2f} "
+                f"{size_mb / r['seconds']:>8.0f} {r['peak_mb']:>9.0f} "
+                f"{r['frame_mb']:>9.0f} {r['failures']:>5}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Single-asset lookup latency as the processed store grows.
+
+Compares the pushed-down reads behind ``show-equilibrium``
+(``data_prep.lookup_symbol`` / ``lookup_index``) with reading the whole
+processed parquet file and masking it, for several store sizes.
+
+    python -m benchmarks.bench_lookup --rows 10000 100000 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src import config, data_prep
+
+from .synthetic import make_universe
+
+
+def _median_ms(fn, args_list) -> float:
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1e3
+
+
+def _full_scan(entry: Path, symbol: str) -> pd.Series:
+    df = data_prep.read_processed(entry, fmt="parquet")
+    mask = df[config.COL_SYMBOL].str.upper() == symbol.upper()
+    return df[mask].iloc[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--full-runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rows':>10} {'symbol':>10} {'index':>10} {'full scan':>10}  (median ms)")
+    for n_rows in args.rows:
+        df = data_prep.clean_and_engineer(
+            make_universe(n_rows, args.seed), columnar=True
+        )
+        symbols = df[config.COL_SYMBOL].to_numpy()
+        with tempfile.TemporaryDirectory() as tmp:
+            entry = Path(tmp)
+            data_prep.write_processed(df, entry, fmt="parquet")
+            picks = rng.integers(0, len(df), args.queries)
+
+            by_symbol = _median_ms(
+                lambda s: data_prep.lookup_symbol(s, config.SHOW_COLS, entry=entry),
+                [(symbols[i].lower(),) for i in picks],
+            )
+            by_index = _median_ms(
+                lambda i: data_prep.lookup_index(
+                    i, config.SHOW_COLS, entry=entry, fmt="parquet"
+                ),
+                [(int(i),) for i in picks],
+            )
+            full = _median_ms(
+                lambda s: _full_scan(entry, s),
+                [(symbols[i],) for i in picks[: args.full_runs]],
+            )
+        print(f"{n_rows:>10,} {by_symbol:>10.2f} {by_index:>10.2f} {full:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Market Map payload and latency: density tiles vs sending every point.
+
+Builds ``market_map.MapTiles`` for a synthetic universe (what
+``prepare-data`` does) and compares, for the full plane and a few zoomed
+windows, what the dashboard would send to the browser: every point in the
+window as JSON, or the cells of the level ``level_for`` picks.
+
+    python -m benchmarks.bench_market_map --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src import config, equilibrium, market_map
+
+from .synthetic import make_universe
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = equilibrium.compute_equilibrium(
+        equilibrium.compute_engineered_features(make_universe(args.rows, args.seed))
+    )
+    x = df[config.COL_EQ_SHIFT].to_numpy()
+    y = df[config.COL_TENSION_SCORE].to_numpy()
+
+    start = time.perf_counter()
+    tiles = market_map.MapTiles.build(x, y)
+    build = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tiles.npz"
+        tiles.save(path)
+        size = path.stat().st_size
+        start = time.perf_counter()
+        market_map.MapTiles.load(path)
+        load = time.perf_counter() - start
+
+    print(f"universe: {len(df):,} assets")
+    print(
+        f"tiles: {tiles.levels} levels ({tiles.bins(0)}..{tiles.bins(tiles.levels - 1)}"
+        f" bins per axis), built in {build * 1e3:.0f} ms, {size / 1e6:.2f} MB, "
+        f"loaded in {load * 1e3:.1f} ms"
+    )
+    print(
+        f"{'window':<8} {'in view':>10} {'points KB':>10} "
+        f"{'level':>5} {'cells':>7} {'cells KB':>9} {'cells ms':>9}"
+    )
+    (x0, x1), (y0, y1) = tiles.x_range, tiles.y_range
+    for zoom in (1, 4, 16, 64):
+        # Windows centred on the densest part of the plane
+        cx, cy = np.median(x), np.median(y)
+        x_range = (cx - (x1 - x0) / (2 * zoom), cx + (x1 - x0) / (2 * zoom))
+        y_range = (cy - (y1 - y0) / (2 * zoom), cy + (y1 - y0) / (2 * zoom))
+        in_view = (x >= x_range[0]) & (x <= x_range[1])
+        in_view &= (y >= y_range[0]) & (y <= y_range[1])
+        points = df.loc[in_view, [config.COL_EQ_SHIFT, config.COL_TENSION_SCORE]]
+        points_bytes = len(points.to_json(orient="records"))
+
+        start = time.perf_counter()
+        level = tiles.level_for(x_range, y_range)
+        cells = tiles.cells(x_range, y_range, level)
+        cells_time = time.perf_counter() - start
+        cells_bytes = len(json.dumps(cells.to_dict(orient="records")))
+        print(
+            f"1/{zoom:<6} {int(in_view.sum()):>10,} {points_bytes / 1e3:>10,.0f} "
+            f"{level:>5} {len(cells):>7,} {cells_bytes / 1e3:>9,.0f} "
+            f"{cells_time * 1e3:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Peak-memory comparison of the copying and columnar prepare paths.
+
+The synthetic universe is written to a temporary parquet file once; each mode
+then runs in a fresh interpreter that loads it, resets the kernel's RSS
+high-water mark and reports how far the prepare step pushed it.
+
+    python -m benchmarks.bench_memory --rows 10000000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .procstat import reset_peak, rss_kb
+
+MODES = ["copy", "columnar"]
+
+
+def run_child(mode: str, path: Path) -> None:
+    import gc
+
+    import pandas as pd
+
+    from src import data_prep
+
+    df = pd.read_parquet(path)
+    gc.collect()
+    baseline = rss_kb("VmRSS")
+    reset = reset_peak()
+
+    start = time.perf_counter()
+    out = data_prep.clean_and_engineer(df, columnar=(mode == "columnar"))
+    elapsed = time.perf_counter() - start
+
+    peak = rss_kb("VmHWM")
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "rows": len(out),
+                "baseline_mb": baseline / 1024,
+                "peak_mb": peak / 1024,
+                "delta_mb": (peak - baseline) / 1024,
+                "seconds": elapsed,
+                "peak_reset": reset,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.path)
+        return
+
+    from .synthetic import make_universe
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "universe.parquet"
+        print(f"Generating {args.rows:,} synthetic rows...", flush=True)
+        make_universe(args.rows, seed=args.seed).to_parquet(path, index=False)
+
+        results = {}
+        for mode in MODES:
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_memory",
+                    "--child",
+                    mode,
+                    "--path",
+                    str(path),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"{'mode':<10} {'input MB':>10} {'peak MB':>10} {'extra MB':>10} {'seconds':>9}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<10} {r['baseline_mb']:>10.1f} {r['peak_mb']:>10.1f} "
+            f"{r['delta_mb']:>10.1f} {r['seconds']:>9.2f}"
+        )
+    if not all(r["peak_reset"] for r in results.values()):
+        print("warning: could not reset VmHWM; peaks include the parquet load.")
+
+    saved = results["copy"]["delta_mb"] - results["columnar"]["delta_mb"]
+    ratio = results["copy"]["delta_mb"] / max(results["columnar"]["delta_mb"], 1e-9)
+    print(f"\ncolumnar mode saves {saved:.1f} MB of working memory ({ratio:.1f}x less).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Single-asset what-if latency: ScenarioEngine vs full-market recompute.
+
+Also times ``ScenarioEngine.ripple`` (every asset whose ranks move with the
+shocked one), one batched 50 x 50 x 20 slider grid (``ScenarioEngine.grid``) and
+the dashboard's live mode: slider steps answered by ``run_at`` through a
+cold ``ScenarioCache``, and the Compare Assets tab:
+50 assets under one set of shocks in one batched ``compare`` call against
+one ``run_at`` per asset.
+
+    python -m benchmarks.bench_scenario --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from src import config, equilibrium, scenario
+
+from .synthetic import make_universe
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--full-runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    df = equilibrium.compute_equilibrium(
+        equilibrium.compute_engineered_features(make_universe(args.rows, args.seed))
+    )
+
+    start = time.perf_counter()
+    engine = scenario.ScenarioEngine(df)
+    build = time.perf_counter() - start
+
+    positions = rng.integers(0, len(df), args.queries)
+    vol_mult = rng.uniform(0.1, 5.0, args.queries)
+    vol24_mult = rng.uniform(0.1, 5.0, args.queries)
+    util_shift = rng.uniform(-0.5, 0.5, args.queries)
+
+    timings = np.empty(args.queries)
+    for i in range(args.queries):
+        start = time.perf_counter()
+        engine.evaluate(positions[i], vol_mult[i], vol24_mult[i], util_shift[i])
+        timings[i] = time.perf_counter() - start
+
+    ripple_timings, ripple_sizes = [], []
+    for i in range(min(args.queries, 200)):
+        start = time.perf_counter()
+        ripple = engine.ripple(positions[i], vol_mult[i], vol24_mult[i], util_shift[i])
+        ripple_timings.append(time.perf_counter() - start)
+        ripple_sizes.append(len(ripple))
+
+    grid_start = time.perf_counter()
+    grid = engine.grid(
+        df[config.COL_SYMBOL].iloc[int(positions[0])],
+        np.linspace(0.1, 5.0, 50),
+        np.linspace(0.1, 5.0, 50),
+        np.linspace(-0.5, 0.5, 20),
+    )
+    grid_time = time.perf_counter() - grid_start
+
+    cache = scenario.ScenarioCache()
+    # One slider dragged across its range for one asset (all cache misses)
+    live_timings = []
+    pos = int(positions[0])
+    for vm in np.round(np.arange(0.1, 5.0, 0.1), 1):
+        start = time.perf_counter()
+        cache.get_or_compute(
+            cache.key("bench", pos, vm, 1.0, 0.0),
+            lambda: engine.run_at(pos, vm, 1.0, 0.0),
+        )
+        live_timings.append(time.perf_counter() - start)
+
+    compare_positions = rng.choice(len(df), config.COMPARE_MAX_ASSETS, replace=False)
+    start = time.perf_counter()
+    engine.compare(compare_positions, 2.0, 1.5, 0.1)
+    compare_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for pos in compare_positions:
+        engine.run_at(int(pos), 2.0, 1.5, 0.1)
+    one_by_one = time.perf_counter() - start
+
+    full = []
+    for i in range(args.full_runs):
+        start = time.perf_counter()
+        df_all = df.copy()
+        pos = positions[i]
+        df_all.iloc[pos, df_all.columns.get_loc(config.COL_TOTAL_VOLUME)] *= vol_mult[i]
+        df_all = equilibrium.compute_engineered_features(df_all)
+        equilibrium.compute_equilibrium(df_all)
+        full.append(time.perf_counter() - start)
+
+    print(f"universe: {len(df):,} assets, engine build {build * 1e3:.1f} ms")
+    print(
+        f"engine.evaluate: p50 {np.percentile(timings, 50) * 1e6:.0f} us, "
+        f"p99 {np.percentile(timings, 99) * 1e6:.0f} us over {args.queries} queries"
+    )
+    print(
+        f"engine.ripple:   p50 {np.percentile(ripple_timings, 50) * 1e3:.2f} ms, "
+        f"p99 {np.percentile(ripple_timings, 99) * 1e3:.2f} ms, "
+        f"median {np.median(ripple_sizes):,.0f} assets moved"
+    )
+    print(
+        f"engine.grid:     {grid.center.size:,} points in {grid_time * 1e3:.1f} ms"
+    )
+    print(
+        f"live update:     p50 {np.percentile(live_timings, 50) * 1e3:.2f} ms, "
+        f"p99 {np.percentile(live_timings, 99) * 1e3:.2f} ms per slider step"
+    )
+    print(
+        f"compare:         {len(compare_positions)} assets in "
+        f"{compare_time * 1e3:.2f} ms batched, {one_by_one * 1e3:.1f} ms one by one"
+    )
+    print(f"full recompute:  median {np.median(full) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
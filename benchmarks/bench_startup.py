@@ -0,0 +1,97 @@
+"""CLI startup time: ``--help`` and a warm ``show-equilibrium``.
+
+Runs each command in fresh interpreters, reports the median wall time and the
+slowest top-level imports from ``-X importtime``, and fails (exit status 1)
+when a median exceeds its budget or ``--help`` imports the data stack. The
+show command needs a built processed cache entry (``prepare-data``).
+
+    python -m benchmarks.bench_startup --runs 7 --help-budget-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from src import config
+
+# Modules --help must not import
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow")
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative import time (us) of every module in ``-X importtime`` output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:") :].split("|")
+        cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def top_level(cumulative: Dict[str, int], n: int) -> List[Tuple[str, int]]:
+    roots = {}
+    for name, us in cumulative.items():
+        root = name.split(".")[0]
+        if root == name or root not in cumulative:
+            roots[root] = max(roots.get(root, 0), us)
+    return sorted(roots.items(), key=lambda kv: -kv[1])[:n]
+
+
+def run(argv: List[str], runs: int) -> Tuple[float, Dict[str, int]]:
+    """Median wall time (ms) of ``python -m src.cli argv`` and one import profile."""
+    cmd = [sys.executable, "-m", "src.cli", *argv]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, capture_output=True, cwd=config.BASE_DIR)
+        timings.append(time.perf_counter() - start)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "src.cli", *argv],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=config.BASE_DIR,
+    )
+    return statistics.median(timings) * 1e3, parse_importtime(proc.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--symbol", default="btc")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--help-budget-ms", type=float, default=150.0)
+    parser.add_argument("--show-budget-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    cases = [
+        ("--help", ["--help"], args.help_budget_ms),
+        ("show", ["show-equilibrium", "--symbol", args.symbol], args.show_budget_ms),
+    ]
+    failures = []
+    for label, argv, budget in cases:
+        median_ms, imports = run(argv, args.runs)
+        status = "ok" if median_ms <= budget else "OVER BUDGET"
+        print(f"{label:<8} {median_ms:>8.1f} ms  (budget {budget:.0f} ms)  {status}")
+        for name, us in top_level(imports, args.top):
+            print(f"    {name:<24} {us / 1e3:>8.1f} ms")
+        if median_ms > budget:
+            failures.append(f"{label} took {median_ms:.1f} ms > {budget:.0f} ms")
+        if label == "--help":
+            heavy = [m for m in HEAVY_MODULES if m in imports]
+            if heavy:
+                failures.append(f"--help imported {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Processed-store startup: parquet vs memory-mapped Arrow IPC (feather).
+
+Writes a synthetic processed table in both formats, then loads it in a fresh
+interpreter twice per format: cold (file pages dropped from the OS page cache
+with ``posix_fadvise(DONTNEED)``) and warm (pages still cached). Reports the
+time to load the full table and to access one column, and the RSS added.
+
+    python -m benchmarks.bench_store --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src import config
+
+from .procstat import rss_kb
+from .synthetic import make_universe
+
+FORMATS = ["parquet", "feather"]
+
+
+def drop_page_cache(path: Path) -> None:
+    """Ask the kernel to evict ``path`` from the page cache (best effort)."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def run_child(fmt: str, entry: Path) -> None:
+    from src import data_prep
+
+    baseline = rss_kb("VmRSS")
+    start = time.perf_counter()
+    column = data_prep.read_processed(entry, columns=[config.COL_EQ_SHIFT], fmt=fmt)
+    column[config.COL_EQ_SHIFT].sum()
+    one_column = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = data_prep.read_processed(entry, fmt=fmt)
+    full = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "one_column": one_column,
+                "full": full,
+                "rss_mb": (rss_kb("VmRSS") - baseline) / 1024,
+                "rows": len(df),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", choices=FORMATS, help=argparse.SUPPRESS)
+    parser.add_argument("--entry", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.entry)
+        return
+
+    from src import data_prep
+
+    df = data_prep.clean_and_engineer(make_universe(args.rows, args.seed), columnar=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        entry = Path(tmp)
+        for fmt in FORMATS:
+            data_prep.write_processed(df, entry, fmt=fmt)
+        del df
+
+        print(
+            f"{'format':<8} {'start':<5} {'MB':>7} {'1 col ms':>9} "
+            f"{'full ms':>9} {'RSS MB':>8}"
+        )
+        for fmt in FORMATS:
+            path = data_prep.processed_path(entry, fmt)
+            size_mb = path.stat().st_size / 2**20
+            for start in ["cold", "warm"]:
+                if start == "cold":
+                    drop_page_cache(path)
+                proc = subprocess.run(
+                    [
+                        sys.executable,
+                        "-m",
+                        "benchmarks.bench_store",
+                        "--child",
+                        fmt,
+                        "--entry",
+                        str(entry),
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                print(
+                    f"{fmt:<8} {start:<5} {size_mb:>7.0f} "
+                    f"{r['one_column'] * 1e3:>9.1f} {r['full'] * 1e3:>9.1f} "
+                    f"{r['rss_mb']:>8.0f}",
+                    flush=True,
+                )
+
+
+if __name__ == "__main__":
+    main()
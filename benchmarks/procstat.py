@@ -0,0 +1,21 @@
+"""Process memory helpers for the benchmarks (Linux /proc)."""
+from __future__ import annotations
+
+
+def rss_kb(field: str = "VmRSS") -> int:
+    """Read a memory field (VmRSS, VmHWM, ...) of this process in kB."""
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise RuntimeError(f"{field} not available in /proc/self/status")
+
+
+def reset_peak() -> bool:
+    """Reset the VmHWM high-water mark to the current RSS, if permitted."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src import config
+
+
+def make_universe(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a raw-schema frame of ``n_rows`` synthetic assets.
+
+    Values are drawn from loose, heavy-tailed distributions so that ranks,
+    ties and NaNs behave roughly like the real top-1000 snapshot. String
+    columns are included so memory numbers reflect the full raw frame.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.char.add("asset-", np.arange(n_rows).astype(str))
+
+    price = rng.lognormal(0.0, 3.0, n_rows)
+    circ = rng.lognormal(18.0, 2.0, n_rows)
+    max_supply = circ * rng.uniform(1.0, 3.0, n_rows)
+    max_supply[rng.random(n_rows) < 0.3] = np.nan
+    market_cap = price * circ
+    volume = market_cap * rng.lognormal(-3.0, 1.5, n_rows)
+    pct_24h = rng.standard_t(3, n_rows) * 3.0
+    pct_7d = rng.standard_t(3, n_rows) * 8.0
+    pct_7d[rng.random(n_rows) < 0.02] = np.nan
+
+    return pd.DataFrame(
+        {
+            config.COL_ID: ids,
+            config.COL_SYMBOL: np.char.add("S", (np.arange(n_rows) % 50_000).astype(str)),
+            config.COL_NAME: np.char.add("Synthetic Asset ", ids),
+            config.COL_MARKET_CAP_RANK: np.arange(1, n_rows + 1),
+            config.COL_CURRENT_PRICE: price,
+            config.COL_MARKET_CAP: market_cap,
+            config.COL_FULLY_DILUTED_VALUATION: price
+            * np.nan_to_num(max_supply, nan=circ),
+            config.COL_TOTAL_VOLUME: volume,
+            config.COL_HIGH_24H: price * 1.02,
+            config.COL_LOW_24H: price * 0.98,
+            config.COL_CIRC_SUPPLY: circ,
+            config.COL_TOTAL_SUPPLY: circ,
+            config.COL_MAX_SUPPLY: max_supply,
+            config.COL_ATH: price * 2.0,
+            config.COL_ATH_CHANGE_PCT: -50.0 + rng.normal(0.0, 10.0, n_rows),
+            config.COL_ATH_DATE: "2024-03-14T07:10:36.635Z",
+            config.COL_ATL: price * 0.1,
+            config.COL_ATL_CHANGE_PCT: 900.0 + rng.normal(0.0, 100.0, n_rows),
+            config.COL_ATL_DATE: "2020-03-13T02:22:55.044Z",
+            config.COL_PRICE_CHANGE_24H: price * pct_24h / 100.0,
+            config.COL_PCT_CHANGE_24H: pct_24h,
+            config.COL_PCT_CHANGE_1H: rng.normal(0.0, 0.5, n_rows),
+            config.COL_PCT_CHANGE_7D: pct_7d,
+            config.COL_PCT_CHANGE_30D: rng.normal(0.0, 20.0, n_rows),
+            config.COL_PCT_CHANGE_1Y: rng.normal(0.0, 80.0, n_rows),
+            config.COL_MARKET_CAP_CHANGE_24H: market_cap * pct_24h / 100.0,
+            config.COL_MARKET_CAP_PCT_CHANGE_24H: pct_24h,
+            config.COL_LAST_UPDATED: "2025-12-03T18:57:01.835Z",
+            config.COL_IMAGE: np.char.add("https://coin-images.example/large/", ids),
+            config.COL_SUPPLY_UTILIZATION: rng.uniform(0.0, 100.0, n_rows).round(2),
+        }
+    )
@@ -0,0 +1,302 @@
+"""HTTP JSON API over the in-memory processed table (stdlib asyncio only).
+
+Endpoints (all JSON):
+
+- ``GET /equilibrium/{symbol}``: the show-equilibrium fields of one asset
+  (the first with that symbol; ``X-Asset-Rows`` lists every match)
+- ``POST /equilibrium``: a batch query, as ``show-equilibrium`` takes it:
+  ``{"symbols": [...], "ids": [...], "indices": [...], "rank_range": [lo, hi],
+  "all": false}`` -> ``{"rows": [...], "missing": [...], "ambiguous": {...}}``
+- ``GET /top-k?by=tension_score&k=10&ascending=0`` -> ``{"rows": [...]}``
+- ``GET /scenario/{symbol}?vol_mult=1&vol24_mult=1&util_shift=0``: forces
+  and equilibrium of that asset shocked in isolation
+  (``scenario.ScenarioEngine``; ``util_shift`` is in the units of the
+  utilization column, see ``scenario.utilization_max``)
+
+The table is held by a ``daemon.QueryDaemon``, so it is reloaded when the
+processed artifact's fingerprint changes. Every response carries that
+fingerprint as its ETag; a GET whose ``If-None-Match`` matches it is
+answered ``304 Not Modified`` before any work is done. Rows are encoded to
+JSON once per snapshot and responses are written as lists of these
+pre-encoded chunks, without building one body string.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, unquote
+
+from . import config, store
+from .daemon import QueryDaemon
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+# Largest accepted request body (batch queries)
+MAX_BODY_BYTES = 1 << 20
+
+_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Response:
+    status: int
+    chunks: List[bytes]
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def _json_value(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def encode(obj) -> bytes:
+    """Compact JSON bytes, with NaN and infinities as null."""
+    if isinstance(obj, dict):
+        obj = {key: _json_value(value) for key, value in obj.items()}
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _list_of(query: dict, name: str, kind: type) -> list:
+    values = query.get(name) or []
+    if not isinstance(values, list) or not all(
+        isinstance(v, kind) and not isinstance(v, bool) for v in values
+    ):
+        raise HttpError(400, f"{name!r} must be a list of {kind.__name__}.")
+    return values
+
+
+def batch_query(body: bytes) -> dict:
+    """Validated ``POST /equilibrium`` body, as ``store.select`` arguments."""
+    query = json.loads(body or b"{}")
+    if not isinstance(query, dict):
+        raise HttpError(400, "The body must be a JSON object.")
+    rank_range = query.get("rank_range")
+    if rank_range is not None and not (
+        isinstance(rank_range, list)
+        and len(rank_range) == 2
+        and all(isinstance(v, int) and not isinstance(v, bool) for v in rank_range)
+    ):
+        raise HttpError(400, "'rank_range' must be [lo, hi] (integers).")
+    everything = query.get("all", False)
+    if not isinstance(everything, bool):
+        raise HttpError(400, "'all' must be true or false.")
+    return {
+        "symbols": _list_of(query, "symbols", str),
+        "ids": _list_of(query, "ids", str),
+        "indices": _list_of(query, "indices", int),
+        "rank_range": rank_range,
+        "everything": everything,
+    }
+
+
+def scenario_shocks(params: dict) -> dict:
+    """Validated ``GET /scenario`` shocks, as ``ScenarioEngine.evaluate`` takes them."""
+    shocks = {}
+    for name, default in [("vol_mult", 1.0), ("vol24_mult", 1.0), ("util_shift", 0.0)]:
+        value = float(params.get(name, default))
+        if not math.isfinite(value):
+            raise HttpError(400, f"{name} must be a finite number.")
+        shocks[name] = value
+    return shocks
+
+
+def _json_array(chunks: List[bytes]) -> List[bytes]:
+    out = [b"["]
+    for i, chunk in enumerate(chunks):
+        if i:
+            out.append(b",")
+        out.append(chunk)
+    out.append(b"]")
+    return out
+
+
+class ApiServer:
+    """Routes requests to the snapshot held by ``daemon``."""
+
+    def __init__(self, daemon: Optional[QueryDaemon] = None) -> None:
+        self.daemon = daemon if daemon is not None else QueryDaemon()
+
+    def encoded_rows(self, loaded, offsets: List[int]) -> List[bytes]:
+        """JSON of the show fields of each row, encoded once per snapshot."""
+        cache = loaded.derived
+        todo = [pos for pos in dict.fromkeys(offsets) if ("json", pos) not in cache]
+        rows = store.take_rows(loaded.table, todo, config.SHOW_COLS)
+        for pos, row in zip(todo, rows):
+            cache[("json", pos)] = encode(row)
+        return [cache[("json", pos)] for pos in offsets]
+
+    def scenario_engine(self, loaded):
+        engine = loaded.derived.get(("engine",))
+        if engine is None:
+            from .scenario import ScenarioEngine
+
+            engine = ScenarioEngine(loaded.table.to_pandas())
+            loaded.derived[("engine",)] = engine
+        return engine
+
+    def respond(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Response:
+        loaded = self.daemon.current()
+        etag = f'"{loaded.key}"'
+        try:
+            if method == "GET" and _matches(headers.get("if-none-match"), etag):
+                return Response(304, [], {"ETag": etag})
+            response = self._route(loaded, method, target, body)
+        except HttpError as exc:
+            response = Response(exc.status, [encode({"error": str(exc)})])
+        except (ValueError, IndexError, KeyError, TypeError, AttributeError) as exc:
+            response = Response(400, [encode({"error": str(exc)})])
+        response.headers["ETag"] = etag
+        return response
+
+    def _route(self, loaded, method: str, target: str, body: bytes) -> Response:
+        path, _, query = target.partition("?")
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+
+        if parts[0] == "equilibrium" and len(parts) == 2 and method == "GET":
+            offsets = loaded.asset_index.by_symbol(parts[1])
+            if not offsets:
+                raise HttpError(404, f"Symbol {parts[1]} not found.")
+            return Response(
+                200,
+                self.encoded_rows(loaded, offsets[:1]),
+                {"X-Asset-Rows": ",".join(map(str, offsets))},
+            )
+        if parts == ["equilibrium"] and method == "POST":
+            selection = store.select(
+                loaded.asset_index, **batch_query(body), table=loaded.table
+            )
+            return Response(
+                200,
+                [b'{"rows":']
+                + _json_array(self.encoded_rows(loaded, selection.offsets))
+                + [b',"missing":', encode(selection.missing)]
+                + [b',"ambiguous":', encode(selection.ambiguous), b"}"],
+            )
+        if parts == ["top-k"] and method == "GET":
+            by = params.get("by", config.COL_TENSION_SCORE)
+            ascending = params.get("ascending", "0").lower() in ("1", "true")
+            k = int(params.get("k", 10))
+            if k < 0:
+                raise HttpError(400, "k must be >= 0.")
+            order = loaded.rank_order(by, ascending)
+            offsets = order[:k].to_pylist()
+            rows = self.encoded_rows(loaded, offsets)
+            return Response(200, [b'{"rows":'] + _json_array(rows) + [b"}"])
+        if parts[0] == "scenario" and len(parts) == 2 and method == "GET":
+            offsets = loaded.asset_index.by_symbol(parts[1])
+            if not offsets:
+                raise HttpError(404, f"Symbol {parts[1]} not found.")
+            shocks = scenario_shocks(params)
+            outputs = self.scenario_engine(loaded).evaluate(offsets[0], **shocks)
+            result = {"row": offsets[0], **shocks}
+            result.update({col: float(value) for col, value in outputs.items()})
+            return Response(200, [encode(result)])
+        if parts[0] in ("equilibrium", "top-k", "scenario"):
+            raise HttpError(405, f"{method} not allowed on {path}.")
+        raise HttpError(404, f"No route for {path}.")
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve requests on one (keep-alive) connection until it closes."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    response = Response(400, [encode({"error": "Bad request line."})])
+                    writer.writelines(_serialize(response, keep_alive=False))
+                    await writer.drain()
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    response = Response(413, [encode({"error": "Body too large."})])
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    response = self.respond(method, target, headers, body)
+                    keep_alive = (
+                        version == "HTTP/1.1"
+                        and headers.get("connection", "").lower() != "close"
+                    )
+                writer.writelines(_serialize(response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _serialize(response: Response, keep_alive: bool) -> Iterable[bytes]:
+    length = sum(len(chunk) for chunk in response.chunks)
+    head = [f"HTTP/1.1 {response.status} {_REASONS[response.status]}"]
+    if response.status != 304:
+        head.append("Content-Type: application/json")
+        head.append(f"Content-Length: {length}")
+    head += [f"{name}: {value}" for name, value in response.headers.items()]
+    if not keep_alive:
+        head.append("Connection: close")
+    yield ("\r\n".join(head) + "\r\n\r\n").encode("latin-1")
+    yield from response.chunks
+
+
+async def _serve(host: str, port: int, ready=None) -> None:
+    api = ApiServer()
+    # Load before listening, so the first request is as fast as the rest
+    api.daemon.current()
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    async with server:
+        if ready is not None:
+            ready(server.sockets[0].getsockname())
+        await server.serve_forever()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, ready=None) -> None:
+    """Run the API on ``host:port`` until interrupted.
+
+    ``ready`` (if given) is called with the bound address once listening.
+    """
+    try:
+        asyncio.run(_serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import config
+from .params import DEFAULT_PARAMS, ModelParams
+
+# Chunk size for content hashing
+HASH_CHUNK_BYTES = 1 << 20
+
+# (path, size, mtime_ns) -> content digest, so a process hashes a file once
+_CONTENT_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: Path) -> str:
+    """blake2b digest of a file's content (memoized on path, size and mtime)."""
+    path = Path(path)
+    st = path.stat()
+    memo_key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+    digest = _CONTENT_DIGESTS.get(memo_key)
+    if digest is None:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(HASH_CHUNK_BYTES), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _CONTENT_DIGESTS[memo_key] = digest
+    return digest
+
+
+def fingerprint(
+    raw_path: Path,
+    params: ModelParams = DEFAULT_PARAMS,
+    content_hash: Optional[bool] = None,
+    layout: str = "",
+) -> str:
+    """Cache key of the processed artifact built from ``raw_path``.
+
+    Combines the raw file identity, every model parameter,
+    ``config.PROCESSED_CODE_VERSION`` and ``layout`` (anything else that
+    changes what an entry contains, such as the storage format).
+
+    By default the raw file is identified by its resolved path, size and
+    mtime, which costs one ``stat``. With ``content_hash`` (default:
+    ``config.PROCESSED_CACHE_HASH_CONTENT``) it is identified by a digest of
+    its bytes instead, so touching or copying the file does not invalidate
+    the cache.
+    """
+    if content_hash is None:
+        content_hash = config.PROCESSED_CACHE_HASH_CONTENT
+    raw_path = Path(raw_path)
+    if content_hash:
+        raw = {"blake2b": file_digest(raw_path)}
+    else:
+        st = raw_path.stat()
+        raw = {
+            "path": str(raw_path.resolve()),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+    payload = json.dumps(
+        {
+            "raw": raw,
+            "params": dataclasses.asdict(params),
+            "code": config.PROCESSED_CODE_VERSION,
+            "layout": layout,
+        },
+        sort_keys=True,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=10).hexdigest()
+
+
+class ProcessedCache:
+    """Directory of processed artifacts keyed by fingerprint.
+
+    Each entry is a sub-directory named after its key, so an artifact may hold
+    several files. Entries are written to a temporary directory and renamed
+    into place, which makes them appear atomically to concurrent readers.
+    A hit refreshes the entry's mtime; once the total size exceeds
+    ``max_bytes`` the least recently used entries are removed.
+    """
+
+    def __init__(
+        self, root: Optional[Path] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        self.root = Path(root) if root is not None else config.DATA_PROCESSED_CACHE_DIR
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else config.PROCESSED_CACHE_MAX_BYTES
+        )
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def get(self, key: str) -> Optional[Path]:
+        """Entry directory for ``key`` (marked as used), or None on a miss."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, write: Callable[[Path], None]) -> Path:
+        """Create the entry for ``key`` by calling ``write(directory)``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        try:
+            write(tmp)
+            os.rename(tmp, path)
+        except OSError:
+            # Another process published the same key first; keep theirs
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not path.is_dir():
+                raise
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        os.utime(path)
+        self.evict(keep=key)
+        return path
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """``(key, bytes, last_used)`` for every entry, least recent first."""
+        if not self.root.is_dir():
+            return []
+        out = []
+        for entry in os.scandir(self.root):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            size = sum(
+                f.stat().st_size for f in Path(entry.path).rglob("*") if f.is_file()
+            )
+            out.append((entry.name, size, entry.stat().st_mtime))
+        out.sort(key=lambda e: e[2])
+        return out
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Drop least recently used entries until within ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
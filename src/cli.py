@@ -1,82 +1,401 @@
 from __future__ import annotations
 
 import argparse
-from typing import Optional
+import sys
+from pathlib import Path
+from typing import List, Optional
 
-from . import config, data_prep
+# Only config (stdlib-only) is imported here. Commands import the data stack
+# themselves, so --help, argument errors and warm lookups stay fast.
+from . import config
+from .config import (
+    SHOW_ASSET_COLS,
+    SHOW_COLS,
+    SHOW_EQUILIBRIUM_COLS,
+    SHOW_FORCE_COLS,
+    SHOW_STATE_COLS,
+)
 
 
 def cmd_prepare_data(args: argparse.Namespace) -> None:
+    from . import data_prep
+
     df = data_prep.load_processed()
     print(f"Prepared processed dataset with {len(df)} rows.")
+    print(f"Cached in {data_prep.processed_entry()}")
     print("Columns available:")
     print(", ".join(df.columns))
 
 
-def _select_row(index: Optional[int], symbol: Optional[str]):
-    df = data_prep.load_processed()
-    if symbol is not None:
-        mask = df[config.COL_SYMBOL].str.upper() == symbol.upper()
-        if not mask.any():
-            raise ValueError(f"Symbol {symbol} not found in processed dataset.")
-        row = df[mask].iloc[0]
+def cmd_prepare_panel(args: argparse.Namespace) -> None:
+    from . import data_prep
+
+    paths = sorted(args.snapshots_dir.glob("*.csv"))
+    df = data_prep.prepare_panel(paths, key=args.key, freq=args.freq)
+    if args.store is not None:
+        written = data_prep.write_panel_partitions(df, root=args.store)
+        print(
+            f"Prepared panel with {df[config.COL_SNAPSHOT].nunique()} snapshots "
+            f"and {len(df)} rows in {len(written)} partition files."
+        )
+        print(f"Saved to {args.store}")
+        return
+    out_path = args.out
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(out_path, index=False)
+    print(
+        f"Prepared panel with {df[config.COL_SNAPSHOT].nunique()} snapshots "
+        f"and {len(df)} rows."
+    )
+    print(f"Saved to {out_path}")
+
+
+# Output formats of show-equilibrium / top-k
+OUTPUT_FORMATS = ("table", "json", "csv")
+
+
+def cmd_append_snapshot(args: argparse.Namespace) -> None:
+    from . import data_prep
+
+    written = data_prep.append_snapshots(
+        args.csv, root=args.store, key=args.key, freq=args.freq
+    )
+    partitions = sorted({str(path.parent.relative_to(args.store)) for path in written})
+    print(f"Wrote {len(written)} files into {len(partitions)} partitions:")
+    for partition in partitions:
+        print(f"- {partition}")
+
+
+def _daemon_request(args: argparse.Namespace, payload: dict) -> Optional[dict]:
+    """Reply of the resident daemon, or None to answer the request locally."""
+    if args.no_daemon:
+        return None
+    from . import daemon
+
+    return daemon.request(payload, args.daemon_socket)
+
+
+def _read_symbols(path: str) -> List[str]:
+    """Symbols listed one per line in ``path`` (``-`` for stdin); ``#`` comments."""
+    fh = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with fh:
+        lines = [line.split("#", 1)[0].strip() for line in fh]
+    return [line for line in lines if line]
+
+
+def _select_rows(args: argparse.Namespace) -> List[dict]:
+    symbols = list(args.symbol or [])
+    if args.symbols_file is not None:
+        symbols += _read_symbols(args.symbols_file)
+    ids, indices = list(args.id or []), list(args.index or [])
+    if not (symbols or ids or indices or args.rank_range or args.all):
+        raise ValueError(
+            "Pass --index, --symbol, --id, --symbols-file, --rank-range or --all."
+        )
+
+    reply = _daemon_request(
+        args,
+        {
+            "op": "show",
+            "symbols": symbols,
+            "ids": ids,
+            "indices": indices,
+            "rank_range": args.rank_range,
+            "all": args.all,
+            "columns": SHOW_COLS,
+        },
+    )
+    if reply is not None:
+        rows = reply["rows"]
+        missing, ambiguous = reply["missing"], reply["ambiguous"]
     else:
-        if index is None:
-            raise ValueError("Either --index or --symbol must be provided.")
-        if index < 0 or index >= len(df):
-            raise IndexError(f"Index {index} out of range for dataset of size {len(df)}.")
-        row = df.iloc[index]
-    return row
+        # Warm path: keys resolve through the index sidecar with dict lookups
+        # and the printed fields are read with pyarrow alone (no pandas): one
+        # row group for a single asset, else the projected table once
+        from . import store
+
+        entry = store.current_entry()
+        if entry is None:
+            from . import data_prep
+
+            entry = data_prep.processed_entry()
+        asset_index = store.AssetIndex.load(entry / store.INDEX_FILE)
+        table = None
+        if args.rank_range or args.all:
+            table = store.read_table(entry, columns=SHOW_COLS)
+        selection = store.select(
+            asset_index,
+            symbols,
+            ids,
+            indices,
+            rank_range=args.rank_range,
+            everything=args.all,
+            table=table,
+        )
+        if table is None and len(selection.offsets) == 1:
+            rows = [store.read_row(entry, selection.offsets[0], columns=SHOW_COLS)]
+        else:
+            if table is None and selection.offsets:
+                table = store.read_table(entry, columns=SHOW_COLS)
+            rows = store.take_rows(table, selection.offsets) if table else []
+        missing, ambiguous = selection.missing, selection.ambiguous
+
+    for label, offsets in ambiguous.items():
+        print(
+            f"Warning: {label} matches {len(offsets)} assets "
+            f"(rows {', '.join(map(str, offsets))}); showing row {offsets[0]}. "
+            + ("Use --index" if label.startswith("Id ") else "Use --id or --index")
+            + " to pick another.",
+            file=sys.stderr,
+        )
+    if missing:
+        message = f"{', '.join(missing)} not found in processed dataset."
+        if not rows:
+            raise ValueError(message)
+        print(f"Warning: {message}", file=sys.stderr)
+    return rows
+
+
+def _format_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
+def _render(rows: List[dict], columns: List[str], fmt: str) -> str:
+    """``rows`` as one aligned text table, a JSON array or CSV."""
+    if fmt == "json":
+        import json
+        import math
+
+        records = [
+            {
+                col: None if isinstance(row[col], float) and math.isnan(row[col])
+                else row[col]
+                for col in columns
+            }
+            for row in rows
+        ]
+        if not records:
+            return "[]\n"
+        return "[\n" + ",\n".join(json.dumps(r) for r in records) + "\n]\n"
+    if fmt == "csv":
+        import csv
+        import io
+
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(
+                "" if row[col] is None or row[col] != row[col] else row[col]
+                for col in columns
+            )
+        return buf.getvalue()
+    cells = [[_format_cell(row[col]) for col in columns] for row in rows]
+    widths = [
+        max([len(col)] + [len(line[i]) for line in cells])
+        for i, col in enumerate(columns)
+    ]
+    lines = ["  ".join(col.rjust(w) for col, w in zip(columns, widths))]
+    lines += ["  ".join(c.rjust(w) for c, w in zip(line, widths)) for line in cells]
+    return "\n".join(lines) + "\n"
+
+
+def _render_details(row: dict) -> str:
+    lines = ["Asset:"]
+    lines += [f"- {col}: {row[col]}" for col in SHOW_ASSET_COLS if col in row]
+    lines += ["", "Current state:"]
+    lines += [f"- {col}: {row[col]}" for col in SHOW_STATE_COLS if col in row]
+    lines += ["", "Forces:"]
+    lines += [f"- {col}: {row[col]:+.3f}" for col in SHOW_FORCE_COLS if col in row]
+    lines += ["", "Equilibrium:"]
+    lines += [
+        f"- {col}: {row[col]:.6f}" for col in SHOW_EQUILIBRIUM_COLS if col in row
+    ]
+    return "\n".join(lines) + "\n"
 
 
 def cmd_show_equilibrium(args: argparse.Namespace) -> None:
-    row = _select_row(args.index, args.symbol)
-
-    print("Asset:")
-    for col in [config.COL_SYMBOL, config.COL_NAME, config.COL_MARKET_CAP_RANK]:
-        if col in row.index:
-            print(f"- {col}: {row[col]}")
-
-    print("\nCurrent state:")
-    for col in [config.COL_CURRENT_PRICE, config.COL_MARKET_CAP, config.COL_TOTAL_VOLUME]:
-        if col in row.index:
-            print(f"- {col}: {row[col]}")
-
-    print("\nForces:")
-    for col in [
-        config.COL_FORCE_DEMAND,
-        config.COL_FORCE_SUPPLY,
-        config.COL_FORCE_VOLATILITY,
-        config.COL_FORCE_LIQUIDITY,
-        config.COL_FORCE_SPECULATION,
-    ]:
-        if col in row.index:
-            print(f"- {col}: {row[col]:+.3f}")
-
-    print("\nEquilibrium:")
-    for col in [
-        config.COL_EQ_SHIFT,
-        config.COL_EQ_CENTER,
-        config.COL_EQ_LOWER,
-        config.COL_EQ_UPPER,
-        config.COL_TENSION_SCORE,
-    ]:
-        if col in row.index:
-            print(f"- {col}: {row[col]:.6f}")
+    rows = _select_rows(args)
+    if args.format is None and len(rows) == 1:
+        text = _render_details(rows[0])
+    else:
+        text = _render(rows, SHOW_COLS, args.format or "table")
+    # One write for the whole result, however many assets it holds
+    sys.stdout.write(text)
+
+
+def cmd_top_k(args: argparse.Namespace) -> None:
+    columns = args.columns or SHOW_ASSET_COLS + [args.by]
+    columns = list(dict.fromkeys(columns))
+    reply = _daemon_request(
+        args,
+        {
+            "op": "top-k",
+            "by": args.by,
+            "k": args.k,
+            "ascending": args.ascending,
+            "columns": columns,
+        },
+    )
+    if reply is not None:
+        rows = reply["rows"]
+    else:
+        # Warm path: pyarrow alone, as in show-equilibrium; the data stack is
+        # only imported to build a missing artifact
+        from . import store
+
+        entry = store.current_entry()
+        if entry is None:
+            from . import data_prep
+
+            entry = data_prep.processed_entry()
+        table = store.read_table(entry)
+        order = store.rank_order(table, args.by, args.ascending)
+        rows = store.take_rows(table, order[: args.k], columns)
+    sys.stdout.write(_render(rows, columns, args.format))
+
+
+def cmd_serve_http(args: argparse.Namespace) -> None:
+    from . import api
+
+    def ready(address) -> None:
+        print(f"Serving the HTTP API on http://{address[0]}:{address[1]}", flush=True)
+
+    api.serve(args.host, args.port, ready=ready)
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    from . import daemon
+
+    def ready() -> None:
+        print(f"Serving the processed table on {args.daemon_socket}", flush=True)
+
+    daemon.serve(args.daemon_socket, ready=ready)
 
 
 def cmd_export_equilibrium(args: argparse.Namespace) -> None:
+    from . import store
+
+    filters = store.row_filters(args.rank_range, args.min_tension)
+    if args.dates is not None and args.panel is None:
+        raise ValueError("--dates selects panel snapshots; add --panel.")
+    reply = None
+    if args.panel is not None:
+        from . import data_prep
+
+        # Partition predicates first: they decide which directories are read
+        partitions = data_prep.panel_filters(args.dates, args.rank_range)
+        filters = (partitions or []) + (filters or []) or None
+    elif str(args.out) != "-":
+        # The daemon writes the file itself from its in-memory table
+        reply = _daemon_request(
+            args,
+            {
+                "op": "export",
+                "out": str(Path(args.out).resolve()),
+                "format": args.format,
+                "compression": args.compression,
+                "columns": args.columns,
+                "filters": filters,
+            },
+        )
+    if reply is not None:
+        rows = reply["rows"]
+    else:
+        from . import export
+
+        rows = export.export(
+            args.out,
+            fmt=args.format,
+            compression=args.compression,
+            columns=args.columns,
+            filters=filters,
+            panel=args.panel,
+        )
+    # Keep stdout clean when the export itself goes there
+    log = sys.stderr if str(args.out) == "-" else sys.stdout
+    source = "the panel store" if args.panel is not None else "the equilibrium snapshot"
+    print(f"Exported {rows} rows of {source} to {args.out}", file=log)
+
+
+def _report_path(path: str):
+    """Paths relative to reports/metrics; ``-`` means stdout."""
+    return path if path == "-" else config.REPORTS_METRICS_DIR / path
+
+
+def _column_list(value: str) -> list:
+    return [col.strip() for col in value.split(",") if col.strip()]
+
+
+def _non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0, got {number}")
+    return number
+
+
+def cmd_memory_report(args: argparse.Namespace) -> None:
+    from . import data_prep
+
+    report = data_prep.memory_report(data_prep.load_processed())
+    lazy = report["compact_dtype"].isna()
+    table = report.assign(
+        compact_dtype=report["compact_dtype"].where(~lazy, "(on disk)")
+    )
+    print(table.to_string())
+
+    before = report["bytes"].sum()
+    after = report["compact_bytes"].sum()
+    print(
+        f"\nResident: {before / 1024:,.1f} KiB -> {after / 1024:,.1f} KiB "
+        f"({before / after:.2f}x smaller, {int(lazy.sum())} display-only "
+        "columns loaded on demand)"
+    )
+
+
+def cmd_monte_carlo(args: argparse.Namespace) -> None:
+    from . import data_prep, montecarlo
+
     df = data_prep.load_processed()
+    sigmas = {
+        "volume_sigma": args.volume_sigma,
+        "change_sigma": args.change_sigma,
+        "util_sigma": args.util_sigma,
+    }
+    shocks = montecarlo.ShockSpec(
+        **{name: value for name, value in sigmas.items() if value is not None}
+    )
+    result = montecarlo.simulate(
+        df, args.draws, shocks=shocks, seed=args.seed, workers=args.workers
+    )
+    summary = result.summary()
+    summary.insert(0, config.COL_SYMBOL, df[config.COL_SYMBOL])
     out_path = args.out
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_path, index=False)
-    print(f"Exported equilibrium snapshot to {out_path}")
+    summary.to_csv(out_path, index=False)
+    print(f"Simulated {result.n_draws} market-wide shock draws.")
+    print(f"Exported Monte Carlo summary to {out_path}")
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Crypto Price Equilibrium Simulator CLI"
     )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Read the store directly even if a query daemon is running.",
+    )
+    parser.add_argument(
+        "--daemon-socket",
+        type=Path,
+        default=config.DAEMON_SOCKET,
+        help="Unix socket of the query daemon (see the serve command).",
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     p_prepare = subparsers.add_parser(
@@ -84,34 +403,288 @@ def build_parser() -> argparse.ArgumentParser:
     )
     p_prepare.set_defaults(func=cmd_prepare_data)
 
+    p_panel = subparsers.add_parser(
+        "prepare-panel",
+        help="Process many raw snapshots, ranking assets within each snapshot.",
+    )
+    p_panel.add_argument(
+        "--snapshots-dir",
+        type=Path,
+        default=config.DATA_RAW_SNAPSHOTS_DIR,
+        help="Directory of raw snapshot CSVs.",
+    )
+    p_panel.add_argument(
+        "--key",
+        choices=["file", "last_updated"],
+        default="file",
+        help="Snapshot key: one snapshot per file, or last_updated floored to --freq.",
+    )
+    p_panel.add_argument(
+        "--freq",
+        type=str,
+        default="h",
+        help="Flooring frequency for --key last_updated (pandas offset alias).",
+    )
+    p_panel.add_argument(
+        "--out",
+        type=Path,
+        default=config.DATA_PROCESSED_DIR / "crypto_equilibrium_panel.parquet",
+        help="Output parquet path.",
+    )
+    p_panel.add_argument(
+        "--store",
+        type=Path,
+        nargs="?",
+        const=config.DATA_PROCESSED_PANEL_DIR,
+        default=None,
+        help=(
+            "Write a partitioned store (snapshot date / rank bucket) instead "
+            "of --out; defaults to data/processed/panel."
+        ),
+    )
+    p_panel.set_defaults(func=cmd_prepare_panel)
+
+    p_append = subparsers.add_parser(
+        "append-snapshot",
+        help="Add new raw snapshot CSVs to the partitioned panel store.",
+    )
+    p_append.add_argument("csv", type=Path, nargs="+", help="Raw snapshot CSV(s).")
+    p_append.add_argument(
+        "--store",
+        type=Path,
+        default=config.DATA_PROCESSED_PANEL_DIR,
+        help="Partitioned panel store directory.",
+    )
+    p_append.add_argument(
+        "--key",
+        choices=["file", "last_updated"],
+        default="file",
+        help="Snapshot key, as for prepare-panel.",
+    )
+    p_append.add_argument(
+        "--freq",
+        type=str,
+        default="h",
+        help="Flooring frequency for --key last_updated (pandas offset alias).",
+    )
+    p_append.set_defaults(func=cmd_append_snapshot)
+
     p_show = subparsers.add_parser(
-        "show-equilibrium", help="Show equilibrium details for a single asset."
+        "show-equilibrium",
+        help="Equilibrium details for one asset, a list of assets or a rank range.",
     )
     p_show.add_argument(
         "--index",
         type=int,
+        action="extend",
+        nargs="+",
         default=None,
-        help="Row index in the processed dataset.",
+        help="Row index(es) in the processed dataset.",
     )
     p_show.add_argument(
         "--symbol",
         type=str,
+        action="extend",
+        nargs="+",
+        default=None,
+        help="Asset symbol(s) (e.g. BTC ETH); case-insensitive.",
+    )
+    p_show.add_argument(
+        "--id",
+        type=str,
+        action="extend",
+        nargs="+",
+        default=None,
+        help=(
+            "Asset id(s) (e.g. bitcoin). Ids are not guaranteed unique: like a "
+            "symbol, an id matching several rows warns and shows the first."
+        ),
+    )
+    p_show.add_argument(
+        "--symbols-file",
+        type=str,
+        default=None,
+        help="File with one symbol per line (- for stdin); # starts a comment.",
+    )
+    p_show.add_argument(
+        "--rank-range",
+        type=int,
+        nargs=2,
+        metavar=("LO", "HI"),
         default=None,
-        help="Asset symbol (e.g. BTC, ETH). Overrides --index if provided.",
+        help="All assets with LO <= market_cap_rank <= HI.",
+    )
+    p_show.add_argument(
+        "--all", action="store_true", help="Every asset in the processed dataset."
+    )
+    p_show.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help=(
+            "Output format (default: the detailed layout for a single asset, "
+            "table otherwise)."
+        ),
     )
     p_show.set_defaults(func=cmd_show_equilibrium)
 
+    p_top = subparsers.add_parser(
+        "top-k", help="The k assets with the highest (or lowest) value of a column."
+    )
+    p_top.add_argument(
+        "--k", type=_non_negative_int, default=10, help="Number of assets."
+    )
+    p_top.add_argument(
+        "--by",
+        type=str,
+        default=config.COL_TENSION_SCORE,
+        help="Column to rank by (default: tension_score).",
+    )
+    p_top.add_argument(
+        "--ascending", action="store_true", help="Lowest values first."
+    )
+    p_top.add_argument(
+        "--columns",
+        type=_column_list,
+        default=None,
+        help="Comma-separated columns to print (default: symbol, name, rank, --by).",
+    )
+    p_top.add_argument(
+        "--format", choices=OUTPUT_FORMATS, default="table", help="Output format."
+    )
+    p_top.set_defaults(func=cmd_top_k)
+
     p_export = subparsers.add_parser(
         "export-equilibrium",
-        help="Export full equilibrium snapshot to CSV.",
+        help="Stream the equilibrium snapshot to parquet, feather, CSV or NDJSON.",
     )
     p_export.add_argument(
         "--out",
-        type=lambda p: config.REPORTS_METRICS_DIR / p,
+        type=_report_path,
         default=config.REPORTS_METRICS_DIR / "equilibrium_snapshot.csv",
-        help="Output CSV path (relative to project root reports/metrics).",    )
+        help=(
+            "Output path (relative to project root reports/metrics), or - for "
+            "stdout. The format follows the suffix: .parquet, .feather/.arrow, "
+            ".csv, .ndjson/.jsonl, optionally followed by .gz or .zst."
+        ),
+    )
+    p_export.add_argument(
+        "--format",
+        choices=["parquet", "feather", "csv", "ndjson"],
+        default=None,
+        help="Output format (overrides the suffix; csv for stdout).",
+    )
+    p_export.add_argument(
+        "--compression",
+        choices=["gzip", "zstd"],
+        default=None,
+        help="Compression for csv / ndjson output.",
+    )
+    p_export.add_argument(
+        "--columns",
+        type=_column_list,
+        default=None,
+        help="Comma-separated columns to export (default: all).",
+    )
+    p_export.add_argument(
+        "--rank-range",
+        type=int,
+        nargs=2,
+        metavar=("LO", "HI"),
+        default=None,
+        help="Only assets with LO <= market_cap_rank <= HI.",
+    )
+    p_export.add_argument(
+        "--min-tension",
+        type=float,
+        default=None,
+        help="Only assets with tension_score >= this value.",
+    )
+    p_export.add_argument(
+        "--panel",
+        type=Path,
+        nargs="?",
+        const=config.DATA_PROCESSED_PANEL_DIR,
+        default=None,
+        help=(
+            "Export the partitioned panel store (defaults to "
+            "data/processed/panel) instead of the current snapshot. "
+            "--rank-range and --dates then skip non-matching partitions."
+        ),
+    )
+    p_export.add_argument(
+        "--dates",
+        nargs=2,
+        metavar=("FIRST", "LAST"),
+        default=None,
+        help="With --panel: only snapshots dated FIRST..LAST (YYYY-MM-DD).",
+    )
     p_export.set_defaults(func=cmd_export_equilibrium)
 
+    p_serve = subparsers.add_parser(
+        "serve",
+        help=(
+            "Run the query daemon: keep the processed table in memory and answer "
+            "show-equilibrium, top-k and export-equilibrium over --daemon-socket."
+        ),
+    )
+    p_serve.set_defaults(func=cmd_serve)
+
+    p_http = subparsers.add_parser(
+        "serve-http",
+        help="Serve equilibrium, batch, top-k and scenario queries over HTTP (JSON).",
+    )
+    p_http.add_argument("--host", type=str, default="127.0.0.1", help="Bind address.")
+    p_http.add_argument("--port", type=int, default=8000, help="Port (0: any free).")
+    p_http.set_defaults(func=cmd_serve_http)
+
+    p_mem = subparsers.add_parser(
+        "memory-report",
+        help="Per-column memory of the processed table, full vs compact layout.",
+    )
+    p_mem.set_defaults(func=cmd_memory_report)
+
+    p_mc = subparsers.add_parser(
+        "monte-carlo",
+        help="Distribution of equilibrium shift and tension under random shocks.",
+    )
+    p_mc.add_argument("--draws", type=int, default=1000, help="Number of draws.")
+    p_mc.add_argument("--seed", type=int, default=0, help="Random seed.")
+    p_mc.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes (results do not depend on this).",
+    )
+    p_mc.add_argument(
+        "--volume-sigma",
+        type=float,
+        default=None,
+        help="Log-sd of the volume multiplier (default: ShockSpec, 0.5).",
+    )
+    p_mc.add_argument(
+        "--change-sigma",
+        type=float,
+        default=None,
+        help="Log-sd of the 24h/7d change multiplier (default: ShockSpec, 0.5).",
+    )
+    p_mc.add_argument(
+        "--util-sigma",
+        type=float,
+        default=None,
+        help=(
+            "Sd of the supply utilization shift, as a fraction of its scale "
+            "(default: ShockSpec, 0.05)."
+        ),
+    )
+    p_mc.add_argument(
+        "--out",
+        type=lambda p: config.REPORTS_METRICS_DIR / p,
+        default=config.REPORTS_METRICS_DIR / "monte_carlo_summary.csv",
+        help="Output CSV path (relative to project root reports/metrics).",
+    )
+    p_mc.set_defaults(func=cmd_monte_carlo)
+
     return parser
 
 
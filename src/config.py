@@ -3,12 +3,47 @@ from pathlib import Path
 # Base paths
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_RAW = BASE_DIR / "data" / "raw" / "crypto_top1000_dataset.csv"
+DATA_RAW_SNAPSHOTS_DIR = BASE_DIR / "data" / "raw" / "snapshots"
 DATA_PROCESSED_DIR = BASE_DIR / "data" / "processed"
+DATA_PROCESSED_CACHE_DIR = DATA_PROCESSED_DIR / "cache"
+DATA_PROCESSED_PANEL_DIR = DATA_PROCESSED_DIR / "panel"
 MODELS_DIR = BASE_DIR / "models"
 REPORTS_DIR = BASE_DIR / "reports"
 REPORTS_METRICS_DIR = REPORTS_DIR / "metrics"
 REPORTS_FIGURES_DIR = REPORTS_DIR / "figures"
 
+# Processed-artifact cache. Bump PROCESSED_CODE_VERSION whenever cleaning,
+# feature engineering or the equilibrium model change their output, so that
+# artifacts built by older code are no longer matched.
+PROCESSED_CODE_VERSION = "4"
+PROCESSED_CACHE_MAX_BYTES = 2 * 1024**3
+# Storage format of the processed table: "parquet" (compressed, smallest on
+# disk) or "feather" (uncompressed Arrow IPC, memory-mapped, no decode step)
+PROCESSED_FORMAT = "parquet"
+# Fingerprint the raw file by content (blake2b) instead of size + mtime
+PROCESSED_CACHE_HASH_CONTENT = False
+
+# Scenario results memoized by the dashboard (shared by all sessions), as a
+# number of (snapshot, asset, slider positions) entries
+SCENARIO_CACHE_SIZE = 4096
+# Most assets the dashboard's Compare Assets tab shocks side by side
+COMPARE_MAX_ASSETS = 50
+
+# Market Map density tiles (built at prepare time, see market_map.MapTiles):
+# level 0 splits the (equilibrium shift, tension) plane into
+# MAP_TILE_BASE_BINS x MAP_TILE_BASE_BINS cells, each further level doubles
+# that. The dashboard draws individual points only when the zoomed window
+# holds at most MAP_MAX_POINTS assets; otherwise it draws the cells of the
+# coarsest level with at least MAP_TARGET_BINS bins across the window.
+MAP_TILE_BASE_BINS = 32
+MAP_TILE_LEVELS = 6
+MAP_TARGET_BINS = 80
+MAP_MAX_POINTS = 5000
+
+# Unix socket of the resident query daemon (``python -m src.cli serve``); the
+# CLI answers show / top-k / export through it whenever it is listening
+DAEMON_SOCKET = DATA_PROCESSED_DIR / "daemon.sock"
+
 # Dataset column names (from the Kaggle crypto_top1000 dataset)
 COL_ID = "id"
 COL_SYMBOL = "symbol"
@@ -41,6 +76,95 @@ COL_LAST_UPDATED = "last_updated"
 COL_IMAGE = "image"
 COL_SUPPLY_UTILIZATION = "supply_utilization"
 
+# Raw CSV schema, in file order: "string" columns stay text, everything else
+# is parsed straight to the given numeric dtype during typed ingestion
+RAW_SCHEMA = {
+    COL_ID: "string",
+    COL_SYMBOL: "string",
+    COL_NAME: "string",
+    COL_MARKET_CAP_RANK: "int64",
+    COL_CURRENT_PRICE: "float64",
+    COL_MARKET_CAP: "float64",
+    COL_FULLY_DILUTED_VALUATION: "float64",
+    COL_TOTAL_VOLUME: "float64",
+    COL_HIGH_24H: "float64",
+    COL_LOW_24H: "float64",
+    COL_CIRC_SUPPLY: "float64",
+    COL_TOTAL_SUPPLY: "float64",
+    COL_MAX_SUPPLY: "float64",
+    COL_ATH: "float64",
+    COL_ATH_CHANGE_PCT: "float64",
+    COL_ATH_DATE: "string",
+    COL_ATL: "float64",
+    COL_ATL_CHANGE_PCT: "float64",
+    COL_ATL_DATE: "string",
+    COL_PRICE_CHANGE_24H: "float64",
+    COL_PCT_CHANGE_24H: "float64",
+    COL_PCT_CHANGE_1H: "float64",
+    COL_PCT_CHANGE_7D: "float64",
+    COL_PCT_CHANGE_30D: "float64",
+    COL_PCT_CHANGE_1Y: "float64",
+    COL_MARKET_CAP_CHANGE_24H: "float64",
+    COL_MARKET_CAP_PCT_CHANGE_24H: "float64",
+    COL_LAST_UPDATED: "string",
+    COL_IMAGE: "string",
+    COL_SUPPLY_UTILIZATION: "float64",
+}
+
+# Raw columns needed by the model plus the identifiers used for lookups
+MODEL_RAW_COLS = [
+    COL_ID,
+    COL_SYMBOL,
+    COL_NAME,
+    COL_MARKET_CAP_RANK,
+    COL_CURRENT_PRICE,
+    COL_MARKET_CAP,
+    COL_TOTAL_VOLUME,
+    COL_CIRC_SUPPLY,
+    COL_MAX_SUPPLY,
+    COL_PCT_CHANGE_24H,
+    COL_PCT_CHANGE_7D,
+    COL_LAST_UPDATED,
+    COL_SUPPLY_UTILIZATION,
+]
+
+# Raw columns used only by raw-row views; compact frames leave them on disk
+# and load them per row on demand (see data_prep.compact_frame)
+DISPLAY_ONLY_COLS = [
+    COL_FULLY_DILUTED_VALUATION,
+    COL_HIGH_24H,
+    COL_LOW_24H,
+    COL_TOTAL_SUPPLY,
+    COL_ATH,
+    COL_ATH_CHANGE_PCT,
+    COL_ATH_DATE,
+    COL_ATL,
+    COL_ATL_CHANGE_PCT,
+    COL_ATL_DATE,
+    COL_PRICE_CHANGE_24H,
+    COL_PCT_CHANGE_1H,
+    COL_PCT_CHANGE_30D,
+    COL_PCT_CHANGE_1Y,
+    COL_MARKET_CAP_CHANGE_24H,
+    COL_MARKET_CAP_PCT_CHANGE_24H,
+    COL_LAST_UPDATED,
+    COL_IMAGE,
+]
+
+# Raw columns read at ingest: the model's plus the display-only ones.
+# Anything else a dump carries is never parsed.
+INGEST_RAW_COLS = list(dict.fromkeys(MODEL_RAW_COLS + DISPLAY_ONLY_COLS))
+
+# Panel mode: key of the snapshot each row belongs to
+COL_SNAPSHOT = "snapshot"
+
+# Partitioned panel store: partition columns (hive directories, in order)
+# and the width of a market-cap-rank bucket
+COL_SNAPSHOT_DATE = "snapshot_date"
+COL_RANK_BUCKET = "rank_bucket"
+PANEL_PARTITION_COLS = [COL_SNAPSHOT_DATE, COL_RANK_BUCKET]
+RANK_BUCKET_SIZE = 250
+
 # Engineered feature names
 COL_LIQUIDITY_RATIO = "liquidity_ratio"
 COL_VOLATILITY_24H = "volatility_24h"
@@ -60,3 +184,27 @@ COL_EQ_CENTER = "equilibrium_center"
 COL_EQ_LOWER = "equilibrium_lower"
 COL_EQ_UPPER = "equilibrium_upper"
 COL_TENSION_SCORE = "tension_score"
+
+# Fields of one asset as show-equilibrium and the HTTP API print them, per
+# section
+SHOW_ASSET_COLS = [COL_SYMBOL, COL_NAME, COL_MARKET_CAP_RANK]
+SHOW_STATE_COLS = [
+    COL_CURRENT_PRICE,
+    COL_MARKET_CAP,
+    COL_TOTAL_VOLUME,
+]
+SHOW_FORCE_COLS = [
+    COL_FORCE_DEMAND,
+    COL_FORCE_SUPPLY,
+    COL_FORCE_VOLATILITY,
+    COL_FORCE_LIQUIDITY,
+    COL_FORCE_SPECULATION,
+]
+SHOW_EQUILIBRIUM_COLS = [
+    COL_EQ_SHIFT,
+    COL_EQ_CENTER,
+    COL_EQ_LOWER,
+    COL_EQ_UPPER,
+    COL_TENSION_SCORE,
+]
+SHOW_COLS = SHOW_ASSET_COLS + SHOW_STATE_COLS + SHOW_FORCE_COLS + SHOW_EQUILIBRIUM_COLS
@@ -0,0 +1,226 @@
+"""Resident query daemon: the processed table held in memory behind a Unix socket.
+
+``serve`` loads the processed table once and answers ``show``, ``top-k`` and
+``export`` requests; before each request it recomputes the artifact's
+fingerprint (one ``stat``) and reloads the table when it changed. ``request``
+is the client side used by the CLI. It needs only the standard library, and
+returns None when no daemon is listening so callers can fall back to reading
+the store themselves.
+
+The protocol is one JSON object per connection in each direction, each
+terminated by a newline. Errors come back as ``{"error": <type>, "message":
+...}`` and are re-raised by ``request`` as the same exception type.
+"""
+from __future__ import annotations
+
+import json
+import socket
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional
+
+# The client half runs on every CLI call, so only config is imported up
+# front; the server imports the store and socketserver when it starts
+from . import config
+
+if TYPE_CHECKING:
+    from .params import ModelParams
+
+# Client-side limit for one request (an export of a large table included)
+REQUEST_TIMEOUT_S = 600.0
+
+_ERRORS = {"ValueError": ValueError, "IndexError": IndexError, "KeyError": KeyError}
+
+
+def request(
+    payload: Dict[str, Any], socket_path: Optional[Path] = None
+) -> Optional[Dict[str, Any]]:
+    """Send ``payload`` to the daemon and return its reply.
+
+    Returns None when no daemon is listening on ``socket_path`` (default:
+    ``config.DAEMON_SOCKET``).
+    """
+    path = str(socket_path or config.DAEMON_SOCKET)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(REQUEST_TIMEOUT_S)
+    with sock:
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    reply = json.loads(b"".join(chunks))
+    if "error" in reply:
+        raise _ERRORS.get(reply["error"], RuntimeError)(reply["message"])
+    return reply
+
+
+class _Loaded(NamedTuple):
+    key: str
+    entry: Path
+    table: Any
+    asset_index: Any
+    # Data derived from the table so far (sort orders, encoded rows, ...),
+    # dropped with it on reload
+    derived: Dict[tuple, Any]
+
+    def rank_order(self, by: str, ascending: bool = False):
+        """``store.rank_order`` of the table, computed once per column."""
+        key = ("order", by, ascending)
+        order = self.derived.get(key)
+        if order is None:
+            from . import store
+
+            order = self.derived[key] = store.rank_order(self.table, by, ascending)
+        return order
+
+
+class QueryDaemon:
+    """Processed table, symbol/id index and sort orders kept in memory."""
+
+    def __init__(self, params: Optional[ModelParams] = None) -> None:
+        import threading
+
+        from .params import DEFAULT_PARAMS
+
+        self.params = params if params is not None else DEFAULT_PARAMS
+        self._loaded: Optional[_Loaded] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> _Loaded:
+        """The loaded table, reloaded first if the fingerprint changed."""
+        from . import store
+
+        key = store.processed_key(self.params)
+        loaded = self._loaded
+        if loaded is not None and loaded.key == key:
+            return loaded
+        with self._lock:
+            if self._loaded is None or self._loaded.key != key:
+                self._loaded = self._load(key)
+            return self._loaded
+
+    def _load(self, key: str) -> _Loaded:
+        from . import store
+
+        entry = store.current_entry(self.params)
+        if entry is None:
+            from . import data_prep
+
+            entry = data_prep.processed_entry(self.params)
+        return _Loaded(
+            key=key,
+            entry=entry,
+            table=store.read_table(entry),
+            asset_index=store.AssetIndex.load(entry / store.INDEX_FILE),
+            derived={},
+        )
+
+    def handle(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        from . import store
+
+        op = payload.get("op")
+        loaded = self.current()
+        if op == "ping":
+            return {"key": loaded.key, "rows": loaded.table.num_rows}
+        if op == "show":
+            selection = store.select(
+                loaded.asset_index,
+                payload.get("symbols", ()),
+                payload.get("ids", ()),
+                payload.get("indices", ()),
+                rank_range=payload.get("rank_range"),
+                everything=bool(payload.get("all")),
+                table=loaded.table,
+            )
+            rows = store.take_rows(
+                loaded.table, selection.offsets, payload.get("columns")
+            )
+            return {
+                "rows": rows,
+                "missing": selection.missing,
+                "ambiguous": selection.ambiguous,
+            }
+        if op == "top-k":
+            k = int(payload["k"])
+            if k < 0:
+                raise ValueError("k must be >= 0.")
+            order = loaded.rank_order(payload["by"], bool(payload.get("ascending")))
+            rows = store.take_rows(loaded.table, order[:k], payload.get("columns"))
+            return {"rows": rows}
+        if op == "export":
+            from . import export
+
+            filters = payload.get("filters")
+            rows = export.export(
+                payload["out"],
+                fmt=payload.get("format"),
+                compression=payload.get("compression"),
+                columns=payload.get("columns"),
+                filters=[tuple(f) for f in filters] if filters else None,
+                table=loaded.table,
+            )
+            return {"rows": rows}
+        raise ValueError(f"Unknown daemon request {op!r}.")
+
+
+def serve(
+    socket_path: Optional[Path] = None,
+    params: Optional[ModelParams] = None,
+    ready: Optional[Callable[[], None]] = None,
+) -> None:
+    """Answer requests on ``socket_path`` until interrupted or terminated.
+
+    The table is loaded before the socket starts listening, so the first
+    request is as fast as the rest. ``ready`` (if given) is called once
+    listening.
+    """
+    import os
+    import signal
+    import sys
+
+    path = Path(socket_path or config.DAEMON_SOCKET)
+    if path.exists():
+        if request({"op": "ping"}, path) is not None:
+            raise RuntimeError(f"A daemon is already listening on {path}.")
+        # Left behind by a daemon that did not shut down cleanly
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    daemon = QueryDaemon(params)
+    daemon.current()
+    server = _make_server(path, daemon)
+    # SIGTERM unwinds like Ctrl-C, so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        if ready is not None:
+            ready()
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if path.exists():
+            os.unlink(path)
+
+
+def _make_server(path: Path, daemon: QueryDaemon):
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            try:
+                reply = daemon.handle(json.loads(self.rfile.readline()))
+            except Exception as exc:
+                reply = {"error": type(exc).__name__, "message": str(exc)}
+            self.wfile.write(json.dumps(reply, default=str).encode("utf-8") + b"\n")
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    return Server(str(path), Handler)
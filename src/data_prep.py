@@ -1,8 +1,76 @@
 from __future__ import annotations
 
+import dataclasses
+import json
+import re
+import warnings
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 
-from . import config, equilibrium
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    from pyarrow import dataset as pa_ds
+    from pyarrow import feather as pa_feather
+    from pyarrow import parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional for ingestion
+    pa = None
+    pa_csv = None
+    pa_ds = None
+    pa_feather = None
+    pq = None
+
+from . import cache, config, equilibrium
+from .equilibrium import DEFAULT_PARAMS, ModelParams
+from .market_map import MapTiles
+from .store import (
+    INDEX_FILE,
+    LOOKUP_FILE,
+    LOOKUP_KEY_COL,
+    LOOKUP_ROW_COL,
+    PROCESSED_FILES,
+    TILES_FILE,
+    AssetIndex,
+    processed_key,
+    processed_path,
+)
+
+
+# Columns coerced to numeric (errors become NaN) during cleaning
+NUMERIC_COLS = [
+    col for col, dtype in config.RAW_SCHEMA.items() if dtype != "string"
+]
+
+# Compact in-memory dtypes for the processed table (see compact_frame).
+# Forces are percentile ranks in [-1, 1], so float32 loses nothing visible.
+COMPACT_DTYPES = {
+    config.COL_SYMBOL: "category",
+    config.COL_NAME: "category",
+    config.COL_MARKET_CAP_RANK: "int32",
+    config.COL_FORCE_DEMAND: "float32",
+    config.COL_FORCE_SUPPLY: "float32",
+    config.COL_FORCE_VOLATILITY: "float32",
+    config.COL_FORCE_LIQUIDITY: "float32",
+    config.COL_FORCE_SPECULATION: "float32",
+}
+
+# Metadata file of the partitioned panel store (ignored by dataset readers)
+PANEL_STORE_META = "_store.json"
+
+# Parquet row-group size of both files: small enough that a filtered read
+# skips almost everything once the store holds millions of rows
+LOOKUP_ROW_GROUP_ROWS = 8192
+
+# Rows missing any of these are dropped
+REQUIRED_COLS = [
+    config.COL_SYMBOL,
+    config.COL_CURRENT_PRICE,
+    config.COL_MARKET_CAP,
+    config.COL_TOTAL_VOLUME,
+]
 
 
 def load_raw() -> pd.DataFrame:
@@ -14,71 +82,688 @@ def load_raw() -> pd.DataFrame:
     return df
 
 
-def clean_and_engineer(df: pd.DataFrame) -> pd.DataFrame:
+def load_raw_typed(
+    path: Optional[Path] = None, columns: Optional[Sequence[str]] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Schema-driven raw CSV load: projected, typed, multithreaded.
+
+    Reads only ``columns`` (default: every column in the file; ingest passes
+    ``config.INGEST_RAW_COLS``) and parses numeric
+    columns straight to the dtypes declared in ``config.RAW_SCHEMA``, using
+    the multithreaded Arrow CSV reader when pyarrow is installed.
+
+    Returns ``(df, failures)``. If some value cannot be parsed as a number,
+    the affected columns are re-read as text and coerced (invalid values
+    become NaN), and ``failures`` lists each one as ``row``, ``column``,
+    ``value``; otherwise ``failures`` is empty.
+    """
+    path = Path(path) if path is not None else config.DATA_RAW
+    if not path.exists():
+        raise FileNotFoundError(f"Raw data not found at: {path}")
+
+    header = pd.read_csv(path, nrows=0).columns
+    if columns is None:
+        columns = list(header)
+    else:
+        # In file order, so projecting never reorders the frame
+        wanted = set(columns)
+        columns = [col for col in header if col in wanted]
+    numeric = [col for col in columns if col in NUMERIC_COLS]
+    text = [col for col in columns if col in config.RAW_SCHEMA and col not in numeric]
+
+    try:
+        return _read_csv_typed(path, columns, numeric, text), _empty_failures()
+    except (ValueError, TypeError):
+        # pyarrow.ArrowInvalid is a ValueError too
+        pass
+
+    # Slow path: numeric columns as text, coerced one by one
+    df = _read_csv_typed(path, columns, [], text + numeric)
+    failures: List[pd.DataFrame] = []
+    for col in numeric:
+        coerced = pd.to_numeric(df[col], errors="coerce")
+        bad = df[col].notna() & coerced.isna()
+        if bad.any():
+            failures.append(
+                pd.DataFrame(
+                    {
+                        "row": df.index[bad],
+                        "column": col,
+                        "value": df.loc[bad, col].astype(str).to_numpy(),
+                    }
+                )
+            )
+        df[col] = coerced
+    if not failures:
+        return df, _empty_failures()
+    return df, pd.concat(failures, ignore_index=True)
+
+
+def _read_csv_typed(
+    path: Path, columns: List[str], numeric: List[str], text: List[str]
+) -> pd.DataFrame:
+    if pa_csv is not None:
+        types = {col: pa.string() for col in text}
+        types.update(
+            {col: pa.type_for_alias(config.RAW_SCHEMA[col]) for col in numeric}
+        )
+        table = pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types=types,
+                strings_can_be_null=True,
+            ),
+        )
+        return table.to_pandas()
+
+    dtypes = {col: str for col in text}
+    dtypes.update({col: config.RAW_SCHEMA[col] for col in numeric})
+    return pd.read_csv(path, usecols=columns, dtype=dtypes)[columns]
+
+
+def _empty_failures() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "row": pd.Series(dtype="int64"),
+            "column": pd.Series(dtype="str"),
+            "value": pd.Series(dtype="str"),
+        }
+    )
+
+
+def _warn_failures(failures: pd.DataFrame, source: Path) -> None:
+    if len(failures):
+        counts = failures["column"].value_counts()
+        detail = ", ".join(f"{col} ({n})" for col, n in counts.items())
+        warnings.warn(
+            f"{len(failures)} values in {source} failed numeric coercion "
+            f"and were set to NaN: {detail}",
+            stacklevel=3,
+        )
+
+
+def load_raw_panel(
+    paths: Optional[Iterable[Path]] = None,
+    key: str = "file",
+    freq: str = "h",
+) -> pd.DataFrame:
+    """Load many raw snapshots into one panel frame.
+
+    Each row gets a ``config.COL_SNAPSHOT`` key:
+
+    - key="file": the snapshot file's stem (one snapshot per file)
+    - key="last_updated": ``last_updated`` floored to ``freq``, so
+      concatenated dumps are split by collection time
+
+    ``paths`` defaults to every CSV in ``config.DATA_RAW_SNAPSHOTS_DIR``.
+    """
+    if key not in ("file", "last_updated"):
+        raise ValueError(f"Unknown snapshot key: {key}")
+    if paths is None:
+        paths = sorted(config.DATA_RAW_SNAPSHOTS_DIR.glob("*.csv"))
+    paths = [Path(p) for p in paths]
+    if not paths:
+        raise FileNotFoundError(
+            f"No raw snapshots found in: {config.DATA_RAW_SNAPSHOTS_DIR}"
+        )
+
+    frames = []
+    for path in paths:
+        frame, failures = load_raw_typed(path, columns=config.INGEST_RAW_COLS)
+        _warn_failures(failures, path)
+        frames.append(frame)
+    df = pd.concat(frames, ignore_index=True)
+    if key == "file":
+        df[config.COL_SNAPSHOT] = np.repeat(
+            [path.stem for path in paths], [len(frame) for frame in frames]
+        )
+    else:
+        df[config.COL_SNAPSHOT] = pd.to_datetime(
+            df[config.COL_LAST_UPDATED], utc=True, errors="coerce"
+        ).dt.floor(freq)
+    return df
+
+
+def clean_and_engineer(
+    df: pd.DataFrame,
+    columnar: bool = False,
+    by: Optional[str] = None,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> pd.DataFrame:
     """Basic cleaning and feature engineering.
 
     - Ensures numeric types where appropriate
     - Computes liquidity, volatility, and speculation indices
     - Computes equilibrium forces and outputs
+
+    With ``columnar=True`` the same result is produced without copying the
+    whole frame at every step: only the numeric columns are coerced, the
+    model runs on those alone (see ``equilibrium.compute_derived``), and the
+    derived columns are joined onto the filtered source frame once.
+
+    ``by`` names a snapshot column for panel data (see ``load_raw_panel``);
+    ranks are then taken within each snapshot.
     """
+    if columnar:
+        return _clean_and_engineer_columnar(df, by, params)
+
     df = df.copy()
 
     # Ensure numeric for key columns (coerce errors to NaN)
-    numeric_cols = [
-        config.COL_MARKET_CAP_RANK,
-        config.COL_CURRENT_PRICE,
-        config.COL_MARKET_CAP,
-        config.COL_FULLY_DILUTED_VALUATION,
-        config.COL_TOTAL_VOLUME,
-        config.COL_HIGH_24H,
-        config.COL_LOW_24H,
-        config.COL_CIRC_SUPPLY,
-        config.COL_TOTAL_SUPPLY,
-        config.COL_MAX_SUPPLY,
-        config.COL_ATH,
-        config.COL_ATH_CHANGE_PCT,
-        config.COL_ATL,
-        config.COL_ATL_CHANGE_PCT,
-        config.COL_PRICE_CHANGE_24H,
-        config.COL_PCT_CHANGE_24H,
-        config.COL_PCT_CHANGE_1H,
-        config.COL_PCT_CHANGE_7D,
-        config.COL_PCT_CHANGE_30D,
-        config.COL_PCT_CHANGE_1Y,
-        config.COL_MARKET_CAP_CHANGE_24H,
-        config.COL_MARKET_CAP_PCT_CHANGE_24H,
-        config.COL_SUPPLY_UTILIZATION,
-    ]
-    for col in numeric_cols:
+    for col in NUMERIC_COLS:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
     # Drop rows missing critical price or market cap info
-    required = [
-        config.COL_SYMBOL,
-        config.COL_CURRENT_PRICE,
-        config.COL_MARKET_CAP,
-        config.COL_TOTAL_VOLUME,
-    ]
-    existing_required = [c for c in required if c in df.columns]
+    existing_required = [c for c in REQUIRED_COLS if c in df.columns]
     df = df.dropna(subset=existing_required)
 
     # Compute engineered metrics & equilibrium
-    df = equilibrium.compute_engineered_features(df)
-    df = equilibrium.compute_equilibrium(df)
+    df = equilibrium.compute_engineered_features(df, by=by)
+    df = equilibrium.compute_equilibrium(df, params=params, by=by)
 
     return df
 
 
-def load_processed() -> pd.DataFrame:
-    """Load processed data, computing and caching it if needed."""
-    config.DATA_PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    processed_path = config.DATA_PROCESSED_DIR / "crypto_equilibrium.parquet"
+def _clean_and_engineer_columnar(
+    df: pd.DataFrame,
+    by: Optional[str] = None,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> pd.DataFrame:
+    """Copy-free variant of ``clean_and_engineer`` (identical output)."""
+    # Coerce only the columns that are not numeric already
+    numeric = {}
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            values = df[col]
+            if not pd.api.types.is_numeric_dtype(values):
+                values = pd.to_numeric(values, errors="coerce")
+            numeric[col] = values
+
+    keep = pd.Series(True, index=df.index)
+    for col in REQUIRED_COLS:
+        if col in numeric:
+            keep &= numeric[col].notna()
+        elif col in df.columns:
+            keep &= df[col].notna()
+
+    if by is not None:
+        keep &= df[by].notna()
+    groups = df[by] if by is not None else None
+
+    filtered = not keep.all()
+    if filtered:
+        numeric = {col: values[keep] for col, values in numeric.items()}
+        groups = groups[keep] if groups is not None else None
+    derived = equilibrium.compute_derived(numeric, params=params, groups=groups)
+
+    # Single join: filtered source frame + coerced numerics + derived columns
+    out = df[keep] if filtered else df.copy(deep=False)
+    for col, values in numeric.items():
+        if values.dtype != df[col].dtype:
+            out[col] = values
+    for col in derived.columns:
+        out[col] = derived[col]
+    return out
+
+
+def processed_entry(params: ModelParams = DEFAULT_PARAMS) -> Path:
+    """Cache directory of the current processed artifact, built if missing."""
+    key = processed_key(params)
+    entry = cache.ProcessedCache().get(key)
+    if entry is None:
+        entry, _ = _build_processed(key, params)
+    return entry
+
+
+def load_processed(
+    params: ModelParams = DEFAULT_PARAMS,
+    filters: Optional[list] = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    """Load processed data, computing and caching it if needed.
+
+    Artifacts live in ``config.DATA_PROCESSED_CACHE_DIR`` under a fingerprint
+    of the raw file, ``params`` and the code version (see
+    ``cache.fingerprint``), so a new raw CSV or different model parameters
+    are picked up automatically. Checking a warm cache costs two ``stat``
+    calls; least recently used artifacts are evicted beyond
+    ``config.PROCESSED_CACHE_MAX_BYTES``.
+
+    The table is stored as ``config.PROCESSED_FORMAT`` (see
+    ``read_processed``).
+
+    With ``filters`` (partition predicates in pandas/pyarrow form, e.g.
+    ``[("snapshot_date", ">=", "2025-12-01"), ("rank_bucket", "==", 0)]``)
+    the matching slices of the partitioned panel store are read instead;
+    see ``load_panel``.
+
+    ``compact=True`` returns the resident-memory layout of ``compact_frame``:
+    display-only columns are not read at all and the rest use
+    ``COMPACT_DTYPES``.
+    """
+    if filters is not None:
+        df = load_panel(filters, params=params)
+        return compact_frame(df) if compact else df
+    key = processed_key(params)
+    entry = cache.ProcessedCache().get(key)
+    if entry is None:
+        _, df_proc = _build_processed(key, params)
+        return compact_frame(df_proc) if compact else df_proc
+    if not compact:
+        return read_processed(entry)
+    resident = [
+        col
+        for col in processed_columns(entry)
+        if col not in config.DISPLAY_ONLY_COLS
+    ]
+    return compact_frame(read_processed(entry, columns=resident))
+
+
+def _build_processed(key: str, params: ModelParams) -> Tuple[Path, pd.DataFrame]:
+    df_raw, failures = load_raw_typed(columns=config.INGEST_RAW_COLS)
+    _warn_failures(failures, config.DATA_RAW)
+    df_proc = clean_and_engineer(df_raw, columnar=True, params=params)
+
+    entry = cache.ProcessedCache().put(
+        key, lambda directory: write_processed(df_proc, directory)
+    )
+    return entry, df_proc
+
+
+def read_processed(
+    entry: Path, columns: Optional[Sequence[str]] = None, fmt: Optional[str] = None
+) -> pd.DataFrame:
+    """Read the processed table (or some of its columns) from a cache entry.
+
+    The ``"feather"`` format is an uncompressed Arrow IPC file opened with
+    memory mapping: there is no decompression or decode step, columns are
+    views of the mapped file where pandas allows it, and concurrent
+    processes share the pages through the OS page cache.
+    """
+    fmt = fmt or config.PROCESSED_FORMAT
+    path = processed_path(entry, fmt)
+    if fmt == "feather":
+        _require_pyarrow(fmt)
+        table = pa_feather.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+    return pd.read_parquet(path, columns=columns)
+
+
+def processed_columns(entry: Path, fmt: Optional[str] = None) -> List[str]:
+    """Column names of the processed table, from the file schema only."""
+    fmt = fmt or config.PROCESSED_FORMAT
+    path = processed_path(entry, fmt)
+    if fmt == "feather":
+        _require_pyarrow(fmt)
+        return pa.ipc.open_file(pa.memory_map(str(path))).schema.names
+    if pq is not None:
+        return pq.read_schema(path).names
+    return list(pd.read_parquet(path).columns)
 
-    if processed_path.exists():
-        return pd.read_parquet(processed_path)
 
-    df_raw = load_raw()
-    df_proc = clean_and_engineer(df_raw)
-    df_proc.to_parquet(processed_path, index=False)
-    return df_proc
+def compact_frame(df: pd.DataFrame, drop_display: bool = True) -> pd.DataFrame:
+    """Processed frame in its compact resident layout.
+
+    Drops ``config.DISPLAY_ONLY_COLS`` (fetch them per row with
+    ``lookup_index`` when a view needs them) and applies ``COMPACT_DTYPES``:
+    dictionary-encoded symbols and names, int32 rank and float32 forces.
+    A rank column holding NaN keeps its float dtype.
+    """
+    if drop_display:
+        df = df.drop(columns=[c for c in config.DISPLAY_ONLY_COLS if c in df.columns])
+    dtypes = {}
+    for col, dtype in COMPACT_DTYPES.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith("int") and df[col].isna().any():
+            continue
+        dtypes[col] = dtype
+    return df.astype(dtypes)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtype and bytes of ``df`` before and after ``compact_frame``.
+
+    Display-only columns show no compact dtype and zero resident bytes.
+    """
+    compact = compact_frame(df)
+    before = df.memory_usage(deep=True, index=False)
+    after = compact.memory_usage(deep=True, index=False)
+    return pd.DataFrame(
+        {
+            "dtype": df.dtypes.astype(str),
+            "bytes": before,
+            "compact_dtype": compact.dtypes.astype(str).reindex(df.columns),
+            "compact_bytes": after.reindex(df.columns, fill_value=0),
+        }
+    )
+
+
+def _require_pyarrow(fmt: str) -> None:
+    if pa is None:
+        raise ImportError(f"The {fmt!r} processed format requires pyarrow.")
+
+
+def _write_feather(df: pd.DataFrame, path: Path) -> None:
+    # Float columns keep NaN as a value (not as Arrow nulls), so reading them
+    # back needs no null-filling copy
+    arrays = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_float_dtype(values):
+            arrays[col] = pa.array(values.to_numpy())
+        else:
+            arrays[col] = pa.array(values, from_pandas=True)
+    pa_feather.write_feather(pa.table(arrays), path, compression="uncompressed")
+
+
+def write_processed(
+    df: pd.DataFrame, directory: Path, fmt: Optional[str] = None
+) -> None:
+    """Write a processed table into a cache entry directory.
+
+    The table itself is written as ``fmt`` (default
+    ``config.PROCESSED_FORMAT``) in original row order; ``INDEX_FILE`` maps
+    symbols and ids to row offsets in it. ``LOOKUP_FILE`` holds
+    the same rows sorted by case-folded symbol, so the min/max statistics of
+    each row group cover a narrow key range and a symbol filter only has to
+    decode the one or two groups that can contain it. ``TILES_FILE`` holds
+    the Market Map density tiles (``market_map.MapTiles``).
+    """
+    fmt = fmt or config.PROCESSED_FORMAT
+    path = processed_path(directory, fmt)
+    if fmt == "feather":
+        _require_pyarrow(fmt)
+        _write_feather(df.reset_index(drop=True), path)
+    else:
+        df.to_parquet(path, index=False, row_group_size=LOOKUP_ROW_GROUP_ROWS)
+    AssetIndex.build(df).save(directory / INDEX_FILE)
+    MapTiles.build(df[config.COL_EQ_SHIFT], df[config.COL_TENSION_SCORE]).save(
+        directory / TILES_FILE
+    )
+
+    lookup = df.reset_index(drop=True)
+    lookup.insert(0, LOOKUP_ROW_COL, np.arange(len(lookup), dtype=np.int64))
+    lookup.insert(0, LOOKUP_KEY_COL, lookup[config.COL_SYMBOL].str.upper())
+    lookup = lookup.sort_values(LOOKUP_KEY_COL, kind="stable")
+    lookup.to_parquet(
+        directory / LOOKUP_FILE,
+        index=False,
+        row_group_size=LOOKUP_ROW_GROUP_ROWS,
+    )
+
+
+def load_asset_index(entry: Optional[Path] = None) -> AssetIndex:
+    """Symbol/id index of ``entry`` (default: the current processed artifact)."""
+    entry = entry if entry is not None else processed_entry()
+    return AssetIndex.load(entry / INDEX_FILE)
+
+
+def load_map_tiles(entry: Optional[Path] = None) -> MapTiles:
+    """Market Map tiles of ``entry`` (default: the current processed artifact)."""
+    entry = entry if entry is not None else processed_entry()
+    return MapTiles.load(entry / TILES_FILE)
+
+
+def lookup_symbol(
+    symbol: str,
+    columns: Optional[Sequence[str]] = None,
+    entry: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Rows whose symbol matches ``symbol`` (case-insensitive).
+
+    Reads only ``columns`` (default: all) from the symbol-sorted lookup file
+    of ``entry`` (default: the current processed artifact) with the symbol
+    predicate pushed down to the parquet reader. The result is indexed by
+    row position in the processed table, in table order; it is empty when
+    the symbol is unknown.
+    """
+    entry = entry if entry is not None else processed_entry()
+    read_cols = None if columns is None else [LOOKUP_ROW_COL, *columns]
+    df = pd.read_parquet(
+        entry / LOOKUP_FILE,
+        columns=read_cols,
+        filters=[(LOOKUP_KEY_COL, "==", symbol.upper())],
+    )
+    df = df.set_index(LOOKUP_ROW_COL).sort_index()
+    df.index.name = None
+    return df.drop(columns=LOOKUP_KEY_COL, errors="ignore")
+
+
+def lookup_index(
+    index: int,
+    columns: Optional[Sequence[str]] = None,
+    entry: Optional[Path] = None,
+    fmt: Optional[str] = None,
+) -> pd.Series:
+    """Row ``index`` of the processed table.
+
+    Parquet stores decode the single row group holding the row; a feather
+    store slices the memory-mapped table, touching only that row's pages.
+    """
+    entry = entry if entry is not None else processed_entry()
+    fmt = fmt or config.PROCESSED_FORMAT
+    path = processed_path(entry, fmt)
+    if fmt == "feather":
+        _require_pyarrow(fmt)
+        table = pa_feather.read_table(path, columns=columns, memory_map=True)
+        if index < 0 or index >= table.num_rows:
+            raise IndexError(
+                f"Index {index} out of range for dataset of size {table.num_rows}."
+            )
+        row = table.slice(index, 1).to_pandas().iloc[0]
+        row.name = index
+        return row
+
+    if pq is None:
+        df = pd.read_parquet(path, columns=columns)
+        if index < 0 or index >= len(df):
+            raise IndexError(
+                f"Index {index} out of range for dataset of size {len(df)}."
+            )
+        return df.iloc[index]
+
+    parquet = pq.ParquetFile(path)
+    meta = parquet.metadata
+    if index < 0 or index >= meta.num_rows:
+        raise IndexError(
+            f"Index {index} out of range for dataset of size {meta.num_rows}."
+        )
+    ends = np.cumsum([meta.row_group(i).num_rows for i in range(meta.num_row_groups)])
+    group = int(np.searchsorted(ends, index, side="right"))
+    start = int(ends[group - 1]) if group else 0
+    table = parquet.read_row_group(group, columns=columns)
+    row = table.slice(index - start, 1).to_pandas().iloc[0]
+    row.name = index
+    return row
+
+
+def prepare_panel(
+    paths: Optional[Iterable[Path]] = None,
+    key: str = "file",
+    freq: str = "h",
+) -> pd.DataFrame:
+    """Load raw snapshots and compute features / equilibrium per snapshot."""
+    df_raw = load_raw_panel(paths, key=key, freq=freq)
+    return clean_and_engineer(df_raw, columnar=True, by=config.COL_SNAPSHOT)
+
+
+def _store_meta(params: ModelParams) -> dict:
+    # Round-tripped through JSON so it compares equal to the stored copy
+    meta = {
+        "params": dataclasses.asdict(params),
+        "code": config.PROCESSED_CODE_VERSION,
+    }
+    return json.loads(json.dumps(meta))
+
+
+def _check_store(root: Path, params: ModelParams) -> None:
+    meta_path = root / PANEL_STORE_META
+    if not meta_path.exists():
+        return
+    with open(meta_path, encoding="utf-8") as fh:
+        stored = json.load(fh)
+    if stored != _store_meta(params):
+        raise ValueError(
+            f"Panel store {root} was built with different model parameters or "
+            "code version; write to a new store instead of mixing them."
+        )
+
+
+def _snapshot_slug(snapshot) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(snapshot)).strip("_") or "snapshot"
+
+
+def write_panel_partitions(
+    df: pd.DataFrame,
+    root: Optional[Path] = None,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> List[Path]:
+    """Write processed panel rows into the partitioned panel store.
+
+    Files go to ``root/snapshot_date=<date>/rank_bucket=<bucket>/<snapshot>.parquet``
+    (``root`` defaults to ``config.DATA_PROCESSED_PANEL_DIR``). The date is
+    the day of the snapshot's latest ``last_updated`` and the bucket is
+    ``(market_cap_rank - 1) // config.RANK_BUCKET_SIZE`` (-1 when unranked).
+
+    Ranks are taken within each snapshot, so a snapshot's rows never change
+    when others are added: only the given snapshots' files are (re)written
+    and every other partition is left untouched. Returns the written paths.
+    """
+    if pq is None:
+        raise ImportError("The partitioned panel store requires pyarrow.")
+    root = Path(root) if root is not None else config.DATA_PROCESSED_PANEL_DIR
+    _check_store(root, params)
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / PANEL_STORE_META, "w", encoding="utf-8") as fh:
+        json.dump(_store_meta(params), fh)
+
+    snapshot = df[config.COL_SNAPSHOT]
+    updated = pd.to_datetime(df[config.COL_LAST_UPDATED], utc=True, errors="coerce")
+    snapshot_date = (
+        updated.groupby(snapshot, sort=False)
+        .transform("max")
+        .dt.strftime("%Y-%m-%d")
+        .fillna("unknown")
+    )
+    rank = pd.to_numeric(df[config.COL_MARKET_CAP_RANK], errors="coerce")
+    rank_bucket = ((rank - 1) // config.RANK_BUCKET_SIZE).fillna(-1).astype(int)
+
+    written = []
+    partition_glob = "/".join("*" for _ in config.PANEL_PARTITION_COLS)
+    for snap in snapshot.unique():
+        # Drop this snapshot's previous files, wherever its rows landed before
+        slug = _snapshot_slug(snap)
+        for old in root.glob(f"{partition_glob}/{slug}.parquet"):
+            old.unlink()
+
+    groups = df.groupby(
+        [snapshot_date.to_numpy(), rank_bucket.to_numpy(), snapshot.to_numpy()],
+        sort=False,
+    )
+    for (date, bucket, snap), part in groups:
+        directory = root.joinpath(
+            *(
+                f"{col}={value}"
+                for col, value in zip(config.PANEL_PARTITION_COLS, (date, bucket))
+            )
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{_snapshot_slug(snap)}.parquet"
+        part.to_parquet(path, index=False)
+        written.append(path)
+    return written
+
+
+def append_snapshots(
+    paths: Iterable[Path],
+    root: Optional[Path] = None,
+    key: str = "file",
+    freq: str = "h",
+    params: ModelParams = DEFAULT_PARAMS,
+) -> List[Path]:
+    """Process new raw snapshot CSVs and add them to the panel store."""
+    df_raw = load_raw_panel(paths, key=key, freq=freq)
+    df = clean_and_engineer(
+        df_raw, columnar=True, by=config.COL_SNAPSHOT, params=params
+    )
+    return write_panel_partitions(df, root=root, params=params)
+
+
+def panel_dataset(
+    root: Optional[Path] = None, params: ModelParams = DEFAULT_PARAMS
+) -> "pa_ds.Dataset":
+    """Open the partitioned panel store as a hive-partitioned dataset.
+
+    ``snapshot_date`` and ``rank_bucket`` come back as columns. Raises if
+    the store is missing or was built with other model parameters.
+    """
+    if pa_ds is None:
+        raise ImportError("The partitioned panel store requires pyarrow.")
+    root = Path(root) if root is not None else config.DATA_PROCESSED_PANEL_DIR
+    if not root.is_dir():
+        raise FileNotFoundError(f"Panel store not found at: {root}")
+    _check_store(root, params)
+    return pa_ds.dataset(
+        root,
+        format="parquet",
+        partitioning=pa_ds.partitioning(
+            pa.schema(
+                list(zip(config.PANEL_PARTITION_COLS, [pa.string(), pa.int32()]))
+            ),
+            flavor="hive",
+        ),
+    )
+
+
+def panel_filters(
+    dates: Optional[Tuple[str, str]] = None,
+    rank_range: Optional[Tuple[int, int]] = None,
+) -> Optional[List[tuple]]:
+    """Partition predicates selecting snapshot days and market-cap ranks.
+
+    ``dates`` is an inclusive ``(first, last)`` pair of ``YYYY-MM-DD`` days.
+    ``rank_range`` maps to the rank buckets holding those ranks; combine it
+    with ``store.row_filters`` for the exact ranks inside the edge buckets.
+    """
+    date_col, bucket_col = config.PANEL_PARTITION_COLS
+    filters = []
+    if dates is not None:
+        first, last = dates
+        filters.append((date_col, ">=", first))
+        filters.append((date_col, "<=", last))
+    if rank_range is not None:
+        lo, hi = rank_range
+        size = config.RANK_BUCKET_SIZE
+        filters.append((bucket_col, ">=", (lo - 1) // size))
+        filters.append((bucket_col, "<=", (hi - 1) // size))
+    return filters or None
+
+
+def load_panel(
+    filters: Optional[list] = None,
+    columns: Optional[Sequence[str]] = None,
+    root: Optional[Path] = None,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> pd.DataFrame:
+    """Read the partitioned panel store, touching only matching partitions.
+
+    ``filters`` use the pandas/pyarrow DNF form. Predicates on
+    ``snapshot_date`` and ``rank_bucket`` prune whole directories before any
+    file is opened (see ``panel_filters``); predicates on other columns are
+    pushed down to the parquet row groups. Rows come back ordered by
+    snapshot, then rank.
+    """
+    dataset = panel_dataset(root, params)
+    expression = pq.filters_to_expression(filters) if filters else None
+    table = dataset.to_table(columns=columns, filter=expression)
+    df = table.to_pandas()
+    order = [
+        col for col in (config.COL_SNAPSHOT, config.COL_MARKET_CAP_RANK) if col in df
+    ]
+    if order:
+        df = df.sort_values(order, kind="stable", ignore_index=True)
+    return df
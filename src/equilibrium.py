@@ -1,11 +1,36 @@
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Dict, Mapping, Optional
 
 import numpy as np
 import pandas as pd
 
 from . import config
+from .params import (
+    BAND_MAX,
+    BAND_MIN,
+    BAND_SPECULATION_COEF,
+    BAND_VOLATILITY_COEF,
+    BASE_BAND_WIDTH,
+    DEFAULT_PARAMS,
+    DEMAND_MOMENTUM_WEIGHT,
+    DEMAND_VOLUME_WEIGHT,
+    FORCE_WEIGHTS,
+    SHIFT_SCALE,
+    ModelParams,
+)
+
+# Numeric columns read by the feature and equilibrium steps
+MODEL_INPUT_COLS = [
+    config.COL_CURRENT_PRICE,
+    config.COL_MARKET_CAP,
+    config.COL_TOTAL_VOLUME,
+    config.COL_CIRC_SUPPLY,
+    config.COL_MAX_SUPPLY,
+    config.COL_PCT_CHANGE_24H,
+    config.COL_PCT_CHANGE_7D,
+    config.COL_SUPPLY_UTILIZATION,
+]
 
 
 def _safe_divide(a: pd.Series, b: pd.Series) -> pd.Series:
@@ -13,13 +38,27 @@ def _safe_divide(a: pd.Series, b: pd.Series) -> pd.Series:
     return a / b.replace(0, np.nan)
 
 
-def _rank_to_unit(s: pd.Series, ascending: bool = True) -> pd.Series:
+def _rank_to_unit(
+    s: pd.Series, ascending: bool = True, groups: Optional[pd.Series] = None
+) -> pd.Series:
     """Map a series to [-1, 1] based on rank.
 
     - ascending=True: low values -> -1, high values -> +1
     - ascending=False: high values -> -1, low values -> +1
+
+    With ``groups`` (e.g. a snapshot key aligned on ``s``), ranks are
+    percentiles within each group, computed for all groups in one pass.
     """
     s = s.astype(float)
+    if groups is not None:
+        grouped = s.groupby(groups, sort=False)
+        ranks = grouped.rank(pct=True, method="average")
+        if not ascending:
+            ranks = 1.0 - ranks
+        # Constant or all-NaN groups map to 0, as whole columns do below
+        constant = grouped.transform("nunique") <= 1
+        return (2.0 * (ranks - 0.5)).mask(constant, 0.0)
+
     # Handle constant or all-NaN columns gracefully
     if s.nunique(dropna=True) <= 1:
         return pd.Series(0.0, index=s.index)
@@ -30,28 +69,44 @@ def _rank_to_unit(s: pd.Series, ascending: bool = True) -> pd.Series:
     return 2.0 * (ranks - 0.5)
 
 
-def compute_engineered_features(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute liquidity, volatility, and speculation helper columns."""
-    df = df.copy()
+def _engineered_columns(
+    df: Mapping[str, pd.Series], groups: Optional[pd.Series] = None
+) -> Dict[str, pd.Series]:
+    """Derive liquidity, volatility, speculation (and, if needed, supply
+    utilization) columns from the raw numeric inputs.
+
+    Accepts either a DataFrame or a plain mapping of column name -> Series and
+    returns only the newly derived columns, in output order. With ``groups``
+    the supply-utilization fallback is decided per group.
+    """
+    out: Dict[str, pd.Series] = {}
 
     # Liquidity ratio: how much volume relative to market cap
-    df[config.COL_LIQUIDITY_RATIO] = _safe_divide(
+    out[config.COL_LIQUIDITY_RATIO] = _safe_divide(
         df[config.COL_TOTAL_VOLUME], df[config.COL_MARKET_CAP]
     )
 
     # Volatility measures based on percentage price changes
-    df[config.COL_VOLATILITY_24H] = df[config.COL_PCT_CHANGE_24H].abs()
-    df[config.COL_VOLATILITY_7D] = df[config.COL_PCT_CHANGE_7D].abs()
+    out[config.COL_VOLATILITY_24H] = df[config.COL_PCT_CHANGE_24H].abs()
+    out[config.COL_VOLATILITY_7D] = df[config.COL_PCT_CHANGE_7D].abs()
 
     # Speculation index: amplified short-term swings weighted by liquidity
-    df[config.COL_SPECULATION_INDEX] = (
-        df[config.COL_VOLATILITY_24H].fillna(0.0)
-        + df[config.COL_VOLATILITY_7D].fillna(0.0)
-    ) * df[config.COL_LIQUIDITY_RATIO].fillna(0.0)
+    out[config.COL_SPECULATION_INDEX] = (
+        out[config.COL_VOLATILITY_24H].fillna(0.0)
+        + out[config.COL_VOLATILITY_7D].fillna(0.0)
+    ) * out[config.COL_LIQUIDITY_RATIO].fillna(0.0)
 
     # Supply utilization: if not provided or constant, approximate from circs/max
-    if (
-        config.COL_SUPPLY_UTILIZATION in df.columns
+    if groups is not None and config.COL_SUPPLY_UTILIZATION in df:
+        util_given = df[config.COL_SUPPLY_UTILIZATION]
+        usable = util_given.groupby(groups, sort=False).transform("nunique") > 1
+        if not usable.all():
+            util = _safe_divide(df[config.COL_CIRC_SUPPLY], df[config.COL_MAX_SUPPLY])
+            out[config.COL_SUPPLY_UTILIZATION] = util_given.where(
+                usable, util.clip(lower=0.0, upper=1.0)
+            )
+    elif (
+        config.COL_SUPPLY_UTILIZATION in df
         and df[config.COL_SUPPLY_UTILIZATION].notna().any()
         and df[config.COL_SUPPLY_UTILIZATION].nunique(dropna=True) > 1
     ):
@@ -59,105 +114,175 @@ def compute_engineered_features(df: pd.DataFrame) -> pd.DataFrame:
         pass
     else:
         util = _safe_divide(df[config.COL_CIRC_SUPPLY], df[config.COL_MAX_SUPPLY])
-        df[config.COL_SUPPLY_UTILIZATION] = util.clip(lower=0.0, upper=1.0)
+        out[config.COL_SUPPLY_UTILIZATION] = util.clip(lower=0.0, upper=1.0)
 
-    return df
+    return out
 
 
-def compute_equilibrium(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute forces and equilibrium band for each asset.
+def compute_engineered_features(
+    df: pd.DataFrame, by: Optional[str] = None
+) -> pd.DataFrame:
+    """Compute liquidity, volatility, and speculation helper columns.
 
-    The idea:
+    ``by`` names a grouping column (e.g. ``config.COL_SNAPSHOT``) for panel
+    data; see ``compute_equilibrium``.
+    """
+    groups = df[by] if by is not None else None
+    df = df.copy()
+    for col, values in _engineered_columns(df, groups).items():
+        df[col] = values
+    return df
 
-    - Demand force: driven by volume and recent positive momentum
-    - Supply force: driven by supply utilization (scarcity)
-    - Volatility force: driven by recent volatility (acts as destabiliser)
-    - Liquidity force: driven by liquidity ratio (stabiliser when high)
-    - Speculation force: driven by speculation index (short-term hype)
 
-    These forces are combined into a raw equilibrium shift, which is then
-    scaled and applied to current_price to obtain center / band.
+def _equilibrium_columns(
+    df: Mapping[str, pd.Series],
+    params: ModelParams = DEFAULT_PARAMS,
+    groups: Optional[pd.Series] = None,
+) -> Dict[str, pd.Series]:
+    """Compute force and equilibrium columns from engineered inputs.
+
+    Accepts either a DataFrame or a plain mapping of column name -> Series and
+    returns only the derived force / band / tension columns, in output order.
+    With ``groups``, every rank is taken within its group.
     """
-    df = df.copy()
+    out: Dict[str, pd.Series] = {}
 
     # --- Demand force: high volume and strong 7d positive momentum -> positive ---
     vol = df[config.COL_TOTAL_VOLUME].fillna(0.0)
     mom_7d = df[config.COL_PCT_CHANGE_7D].fillna(0.0)
-    demand_score = 0.6 * _rank_to_unit(vol, ascending=True) + 0.4 * _rank_to_unit(
-        mom_7d, ascending=True
+    demand_score = DEMAND_VOLUME_WEIGHT * _rank_to_unit(
+        vol, ascending=True, groups=groups
+    ) + DEMAND_MOMENTUM_WEIGHT * _rank_to_unit(
+        mom_7d, ascending=True, groups=groups
     )
-    df[config.COL_FORCE_DEMAND] = demand_score.clip(-1.0, 1.0)
+    out[config.COL_FORCE_DEMAND] = demand_score.clip(-1.0, 1.0)
 
     # --- Supply force: higher utilization -> more scarcity -> positive ---
     supply_util = df[config.COL_SUPPLY_UTILIZATION].fillna(0.0)
-    supply_force = _rank_to_unit(supply_util, ascending=True)
-    df[config.COL_FORCE_SUPPLY] = supply_force.clip(-1.0, 1.0)
+    supply_force = _rank_to_unit(supply_util, ascending=True, groups=groups)
+    out[config.COL_FORCE_SUPPLY] = supply_force.clip(-1.0, 1.0)
 
     # --- Volatility force: more volatility -> more instability (negative towards equilibrium) ---
     vol_7d = df[config.COL_VOLATILITY_7D].fillna(0.0)
-    volatility_force = _rank_to_unit(vol_7d, ascending=False)
+    volatility_force = _rank_to_unit(vol_7d, ascending=False, groups=groups)
     # Here: high volatility -> more negative
-    df[config.COL_FORCE_VOLATILITY] = volatility_force.clip(-1.0, 1.0)
+    out[config.COL_FORCE_VOLATILITY] = volatility_force.clip(-1.0, 1.0)
 
     # --- Liquidity force: high liquidity ratio -> stabilising positive force ---
     liq_ratio = df[config.COL_LIQUIDITY_RATIO].fillna(0.0)
-    liquidity_force = _rank_to_unit(liq_ratio, ascending=True)
-    df[config.COL_FORCE_LIQUIDITY] = liquidity_force.clip(-1.0, 1.0)
+    liquidity_force = _rank_to_unit(liq_ratio, ascending=True, groups=groups)
+    out[config.COL_FORCE_LIQUIDITY] = liquidity_force.clip(-1.0, 1.0)
 
     # --- Speculation force: short-term hype, can push price away from fundamentals ---
     spec_idx = df[config.COL_SPECULATION_INDEX].fillna(0.0)
-    speculation_force = _rank_to_unit(spec_idx, ascending=True)
-    df[config.COL_FORCE_SPECULATION] = speculation_force.clip(-1.0, 1.0)
+    speculation_force = _rank_to_unit(spec_idx, ascending=True, groups=groups)
+    out[config.COL_FORCE_SPECULATION] = speculation_force.clip(-1.0, 1.0)
 
     # --- Combine forces into equilibrium shift ---
-    # Weights are deliberately simple and interpretable
-    w_demand = 0.35
-    w_supply = 0.20
-    w_volatility = -0.20  # more volatility pulls away from stable equilibrium
-    w_liquidity = 0.15
-    w_speculation = 0.30
+    # Weights are deliberately simple and interpretable; the volatility
+    # weight is negative (more volatility pulls away from stable equilibrium)
+    w_demand, w_supply, w_volatility, w_liquidity, w_speculation = (
+        params.force_weights
+    )
 
     raw_shift = (
-        w_demand * df[config.COL_FORCE_DEMAND]
-        + w_supply * df[config.COL_FORCE_SUPPLY]
-        + w_volatility * df[config.COL_FORCE_VOLATILITY]
-        + w_liquidity * df[config.COL_FORCE_LIQUIDITY]
-        + w_speculation * df[config.COL_FORCE_SPECULATION]
+        w_demand * out[config.COL_FORCE_DEMAND]
+        + w_supply * out[config.COL_FORCE_SUPPLY]
+        + w_volatility * out[config.COL_FORCE_VOLATILITY]
+        + w_liquidity * out[config.COL_FORCE_LIQUIDITY]
+        + w_speculation * out[config.COL_FORCE_SPECULATION]
     )
 
     # Limit the raw shift to a reasonable range
     raw_shift = raw_shift.clip(-1.0, 1.0)
 
     # Scale: we interpret raw_shift as a multiplier within a band, e.g. +/- 15%
-    shift_scale = 0.15
+    shift_scale = params.shift_scale
     equilibrium_shift = shift_scale * raw_shift
 
-    df[config.COL_EQ_SHIFT] = equilibrium_shift
+    out[config.COL_EQ_SHIFT] = equilibrium_shift
 
     # Compute equilibrium center & band around the *current* price
     price = df[config.COL_CURRENT_PRICE].astype(float)
     center = price * (1.0 + equilibrium_shift)
 
     # Band width grows with volatility and speculation
-    base_band_width = 0.05  # 5%
-    extra_from_volatility = 0.10 * (
-        (df[config.COL_FORCE_VOLATILITY] * -1.0 + 1.0) / 2.0
+    base_band_width = params.base_band_width  # 5% by default
+    extra_from_volatility = params.band_volatility_coef * (
+        (out[config.COL_FORCE_VOLATILITY] * -1.0 + 1.0) / 2.0
     )  # higher volatility -> wider band
-    extra_from_speculation = 0.05 * (
-        (df[config.COL_FORCE_SPECULATION] + 1.0) / 2.0
+    extra_from_speculation = params.band_speculation_coef * (
+        (out[config.COL_FORCE_SPECULATION] + 1.0) / 2.0
     )
     band_width = base_band_width + extra_from_volatility + extra_from_speculation
-    band_width = band_width.clip(0.05, 0.25)
+    band_width = band_width.clip(params.band_min, params.band_max)
 
     lower = center * (1.0 - band_width)
     upper = center * (1.0 + band_width)
 
-    df[config.COL_EQ_CENTER] = center
-    df[config.COL_EQ_LOWER] = lower
-    df[config.COL_EQ_UPPER] = upper
+    out[config.COL_EQ_CENTER] = center
+    out[config.COL_EQ_LOWER] = lower
+    out[config.COL_EQ_UPPER] = upper
 
     # Tension score: magnitude of raw shift plus volatility contribution
-    tension = raw_shift.abs() + (df[config.COL_FORCE_VOLATILITY] * -1.0 + 1.0) / 2.0
-    df[config.COL_TENSION_SCORE] = tension
+    tension = raw_shift.abs() + (out[config.COL_FORCE_VOLATILITY] * -1.0 + 1.0) / 2.0
+    out[config.COL_TENSION_SCORE] = tension
+
+    return out
 
+
+def compute_equilibrium(
+    df: pd.DataFrame,
+    params: ModelParams = DEFAULT_PARAMS,
+    by: Optional[str] = None,
+) -> pd.DataFrame:
+    """Compute forces and equilibrium band for each asset.
+
+    The idea:
+
+    - Demand force: driven by volume and recent positive momentum
+    - Supply force: driven by supply utilization (scarcity)
+    - Volatility force: driven by recent volatility (acts as destabiliser)
+    - Liquidity force: driven by liquidity ratio (stabiliser when high)
+    - Speculation force: driven by speculation index (short-term hype)
+
+    These forces are combined into a raw equilibrium shift, which is then
+    scaled and applied to current_price to obtain center / band. Weights,
+    scale and band constants come from ``params``.
+
+    For panel data holding many snapshots, ``by`` names the snapshot column:
+    every percentile rank is then taken within its snapshot (a grouped rank
+    over the whole panel, not a loop over snapshots).
+    """
+    groups = df[by] if by is not None else None
+    df = df.copy()
+    for col, values in _equilibrium_columns(df, params, groups).items():
+        df[col] = values
     return df
+
+
+def compute_derived(
+    df: Mapping[str, pd.Series],
+    params: ModelParams = DEFAULT_PARAMS,
+    groups: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """Columnar execution path: derived columns only, no frame copies.
+
+    Reads just the numeric model inputs from ``df`` (a DataFrame or a mapping
+    of column name -> Series; string columns such as ``name`` or ``image`` are
+    never touched) and returns a new frame holding only the engineered
+    features, forces, band and tension, aligned on the input index. Callers
+    join it onto their source frame once.
+
+    If supply utilization had to be approximated from circulating / max
+    supply, the approximated column is included as well and should replace
+    the source column on join. ``groups`` (aligned on the input) switches to
+    per-group ranking, as ``by`` does in ``compute_equilibrium``.
+    """
+    inputs: Dict[str, pd.Series] = {
+        col: df[col] for col in MODEL_INPUT_COLS if col in df
+    }
+    features = _engineered_columns(inputs, groups)
+    inputs.update(features)
+    outputs = _equilibrium_columns(inputs, params, groups)
+    return pd.DataFrame({**features, **outputs})
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
+from pyarrow import dataset as pa_ds
+from pyarrow import parquet as pq
+
+from . import config, data_prep
+
+# Output formats and the compressions the text formats accept
+FORMATS = ("parquet", "feather", "csv", "ndjson")
+COMPRESSIONS = ("gzip", "zstd")
+
+# Rows per record batch streamed from the store
+BATCH_ROWS = 64 * 1024
+
+_SUFFIX_FORMATS = {
+    ".parquet": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+_SUFFIX_COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+
+def infer_format(path: Union[str, Path]) -> Tuple[str, Optional[str]]:
+    """``(format, compression)`` from a file name such as ``x.csv.gz``."""
+    suffixes = [s.lower() for s in Path(str(path)).suffixes]
+    compression = None
+    if suffixes and suffixes[-1] in _SUFFIX_COMPRESSIONS:
+        compression = _SUFFIX_COMPRESSIONS[suffixes.pop()]
+    fmt = _SUFFIX_FORMATS.get(suffixes[-1]) if suffixes else None
+    if fmt is None:
+        raise ValueError(
+            f"Cannot infer export format from {path}; pass one of {FORMATS}."
+        )
+    return fmt, compression
+
+
+def _nan_to_null(batch: pa.RecordBatch) -> pa.RecordBatch:
+    # NaN is written as an empty field, as DataFrame.to_csv does
+    arrays = []
+    for column in batch.columns:
+        if pa.types.is_floating(column.type):
+            column = pc.if_else(pc.is_nan(column), None, column)
+        arrays.append(column)
+    return pa.RecordBatch.from_arrays(arrays, schema=batch.schema)
+
+
+_TEXT = pa.large_string()
+_json_dumps = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+def _text(value: str) -> pa.Scalar:
+    return pa.scalar(value, _TEXT)
+
+
+def _json_values(column: pa.Array) -> pa.Array:
+    """Each value of ``column`` as JSON text (null for null and non-finite)."""
+    kind = column.type
+    plain_text = (pa.types.is_string(kind) or pa.types.is_large_string(kind)) and not (
+        pc.any(pc.match_substring_regex(column, r"[\x00-\x1f]")).as_py()
+    )
+    if pa.types.is_floating(kind):
+        # Arrow formats doubles as the shortest text that round-trips, like
+        # repr (DataFrame.to_json keeps at most 15 significant digits)
+        text = pc.if_else(pc.is_finite(column), column.cast(_TEXT), None)
+    elif pa.types.is_integer(kind) or pa.types.is_boolean(kind):
+        text = column.cast(_TEXT)
+    elif plain_text:
+        # Without control characters, escaping is two substring replacements
+        text = pc.replace_substring(column.cast(_TEXT), "\\", "\\\\")
+        text = pc.replace_substring(text, '"', '\\"')
+        text = pc.binary_join_element_wise(_text('"'), text, _text('"'), _text(""))
+    else:
+        text = pa.array(
+            [None if v is None else _json_dumps(v) for v in column.to_pylist()],
+            _TEXT,
+        )
+    return pc.fill_null(text, "null")
+
+
+class _NdjsonWriter:
+    def __init__(self, sink, schema: pa.Schema) -> None:
+        self.sink = sink
+        self.keys = [
+            _text(("{" if i == 0 else ",") + _json_dumps(name) + ":")
+            for i, name in enumerate(schema.names)
+        ]
+
+    def write_batch(self, batch: pa.RecordBatch) -> None:
+        # Lines are assembled column-wise by Arrow, then written as one buffer
+        parts = []
+        for key, column in zip(self.keys, batch.columns):
+            parts += [key, _json_values(column)]
+        lines = pc.binary_join_element_wise(*parts, _text("}\n"), _text(""))
+        _, offsets, data = lines.buffers()
+        offsets = np.frombuffer(offsets, dtype=np.int64)
+        start, stop = offsets[lines.offset], offsets[lines.offset + len(lines)]
+        self.sink.write(memoryview(data)[start:stop])
+
+    def close(self) -> None:
+        pass
+
+
+def _open_writer(fmt: str, sink, schema: pa.Schema):
+    if fmt == "parquet":
+        return pq.ParquetWriter(sink, schema)
+    if fmt == "feather":
+        return pa.ipc.new_file(sink, schema)
+    if fmt == "csv":
+        return pa_csv.CSVWriter(sink, schema)
+    return _NdjsonWriter(sink, schema)
+
+
+def _source(entry: Optional[Path]) -> Path:
+    entry = entry if entry is not None else data_prep.processed_entry()
+    return data_prep.processed_path(entry)
+
+
+def export(
+    out: Union[str, Path],
+    fmt: Optional[str] = None,
+    compression: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[list] = None,
+    entry: Optional[Path] = None,
+    batch_rows: int = BATCH_ROWS,
+    table: Optional[pa.Table] = None,
+    panel: Optional[Path] = None,
+) -> int:
+    """Stream the processed table to ``out`` and return the rows written.
+
+    The store is scanned in record batches of ``batch_rows`` with ``columns``
+    projected and ``filters`` pushed down, and each batch is written as soon
+    as it is read, so memory stays bounded by a few batches whatever the
+    size of the store. ``out`` may be ``"-"`` for stdout. ``fmt`` and
+    ``compression`` default to what the file name implies (``csv`` for
+    stdout); ``compression`` (gzip or zstd) applies to csv and ndjson.
+    ``table`` exports an already loaded processed table instead of the store.
+    ``panel`` exports the partitioned panel store at that directory instead:
+    predicates on its partition columns (``data_prep.panel_filters``) skip
+    whole directories, and rows follow partition order.
+    """
+    to_stdout = str(out) == "-"
+    if fmt is None:
+        fmt, inferred = ("csv", None) if to_stdout else infer_format(out)
+        compression = compression or inferred
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {FORMATS}.")
+    if compression is not None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}."
+            )
+        if fmt not in ("csv", "ndjson"):
+            raise ValueError(f"{fmt} output is compressed internally; drop {compression}.")
+
+    if table is not None:
+        dataset = pa_ds.dataset(table)
+        scan_options = None
+    elif panel is not None:
+        dataset = data_prep.panel_dataset(panel)
+        scan_options = pa_ds.ParquetFragmentScanOptions(pre_buffer=False)
+    elif config.PROCESSED_FORMAT == "feather":
+        dataset = pa_ds.dataset(_source(entry), format="ipc")
+        scan_options = None
+    else:
+        dataset = pa_ds.dataset(_source(entry), format="parquet")
+        # Pre-buffering would coalesce reads of the whole file up front
+        scan_options = pa_ds.ParquetFragmentScanOptions(pre_buffer=False)
+    expression = pq.filters_to_expression(filters) if filters else None
+    scanner = dataset.scanner(
+        columns=list(columns) if columns is not None else None,
+        filter=expression,
+        batch_size=batch_rows,
+        # A threaded scan decodes ahead of a slower writer without bound;
+        # reading in the writer's thread keeps at most one batch in flight
+        use_threads=False,
+        batch_readahead=0,
+        fragment_readahead=0,
+        fragment_scan_options=scan_options,
+    )
+
+    if to_stdout:
+        sink = pa.PythonFile(sys.stdout.buffer, mode="w")
+    else:
+        Path(out).parent.mkdir(parents=True, exist_ok=True)
+        sink = pa.OSFile(str(out), mode="wb")
+    stream = pa.CompressedOutputStream(sink, compression) if compression else sink
+
+    rows = 0
+    writer = _open_writer(fmt, stream, scanner.projected_schema)
+    try:
+        for batch in scanner.to_batches():
+            if batch.num_rows == 0:
+                continue
+            if fmt == "csv":
+                batch = _nan_to_null(batch)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+        if compression:
+            # Also closes the sink (for stdout: once all output is written)
+            stream.close()
+        elif to_stdout:
+            sys.stdout.buffer.flush()
+        else:
+            sink.close()
+    return rows
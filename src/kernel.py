@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import config
+from .equilibrium import (
+    DEFAULT_PARAMS,
+    DEMAND_MOMENTUM_WEIGHT,
+    DEMAND_VOLUME_WEIGHT,
+    ModelParams,
+)
+
+# Rank inputs, in feature-matrix column order
+FEATURE_COLS = [
+    config.COL_TOTAL_VOLUME,
+    config.COL_PCT_CHANGE_7D,
+    config.COL_SUPPLY_UTILIZATION,
+    config.COL_VOLATILITY_7D,
+    config.COL_LIQUIDITY_RATIO,
+    config.COL_SPECULATION_INDEX,
+]
+# Rank direction per feature column (volatility ranks high -> -1)
+FEATURE_ASCENDING = np.array([True, True, True, False, True, True])
+
+FORCE_COLS = [
+    config.COL_FORCE_DEMAND,
+    config.COL_FORCE_SUPPLY,
+    config.COL_FORCE_VOLATILITY,
+    config.COL_FORCE_LIQUIDITY,
+    config.COL_FORCE_SPECULATION,
+]
+
+
+def pack_features(df: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Pack the six rank inputs of ``df`` into an (assets x 6) float64 matrix.
+
+    The matrix is column-major so each feature is contiguous for sorting.
+    NaNs are filled with 0.0, as ``compute_equilibrium`` does before ranking.
+    ``df`` must already carry the engineered feature columns.
+    """
+    n = len(df)
+    if out is None:
+        out = np.empty((n, len(FEATURE_COLS)), order="F")
+    for j, col in enumerate(FEATURE_COLS):
+        out[:, j] = df[col].to_numpy(dtype=float)
+    np.copyto(out, 0.0, where=np.isnan(out))
+    return out
+
+
+def rank_to_unit(x: np.ndarray, ascending=True, axis: int = 0) -> np.ndarray:
+    """NumPy equivalent of ``equilibrium._rank_to_unit`` along ``axis``.
+
+    Uses average ranks for ties and maps percentile ranks to [-1, 1];
+    slices with at most one distinct value map to 0. ``ascending`` may be a
+    bool or, for 2D input, a boolean array with one entry per slice.
+    ``x`` must not contain NaNs.
+    """
+    x = np.asarray(x, dtype=float)
+    moved = np.moveaxis(x, axis, 0)
+    units = _rank_to_unit_axis0(moved, np.asarray(ascending, dtype=bool))
+    return np.moveaxis(units, 0, axis)
+
+
+def _rank_to_unit_axis0(
+    x: np.ndarray,
+    ascending: np.ndarray,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[Dict[str, np.ndarray]] = None,
+) -> np.ndarray:
+    """Rank every column of ``x`` along axis 0 (see ``rank_to_unit``)."""
+    n = x.shape[0]
+    shape = x.shape
+    if scratch is None:
+        scratch = _rank_scratch(shape)
+    if out is None:
+        out = np.empty(shape)
+    if n == 0:
+        return out
+
+    order = np.argsort(x, axis=0, kind="stable")
+    sorted_x = np.take_along_axis(x, order, axis=0)
+
+    # Tie groups: group start / end positions of every sorted element
+    new_group = scratch["new_group"]
+    new_group[0] = True
+    np.not_equal(sorted_x[1:], sorted_x[:-1], out=new_group[1:])
+    positions = scratch["positions"]
+
+    start = scratch["start"]
+    np.multiply(new_group, positions, out=start)
+    np.maximum.accumulate(start, axis=0, out=start)
+
+    end = scratch["end"]
+    end[-1] = n - 1
+    np.copyto(end[:-1], n - 1)
+    np.copyto(end[:-1], positions[:-1], where=new_group[1:])
+    np.minimum.accumulate(end[::-1], axis=0, out=end[::-1])
+
+    # Average 1-based rank -> percentile -> [-1, 1], same op order as pandas
+    pct = scratch["pct"]
+    np.add(start, end, out=pct)
+    pct += 2.0
+    pct /= 2.0
+    pct /= float(n)
+    if not ascending.all():
+        flip = np.broadcast_to(~ascending, pct.shape)
+        np.subtract(1.0, pct, out=pct, where=flip)
+    pct -= 0.5
+    pct *= 2.0
+
+    np.put_along_axis(out, order, pct, axis=0)
+
+    # Constant slices carry no rank information
+    constant = new_group.sum(axis=0) <= 1
+    if constant.any():
+        np.copyto(out, 0.0, where=constant)
+    return out
+
+
+def _rank_scratch(shape) -> Dict[str, np.ndarray]:
+    n = shape[0]
+    positions = np.arange(n).reshape((n,) + (1,) * (len(shape) - 1))
+    return {
+        "new_group": np.empty(shape, dtype=bool),
+        "positions": np.broadcast_to(positions, shape),
+        "start": np.empty(shape, dtype=np.intp),
+        "end": np.empty(shape, dtype=np.intp),
+        "pct": np.empty(shape),
+    }
+
+
+class EquilibriumKernel:
+    """Fused NumPy evaluation of ``equilibrium.compute_equilibrium``.
+
+    Works on a packed (assets x 6) feature matrix (see ``pack_features``) plus
+    a price vector. All intermediate and output arrays are allocated once per
+    universe size and reused across calls, so repeated evaluations (scenarios,
+    re-runs on refreshed data) do not churn memory.
+
+    Arrays returned by ``__call__`` are views into the kernel's buffers and
+    are overwritten by the next call; copy them to keep results around.
+    """
+
+    def __init__(self, n_assets: int, params: ModelParams = DEFAULT_PARAMS) -> None:
+        self.n_assets = n_assets
+        self.params = params
+        shape = (n_assets, len(FEATURE_COLS))
+        self._scratch = _rank_scratch(shape)
+        self._units = np.empty(shape, order="F")
+        self._tmp = np.empty(n_assets)
+        self.forces = np.empty((n_assets, len(FORCE_COLS)), order="F")
+        self.raw_shift = np.empty(n_assets)
+        self.shift = np.empty(n_assets)
+        self.center = np.empty(n_assets)
+        self.band_width = np.empty(n_assets)
+        self.lower = np.empty(n_assets)
+        self.upper = np.empty(n_assets)
+        self.tension = np.empty(n_assets)
+
+    def __call__(
+        self, features: np.ndarray, price: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        expected = (self.n_assets, len(FEATURE_COLS))
+        if features.shape != expected:
+            raise ValueError(
+                f"Expected feature matrix of shape {expected}, got {features.shape}."
+            )
+        units = _rank_to_unit_axis0(
+            features, FEATURE_ASCENDING, out=self._units, scratch=self._scratch
+        )
+        forces = self.forces
+        tmp = self._tmp
+        params = self.params
+
+        # Forces: demand mixes volume and momentum ranks; the rest are 1:1
+        np.multiply(DEMAND_VOLUME_WEIGHT, units[:, 0], out=forces[:, 0])
+        np.multiply(DEMAND_MOMENTUM_WEIGHT, units[:, 1], out=tmp)
+        forces[:, 0] += tmp
+        forces[:, 1:] = units[:, 2:]
+        np.clip(forces, -1.0, 1.0, out=forces)
+
+        # Raw shift, accumulated in the same order as the pandas reference
+        raw = self.raw_shift
+        np.multiply(params.force_weights[0], forces[:, 0], out=raw)
+        for j in range(1, len(FORCE_COLS)):
+            np.multiply(params.force_weights[j], forces[:, j], out=tmp)
+            raw += tmp
+        np.clip(raw, -1.0, 1.0, out=raw)
+
+        np.multiply(params.shift_scale, raw, out=self.shift)
+        np.add(1.0, self.shift, out=self.center)
+        np.multiply(price, self.center, out=self.center)
+
+        # Band: base + volatility and speculation widening, clipped
+        vol_term = self.tension  # reused: (1 - volatility force) / 2
+        np.multiply(forces[:, 2], -1.0, out=vol_term)
+        vol_term += 1.0
+        vol_term /= 2.0
+
+        band = self.band_width
+        np.multiply(params.band_volatility_coef, vol_term, out=band)
+        band += params.base_band_width
+        np.add(forces[:, 4], 1.0, out=tmp)
+        tmp /= 2.0
+        tmp *= params.band_speculation_coef
+        band += tmp
+        np.clip(band, params.band_min, params.band_max, out=band)
+
+        np.subtract(1.0, band, out=self.lower)
+        self.lower *= self.center
+        np.add(1.0, band, out=self.upper)
+        self.upper *= self.center
+
+        # Tension: |raw shift| + volatility contribution
+        np.abs(raw, out=tmp)
+        np.add(tmp, vol_term, out=self.tension)
+
+        return {
+            config.COL_FORCE_DEMAND: forces[:, 0],
+            config.COL_FORCE_SUPPLY: forces[:, 1],
+            config.COL_FORCE_VOLATILITY: forces[:, 2],
+            config.COL_FORCE_LIQUIDITY: forces[:, 3],
+            config.COL_FORCE_SPECULATION: forces[:, 4],
+            config.COL_EQ_SHIFT: self.shift,
+            config.COL_EQ_CENTER: self.center,
+            config.COL_EQ_LOWER: self.lower,
+            config.COL_EQ_UPPER: self.upper,
+            config.COL_TENSION_SCORE: self.tension,
+        }
+
+
+def compute_equilibrium(
+    df: pd.DataFrame, params: ModelParams = DEFAULT_PARAMS
+) -> pd.DataFrame:
+    """Drop-in replacement for ``equilibrium.compute_equilibrium``.
+
+    Same columns and values (to floating-point round-off), computed by
+    ``EquilibriumKernel`` on a packed feature matrix instead of a chain of
+    pandas Series operations.
+    """
+    kernel = EquilibriumKernel(len(df), params)
+    price = df[config.COL_CURRENT_PRICE].to_numpy(dtype=float)
+    outputs = kernel(pack_features(df), price)
+    df = df.copy()
+    for col, values in outputs.items():
+        df[col] = values.copy()
+    return df
+
+
+def forces_from_units(units: np.ndarray) -> np.ndarray:
+    """The five clipped forces (``FORCE_COLS`` on the last axis) from unit ranks."""
+    units = np.asarray(units, dtype=float)
+    forces = np.empty(units.shape[:-1] + (len(FORCE_COLS),))
+    forces[..., 0] = (
+        DEMAND_VOLUME_WEIGHT * units[..., 0] + DEMAND_MOMENTUM_WEIGHT * units[..., 1]
+    )
+    forces[..., 1:] = units[..., 2:]
+    return np.clip(forces, -1.0, 1.0, out=forces)
+
+
+def combine_forces(
+    forces: np.ndarray, price: np.ndarray, params: ModelParams = DEFAULT_PARAMS
+) -> Dict[str, np.ndarray]:
+    """Equilibrium shift, center, band and tension from force values.
+
+    ``forces`` has ``FORCE_COLS`` on its last axis and any leading shape;
+    ``price`` must broadcast against that leading shape. The raw shift is
+    accumulated in the same order as ``equilibrium.compute_equilibrium``.
+    """
+    forces = np.asarray(forces, dtype=float)
+    weights = params.force_weights
+    raw = weights[0] * forces[..., 0]
+    for j in range(1, len(FORCE_COLS)):
+        raw = raw + weights[j] * forces[..., j]
+    raw = np.clip(raw, -1.0, 1.0)
+
+    shift = params.shift_scale * raw
+    center = price * (1.0 + shift)
+
+    vol_term = (forces[..., 2] * -1.0 + 1.0) / 2.0
+    band = (
+        params.base_band_width
+        + params.band_volatility_coef * vol_term
+        + params.band_speculation_coef * ((forces[..., 4] + 1.0) / 2.0)
+    )
+    band = np.clip(band, params.band_min, params.band_max)
+
+    return {
+        config.COL_EQ_SHIFT: shift,
+        config.COL_EQ_CENTER: center,
+        config.COL_EQ_LOWER: center * (1.0 - band),
+        config.COL_EQ_UPPER: center * (1.0 + band),
+        config.COL_TENSION_SCORE: np.abs(raw) + vol_term,
+    }
+
+
+def equilibrium_from_units(
+    units: np.ndarray, price: np.ndarray, params: ModelParams = DEFAULT_PARAMS
+) -> Dict[str, np.ndarray]:
+    """Forces and equilibrium outputs from already-computed unit ranks.
+
+    ``units`` holds rank-to-unit values with ``FEATURE_COLS`` on the last
+    axis; any leading shape is allowed (a single asset, a batch, a grid) and
+    ``price`` must broadcast against it. Unlike ``EquilibriumKernel`` this
+    allocates its outputs, and is meant for small batches where the ranks
+    come from somewhere other than a full-market sort.
+    """
+    forces = forces_from_units(units)
+    outputs = {col: forces[..., j] for j, col in enumerate(FORCE_COLS)}
+    outputs.update(combine_forces(forces, price, params))
+    return outputs
@@ -0,0 +1,198 @@
+"""Multi-resolution density tiles of the Market Map.
+
+The map places every asset by equilibrium shift (x) and tension score (y).
+Drawing every point stops being practical in a browser long before the
+table stops fitting in memory, so ``data_prep.write_processed`` also stores
+a pyramid of 2D histograms of that plane in each cache entry
+(``store.TILES_FILE``). Level ``z`` splits the extent of the data into
+``base_bins << z`` equal bins per axis and keeps only the non-empty cells.
+
+A view picks the coarsest level that still resolves its zoomed window
+(``MapTiles.level_for``) and draws that level's cells inside the window
+(``MapTiles.cells``); only a window holding few enough assets is drawn
+point by point.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import config
+
+Range = Tuple[float, float]
+
+
+def _extent(values: np.ndarray) -> Range:
+    if values.size == 0:
+        return 0.0, 1.0
+    lo, hi = float(values.min()), float(values.max())
+    if hi == lo:
+        return lo - 0.5, hi + 0.5
+    return lo, hi
+
+
+def _bin(values: np.ndarray, extent: Range, n_bins: int) -> np.ndarray:
+    lo, hi = extent
+    idx = ((values - lo) * (n_bins / (hi - lo))).astype(np.int64)
+    # The maximum lands on the upper edge; it belongs to the last bin
+    return np.clip(idx, 0, n_bins - 1)
+
+
+@dataclass
+class MapTiles:
+    """Sparse 2D histograms of the map plane at successive resolutions.
+
+    ``codes[z]`` holds ``iy * bins(z) + ix`` of every non-empty cell of
+    level ``z`` in ascending order and ``counts[z]`` the number of assets in
+    each. Rows with a missing coordinate are left out, as in the point map.
+    """
+
+    x_range: Range
+    y_range: Range
+    base_bins: int
+    codes: List[np.ndarray]
+    counts: List[np.ndarray]
+
+    @classmethod
+    def build(
+        cls,
+        x,
+        y,
+        levels: Optional[int] = None,
+        base_bins: Optional[int] = None,
+    ) -> "MapTiles":
+        """Bin ``(x, y)`` once at the finest level and merge upwards."""
+        levels = levels or config.MAP_TILE_LEVELS
+        base_bins = base_bins or config.MAP_TILE_BASE_BINS
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        keep = np.isfinite(x) & np.isfinite(y)
+        x, y = x[keep], y[keep]
+        x_range, y_range = _extent(x), _extent(y)
+
+        finest = base_bins << (levels - 1)
+        fine_codes, fine_counts = np.unique(
+            _bin(y, y_range, finest) * finest + _bin(x, x_range, finest),
+            return_counts=True,
+        )
+        fine_x, fine_y = fine_codes % finest, fine_codes // finest
+
+        # Cell codes and counts fit in 32 bits for any sensible pyramid
+        fits_int32 = finest * finest <= np.iinfo(np.int32).max
+        code_dtype = np.int32 if fits_int32 else np.int64
+        codes, counts = [], []
+        for z in range(levels):
+            # A cell of level z covers 2**shift x 2**shift finest cells
+            shift = levels - 1 - z
+            level_codes = (fine_y >> shift) * (base_bins << z) + (fine_x >> shift)
+            cells, inverse = np.unique(level_codes, return_inverse=True)
+            codes.append(cells.astype(code_dtype))
+            counts.append(np.bincount(inverse, weights=fine_counts).astype(np.int32))
+        return cls(x_range, y_range, base_bins, codes, counts)
+
+    @classmethod
+    def load(cls, path: Path) -> "MapTiles":
+        with np.load(path) as data:
+            levels = int(data["levels"])
+            return cls(
+                x_range=tuple(data["x_range"].tolist()),
+                y_range=tuple(data["y_range"].tolist()),
+                base_bins=int(data["base_bins"]),
+                codes=[data[f"codes_{z}"] for z in range(levels)],
+                counts=[data[f"counts_{z}"] for z in range(levels)],
+            )
+
+    def save(self, path: Path) -> None:
+        arrays = {}
+        for z in range(self.levels):
+            arrays[f"codes_{z}"] = self.codes[z]
+            arrays[f"counts_{z}"] = self.counts[z]
+        with open(path, "wb") as fh:
+            np.savez(
+                fh,
+                levels=self.levels,
+                x_range=np.array(self.x_range),
+                y_range=np.array(self.y_range),
+                base_bins=self.base_bins,
+                **arrays,
+            )
+
+    @property
+    def levels(self) -> int:
+        return len(self.codes)
+
+    def bins(self, level: int) -> int:
+        """Bins per axis at ``level``."""
+        return self.base_bins << level
+
+    def level_for(
+        self,
+        x_range: Optional[Range] = None,
+        y_range: Optional[Range] = None,
+        target_bins: Optional[int] = None,
+    ) -> int:
+        """Coarsest level with at least ``target_bins`` bins across the window.
+
+        Returns the finest level when even that one is coarser.
+        """
+        target_bins = target_bins or config.MAP_TARGET_BINS
+        fraction = min(
+            _fraction(x_range, self.x_range), _fraction(y_range, self.y_range)
+        )
+        for level in range(self.levels):
+            if self.bins(level) * fraction >= target_bins:
+                return level
+        return self.levels - 1
+
+    def cells(
+        self,
+        x_range: Optional[Range] = None,
+        y_range: Optional[Range] = None,
+        level: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Non-empty cells of ``level`` overlapping the window.
+
+        Columns ``x0, x1, y0, y1`` hold the cell edges and ``count`` the
+        number of assets in it. ``level`` defaults to ``level_for`` the
+        window.
+        """
+        if level is None:
+            level = self.level_for(x_range, y_range)
+        n = self.bins(level)
+        codes = self.codes[level]
+        x0, x1 = _edges(codes % n, self.x_range, n)
+        y0, y1 = _edges(codes // n, self.y_range, n)
+        keep = np.ones(len(codes), dtype=bool)
+        if x_range is not None:
+            keep &= (x1 >= x_range[0]) & (x0 <= x_range[1])
+        if y_range is not None:
+            keep &= (y1 >= y_range[0]) & (y0 <= y_range[1])
+        return pd.DataFrame(
+            {
+                "x0": x0[keep],
+                "x1": x1[keep],
+                "y0": y0[keep],
+                "y1": y1[keep],
+                "count": self.counts[level][keep],
+            }
+        )
+
+
+def _fraction(window: Optional[Range], extent: Range) -> float:
+    """Share of ``extent`` covered by ``window`` (1 when there is none)."""
+    if window is None:
+        return 1.0
+    lo, hi = max(window[0], extent[0]), min(window[1], extent[1])
+    return max(hi - lo, 0.0) / (extent[1] - extent[0])
+
+
+def _edges(
+    idx: np.ndarray, extent: Range, n_bins: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    lo, hi = extent
+    width = (hi - lo) / n_bins
+    return lo + idx * width, lo + (idx + 1) * width
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import config, kernel
+from .equilibrium import DEFAULT_PARAMS, ModelParams
+
+
+# Parameters reported by EquilibriumModel.sensitivities, in column order
+SENSITIVITY_PARAMS = [
+    "w_demand",
+    "w_supply",
+    "w_volatility",
+    "w_liquidity",
+    "w_speculation",
+    "shift_scale",
+    "base_band_width",
+    "band_volatility_coef",
+    "band_speculation_coef",
+    "band_min",
+    "band_max",
+]
+SENSITIVITY_OUTPUTS = [
+    config.COL_EQ_SHIFT,
+    config.COL_EQ_CENTER,
+    config.COL_EQ_LOWER,
+    config.COL_EQ_UPPER,
+    config.COL_TENSION_SCORE,
+]
+
+
+class EquilibriumModel:
+    """Cached force matrix for cheap re-weighting of the equilibrium model.
+
+    The forces depend only on the market (they are percentile ranks), while
+    force weights, ``shift_scale`` and the band constants only combine them.
+    The model ranks the market once, keeps the forces as an (assets x 5)
+    matrix, and evaluates any ``ModelParams`` — or thousands of candidate
+    weight vectors at once — with a matrix product and no re-ranking.
+    """
+
+    def __init__(
+        self,
+        forces: np.ndarray,
+        price: np.ndarray,
+        index: Optional[pd.Index] = None,
+        params: ModelParams = DEFAULT_PARAMS,
+    ) -> None:
+        self.forces = np.ascontiguousarray(forces, dtype=float)
+        self.price = np.asarray(price, dtype=float)
+        self.index = index if index is not None else pd.RangeIndex(len(self.price))
+        self.params = params
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, params: ModelParams = DEFAULT_PARAMS
+    ) -> "EquilibriumModel":
+        """Rank a frame with engineered features and cache its forces."""
+        units = kernel.rank_to_unit(
+            kernel.pack_features(df), ascending=kernel.FEATURE_ASCENDING, axis=0
+        )
+        return cls(
+            kernel.forces_from_units(units),
+            df[config.COL_CURRENT_PRICE].to_numpy(dtype=float),
+            index=df.index,
+            params=params,
+        )
+
+    @classmethod
+    def from_processed(
+        cls, df: pd.DataFrame, params: ModelParams = DEFAULT_PARAMS
+    ) -> "EquilibriumModel":
+        """Reuse the force columns already stored in a processed frame."""
+        return cls(
+            df[kernel.FORCE_COLS].to_numpy(dtype=float),
+            df[config.COL_CURRENT_PRICE].to_numpy(dtype=float),
+            index=df.index,
+            params=params,
+        )
+
+    def evaluate(self, params: Optional[ModelParams] = None) -> pd.DataFrame:
+        """Force and equilibrium columns under ``params`` (default: the model's)."""
+        params = params or self.params
+        outputs = {col: self.forces[:, j] for j, col in enumerate(kernel.FORCE_COLS)}
+        outputs.update(kernel.combine_forces(self.forces, self.price, params))
+        return pd.DataFrame(outputs, index=self.index)
+
+    def raw_shift(self, weights: np.ndarray) -> np.ndarray:
+        """Clipped raw shift for one weight vector or a (k x 5) stack of them.
+
+        Returns shape (assets,) for a single vector and (assets x k) for a
+        stack; the stack case is a single BLAS matrix product.
+        """
+        weights = np.asarray(weights, dtype=float)
+        return np.clip(self.forces @ weights.T, -1.0, 1.0)
+
+    def sweep(
+        self, weights: np.ndarray, shift_scale: Optional[float] = None
+    ) -> Dict[str, np.ndarray]:
+        """Shift, center and tension for k candidate weight vectors at once.
+
+        ``weights`` is a (k x 5) array in ``kernel.FORCE_COLS`` order. Each
+        returned array is (assets x k), column i belonging to ``weights[i]``.
+        Band width does not depend on the weights, so it is not repeated
+        here; see ``evaluate``.
+        """
+        if shift_scale is None:
+            shift_scale = self.params.shift_scale
+        raw = self.raw_shift(np.atleast_2d(weights))
+        shift = shift_scale * raw
+        vol_term = (self.forces[:, 2] * -1.0 + 1.0) / 2.0
+        return {
+            config.COL_EQ_SHIFT: shift,
+            config.COL_EQ_CENTER: self.price[:, None] * (1.0 + shift),
+            config.COL_TENSION_SCORE: np.abs(raw) + vol_term[:, None],
+        }
+
+    def sensitivities(
+        self, params: Optional[ModelParams] = None
+    ) -> pd.DataFrame:
+        """Analytic partial derivatives of every output w.r.t. every parameter.
+
+        Returns a frame indexed like the model with two-level columns
+        ``(output, parameter)``, outputs from ``SENSITIVITY_OUTPUTS`` and
+        parameters from ``SENSITIVITY_PARAMS``. All assets are done in one
+        vectorized pass.
+
+        The outputs are piecewise linear in the parameters and these are the
+        exact derivatives away from the kinks. Where the raw shift or the
+        band width sits exactly on a clip boundary, derivatives through that
+        clip are reported as zero, and the tension derivative uses
+        sign(0) = 0 at a raw shift of exactly zero.
+        """
+        params = params or self.params
+        forces = self.forces
+        price = self.price
+        n = len(price)
+        n_weights = len(kernel.FORCE_COLS)
+
+        raw_unclipped = forces @ np.asarray(params.force_weights, dtype=float)
+        raw = np.clip(raw_unclipped, -1.0, 1.0)
+        raw_active = np.abs(raw_unclipped) < 1.0
+
+        vol_term = (forces[:, 2] * -1.0 + 1.0) / 2.0
+        spec_term = (forces[:, 4] + 1.0) / 2.0
+        band_unclipped = (
+            params.base_band_width
+            + params.band_volatility_coef * vol_term
+            + params.band_speculation_coef * spec_term
+        )
+        band = np.clip(band_unclipped, params.band_min, params.band_max)
+        band_active = (band_unclipped > params.band_min) & (
+            band_unclipped < params.band_max
+        )
+        center = price * (1.0 + params.shift_scale * raw)
+
+        # d(shift)/d(param): weights act through the raw shift, scale directly
+        d_shift = np.zeros((n, len(SENSITIVITY_PARAMS)))
+        d_raw_weights = forces * raw_active[:, None]
+        d_shift[:, :n_weights] = params.shift_scale * d_raw_weights
+        d_shift[:, n_weights] = raw
+
+        # d(band width)/d(param): only the band constants
+        d_band = np.zeros_like(d_shift)
+        d_band[:, n_weights + 1] = band_active
+        d_band[:, n_weights + 2] = band_active * vol_term
+        d_band[:, n_weights + 3] = band_active * spec_term
+        d_band[:, n_weights + 4] = band_unclipped < params.band_min
+        d_band[:, n_weights + 5] = band_unclipped > params.band_max
+
+        d_center = price[:, None] * d_shift
+        d_lower = d_center * (1.0 - band)[:, None] - center[:, None] * d_band
+        d_upper = d_center * (1.0 + band)[:, None] + center[:, None] * d_band
+
+        d_tension = np.zeros_like(d_shift)
+        d_tension[:, :n_weights] = np.sign(raw)[:, None] * d_raw_weights
+
+        blocks = [d_shift, d_center, d_lower, d_upper, d_tension]
+        columns = pd.MultiIndex.from_product(
+            [SENSITIVITY_OUTPUTS, SENSITIVITY_PARAMS], names=["output", "parameter"]
+        )
+        return pd.DataFrame(np.hstack(blocks), index=self.index, columns=columns)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import config, kernel, scenario
+
+# Target number of (draw, asset) cells ranked per chunk
+CHUNK_CELLS = 2_000_000
+
+
+@dataclass(frozen=True)
+class ShockSpec:
+    """Distribution of the random market shocks.
+
+    - volume multiplier: lognormal with median 1 and log-sd ``volume_sigma``
+    - 24h/7d change multiplier: lognormal with median 1 and log-sd
+      ``change_sigma`` (one draw scales both horizons, as in the simulator)
+    - supply utilization shift: normal with sd ``util_sigma``, expressed as a
+      fraction of the utilization scale (1 or 100, inferred from the data)
+    """
+
+    volume_sigma: float = 0.5
+    change_sigma: float = 0.5
+    util_sigma: float = 0.05
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-draw equilibrium shift and tension for every asset.
+
+    ``shift`` and ``tension`` have shape ``(draws, assets)``; columns follow
+    ``index`` (the index of the input frame).
+    """
+
+    index: pd.Index
+    shift: np.ndarray
+    tension: np.ndarray
+
+    @property
+    def n_draws(self) -> int:
+        return self.shift.shape[0]
+
+    def summary(
+        self, quantiles: Sequence[float] = (0.05, 0.5, 0.95)
+    ) -> pd.DataFrame:
+        """Mean, standard deviation and quantiles per asset."""
+        out: Dict[str, np.ndarray] = {}
+        for name, values in [
+            (config.COL_EQ_SHIFT, self.shift),
+            (config.COL_TENSION_SCORE, self.tension),
+        ]:
+            out[f"{name}_mean"] = values.mean(axis=0)
+            out[f"{name}_std"] = values.std(axis=0)
+            for q, row in zip(quantiles, np.quantile(values, quantiles, axis=0)):
+                out[f"{name}_p{round(q * 100):02d}"] = row
+        return pd.DataFrame(out, index=self.index)
+
+
+# Market arrays shared by the chunks of one run (set per worker process)
+_MARKET: Dict[str, np.ndarray] = {}
+
+
+def _set_market(market: Dict[str, np.ndarray]) -> None:
+    global _MARKET
+    _MARKET = market
+
+
+def _simulate_chunk(
+    n_draws: int, seed: np.random.SeedSequence, shocks: ShockSpec
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Draw ``n_draws`` market-wide shocks and evaluate them in one batch."""
+    market = _MARKET
+    rng = np.random.default_rng(seed)
+    n_assets = len(market["price"])
+    shape = (n_assets, n_draws)
+    util_max = float(market["util_max"])
+
+    # Asset-major (assets x draws) so ranking runs along axis 0
+    volume, pct_24h, pct_7d, util = scenario.apply_shocks(
+        market["volume"][:, None],
+        market["pct_24h"][:, None],
+        market["pct_7d"][:, None],
+        market["util"][:, None],
+        vol_mult=rng.lognormal(0.0, shocks.volume_sigma, shape),
+        vol24_mult=rng.lognormal(0.0, shocks.change_sigma, shape),
+        util_shift=rng.normal(0.0, shocks.util_sigma * util_max, shape),
+        util_max=util_max,
+    )
+    features = scenario.scenario_features(
+        volume, market["market_cap"][:, None], pct_24h, pct_7d, util
+    )
+
+    # One batched argsort ranks every draw and every rank input at once
+    units = kernel.rank_to_unit(features, ascending=kernel.FEATURE_ASCENDING, axis=0)
+    outputs = kernel.equilibrium_from_units(units, market["price"][:, None])
+    return outputs[config.COL_EQ_SHIFT].T, outputs[config.COL_TENSION_SCORE].T
+
+
+def simulate(
+    df: pd.DataFrame,
+    n_draws: int,
+    shocks: ShockSpec = ShockSpec(),
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = 1,
+) -> MonteCarloResult:
+    """Monte Carlo distribution of equilibrium shift and tension.
+
+    Each draw shocks volume, 24h/7d change and supply utilization of every
+    asset at once (see ``ShockSpec``) and re-ranks the whole market, exactly
+    as ``compute_equilibrium`` would on the shocked frame. ``df`` is a
+    processed frame.
+
+    Draws are split into chunks of ``chunk_size`` (by default sized to about
+    ``CHUNK_CELLS`` draw x asset cells). Every chunk gets its own child of
+    ``np.random.SeedSequence(seed)``, so results for a given seed are
+    identical whatever the number of ``workers``; ``workers`` > 1 spreads
+    chunks over a process pool (``None`` uses all CPUs).
+    """
+    n_assets = len(df)
+    util = df[config.COL_SUPPLY_UTILIZATION].to_numpy(dtype=float)
+    market = {
+        "volume": df[config.COL_TOTAL_VOLUME].to_numpy(dtype=float),
+        "market_cap": df[config.COL_MARKET_CAP].to_numpy(dtype=float),
+        "pct_24h": df[config.COL_PCT_CHANGE_24H].to_numpy(dtype=float),
+        "pct_7d": df[config.COL_PCT_CHANGE_7D].to_numpy(dtype=float),
+        "util": util,
+        "util_max": np.array(scenario.utilization_max(util)),
+        "price": df[config.COL_CURRENT_PRICE].to_numpy(dtype=float),
+    }
+
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_CELLS // max(n_assets, 1))
+    sizes = [
+        min(chunk_size, n_draws - start) for start in range(0, n_draws, chunk_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(sizes, seeds, [shocks] * len(sizes)))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        _set_market(market)
+        results = [_simulate_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_set_market,
+            initargs=(market,),
+        ) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*tasks)))
+
+    if not results:
+        empty = np.empty((0, n_assets))
+        return MonteCarloResult(index=df.index, shift=empty, tension=empty.copy())
+    return MonteCarloResult(
+        index=df.index,
+        shift=np.concatenate([r[0] for r in results]),
+        tension=np.concatenate([r[1] for r in results]),
+    )
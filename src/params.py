@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+# Model constants (shared by the pandas reference and the NumPy kernel)
+DEMAND_VOLUME_WEIGHT = 0.6
+DEMAND_MOMENTUM_WEIGHT = 0.4
+# Raw-shift weights: demand, supply, volatility, liquidity, speculation
+FORCE_WEIGHTS = (0.35, 0.20, -0.20, 0.15, 0.30)
+SHIFT_SCALE = 0.15
+BASE_BAND_WIDTH = 0.05
+BAND_VOLATILITY_COEF = 0.10
+BAND_SPECULATION_COEF = 0.05
+BAND_MIN = 0.05
+BAND_MAX = 0.25
+
+
+@dataclass(frozen=True)
+class ModelParams:
+    """Parameters that combine the five forces into shift, band and tension.
+
+    Changing any of these leaves the forces (and hence every rank) untouched;
+    see ``model.EquilibriumModel`` for cheap re-evaluation.
+    """
+
+    force_weights: Tuple[float, float, float, float, float] = FORCE_WEIGHTS
+    shift_scale: float = SHIFT_SCALE
+    base_band_width: float = BASE_BAND_WIDTH
+    band_volatility_coef: float = BAND_VOLATILITY_COEF
+    band_speculation_coef: float = BAND_SPECULATION_COEF
+    band_min: float = BAND_MIN
+    band_max: float = BAND_MAX
+
+
+DEFAULT_PARAMS = ModelParams()
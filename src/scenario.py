@@ -0,0 +1,517 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import config, kernel
+
+
+# Outputs reported per asset by ``ScenarioEngine.compare``; the shocked
+# values are in the same columns plus SHOCKED_SUFFIX
+COMPARE_COLS = kernel.FORCE_COLS + [
+    config.COL_EQ_SHIFT,
+    config.COL_EQ_CENTER,
+    config.COL_EQ_LOWER,
+    config.COL_EQ_UPPER,
+    config.COL_TENSION_SCORE,
+]
+SHOCKED_SUFFIX = "_shocked"
+
+
+def apply_shocks(
+    volume: np.ndarray,
+    pct_24h: np.ndarray,
+    pct_7d: np.ndarray,
+    supply_util: np.ndarray,
+    vol_mult=1.0,
+    vol24_mult=1.0,
+    util_shift=0.0,
+    util_max: float = 1.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Scenario transformations used by the Scenario Simulator.
+
+    - volume is scaled by ``vol_mult`` (floored at 0)
+    - 24h and 7d percent changes are scaled by ``vol24_mult``
+    - supply utilization is shifted by ``util_shift`` and clipped to
+      [0, ``util_max``] (see ``utilization_max``)
+
+    All arguments broadcast, so a single asset, a batch of assets or a grid
+    of shocks go through the same code.
+    """
+    volume = np.maximum(0.0, volume * vol_mult)
+    pct_24h = pct_24h * vol24_mult
+    pct_7d = pct_7d * vol24_mult
+    supply_util = np.clip(supply_util + util_shift, 0.0, util_max)
+    return volume, pct_24h, pct_7d, supply_util
+
+
+def utilization_max(supply_util: np.ndarray) -> float:
+    """Full scale of a supply-utilization column: 1 or 100.
+
+    Utilization is a fraction in derived data but a percent in the raw
+    Kaggle snapshot; shocks and clipping follow whichever scale is used.
+    """
+    return 100.0 if np.nanmax(supply_util, initial=0.0) > 1.0 else 1.0
+
+
+def scenario_features(
+    volume: np.ndarray,
+    market_cap: np.ndarray,
+    pct_24h: np.ndarray,
+    pct_7d: np.ndarray,
+    supply_util: np.ndarray,
+) -> np.ndarray:
+    """Rank inputs (``kernel.FEATURE_COLS`` on the last axis) for shocked rows.
+
+    Mirrors ``equilibrium.compute_engineered_features`` followed by the NaN
+    fills in ``compute_equilibrium``.
+    """
+    market_cap = np.where(market_cap == 0, np.nan, market_cap)
+    liquidity = volume / market_cap
+    vol_24h = np.abs(pct_24h)
+    vol_7d = np.abs(pct_7d)
+    speculation = (
+        np.nan_to_num(vol_24h, nan=0.0) + np.nan_to_num(vol_7d, nan=0.0)
+    ) * np.nan_to_num(liquidity, nan=0.0)
+    columns = np.broadcast_arrays(
+        volume, pct_7d, supply_util, vol_7d, liquidity, speculation
+    )
+    features = np.stack(columns, axis=-1)
+    np.copyto(features, 0.0, where=np.isnan(features))
+    return features
+
+
+@dataclass
+class ScenarioGrid:
+    """Equilibrium outputs for one asset over a dense grid of shocks.
+
+    Output arrays have shape ``(len(vol_mult), len(volat_mult),
+    len(util_shift))``; index ``[i, j, k]`` is the scenario with
+    ``vol_mult[i]``, ``volat_mult[j]`` and ``util_shift[k]``.
+    """
+
+    symbol: str
+    vol_mult: np.ndarray
+    volat_mult: np.ndarray
+    util_shift: np.ndarray
+    shift: np.ndarray
+    center: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    tension: np.ndarray
+
+
+class ScenarioEngine:
+    """Fast what-if evaluation of one asset against a fixed market.
+
+    Keeps every rank input of the base market pre-sorted, together with the
+    tie-group bounds of each sorted position. Moving one asset's value then
+    only needs binary searches to find its new percentile rank, and the
+    assets whose ranks shift because of the move are a contiguous slice of
+    the sorted order.
+
+    The base frame must be a processed frame (engineered features present)
+    whose supply-utilization column is usable as is, which is what
+    ``data_prep.load_processed`` produces. ``util_max`` is that column's
+    full scale (``utilization_max``); ``util_shift`` is in the same units.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+        self.n_assets = len(df)
+        features = kernel.pack_features(df)
+        self._features = features
+        self._units: Optional[np.ndarray] = None
+        self._order = np.argsort(features, axis=0, kind="stable")
+        self._sorted = np.take_along_axis(features, self._order, axis=0)
+
+        # Tie-group bounds for each sorted position, and distinct counts
+        n = self.n_assets
+        positions = np.arange(n)[:, None]
+        new_group = np.ones(self._sorted.shape, dtype=bool)
+        new_group[1:] = self._sorted[1:] != self._sorted[:-1]
+        self._group_start = np.maximum.accumulate(new_group * positions, axis=0)
+        last = np.ones(self._sorted.shape, dtype=bool)
+        last[:-1] = new_group[1:]
+        end = np.where(last, positions, n - 1)
+        self._group_end = np.minimum.accumulate(end[::-1], axis=0)[::-1]
+        self._nunique = new_group.sum(axis=0)
+
+        self._price = df[config.COL_CURRENT_PRICE].to_numpy(dtype=float)
+        self._inputs = {
+            col: df[col].to_numpy(dtype=float)
+            for col in [
+                config.COL_TOTAL_VOLUME,
+                config.COL_MARKET_CAP,
+                config.COL_PCT_CHANGE_24H,
+                config.COL_PCT_CHANGE_7D,
+                config.COL_SUPPLY_UTILIZATION,
+            ]
+        }
+        self.util_max = utilization_max(
+            self._inputs[config.COL_SUPPLY_UTILIZATION]
+        )
+        symbols = df[config.COL_SYMBOL].to_numpy()
+        self._positions: Dict[str, int] = {}
+        for pos, symbol in enumerate(symbols):
+            self._positions.setdefault(symbol, pos)
+
+    def position(self, symbol: str) -> int:
+        """Row position of the first asset with this symbol."""
+        try:
+            return self._positions[symbol]
+        except KeyError:
+            raise ValueError(f"Symbol {symbol} not found in market data.") from None
+
+    def shocked_features(
+        self, pos, vol_mult=1.0, vol24_mult=1.0, util_shift=0.0, return_inputs=False
+    ):
+        """Rank inputs of the asset(s) at ``pos`` after applying the shocks.
+
+        With ``return_inputs``, also returns the shocked ``(volume, pct_24h,
+        pct_7d, supply_util)`` from ``apply_shocks``.
+        """
+        inputs = self._inputs
+        shocked = apply_shocks(
+            inputs[config.COL_TOTAL_VOLUME][pos],
+            inputs[config.COL_PCT_CHANGE_24H][pos],
+            inputs[config.COL_PCT_CHANGE_7D][pos],
+            inputs[config.COL_SUPPLY_UTILIZATION][pos],
+            vol_mult,
+            vol24_mult,
+            util_shift,
+            self.util_max,
+        )
+        volume, pct_24h, pct_7d, util = shocked
+        features = scenario_features(
+            volume, inputs[config.COL_MARKET_CAP][pos], pct_24h, pct_7d, util
+        )
+        if return_inputs:
+            return features, shocked
+        return features
+
+    def unit_ranks(self, pos, features: np.ndarray) -> np.ndarray:
+        """Unit ranks of replacement feature rows for the asset(s) at ``pos``.
+
+        ``features`` has ``kernel.FEATURE_COLS`` on its last axis and any
+        leading shape; ``pos`` broadcasts against that leading shape. Each
+        value is ranked against the base market with the asset's own base
+        value taken out, i.e. as if only that asset had moved. O(log n) per
+        value.
+        """
+        features = np.asarray(features, dtype=float)
+        pos = np.asarray(pos)
+        n = self.n_assets
+        units = np.empty(np.broadcast_shapes(features.shape, pos.shape + (1,)))
+        for j, ascending in enumerate(kernel.FEATURE_ASCENDING):
+            column = self._sorted[:, j]
+            new = features[..., j]
+            old = self._features[pos, j]
+            less = np.searchsorted(column, new, side="left")
+            equal = np.searchsorted(column, new, side="right") - less
+            # Take the asset's own base value out of the counts
+            less = less - (old < new)
+            equal = equal - (old == new)
+
+            # Average rank of the new value among the others plus itself,
+            # in the same operation order as the full-market ranking
+            pct = ((less + (less + equal)) + 2.0) / 2.0 / float(n)
+            if not ascending:
+                pct = 1.0 - pct
+            unit = (pct - 0.5) * 2.0
+
+            old_count = self._count(j, old)
+            nunique = self._nunique[j] - (old_count == 1) + (equal == 0)
+            units[..., j] = np.where(nunique <= 1, 0.0, unit)
+        return units
+
+    def _count(self, j: int, value) -> np.ndarray:
+        column = self._sorted[:, j]
+        return np.searchsorted(column, value, side="right") - np.searchsorted(
+            column, value, side="left"
+        )
+
+    def rerank(self, j: int, pos: int, value: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Market-wide rank update for one feature column after one move.
+
+        Returns ``(assets, units)``: the row positions whose unit rank in
+        feature column ``j`` changes when the asset at ``pos`` takes
+        ``value`` (the moved asset included), and their new unit ranks. Runs
+        in O(log n + k) for k affected assets.
+        """
+        n = self.n_assets
+        column = self._sorted[:, j]
+        old = self._features[pos, j]
+        if old == value:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        nunique = self._nunique[j] - (self._count(j, old) == 1) + (
+            self._count(j, value) == 0
+        )
+        if self._nunique[j] <= 1 or nunique <= 1:
+            # Degenerate column on either side: every rank changes
+            moved = self._features[:, j].copy()
+            moved[pos] = value
+            ascending = bool(kernel.FEATURE_ASCENDING[j])
+            return np.arange(n), kernel.rank_to_unit(moved, ascending=ascending)
+
+        # Only assets tied with or between the old and new value move
+        low, high = (old, value) if old < value else (value, old)
+        start = np.searchsorted(column, low, side="left")
+        stop = np.searchsorted(column, high, side="right")
+        assets = self._order[start:stop, j]
+        values = column[start:stop]
+
+        # Base tie-group counts, minus the old value, plus the new one
+        group_start = self._group_start[start:stop, j]
+        less = group_start - (old < values) + (value < values)
+        equal = (self._group_end[start:stop, j] - group_start + 1) - (
+            old == values
+        ) + (value == values)
+        moved = assets == pos
+        less[moved] = np.searchsorted(column, value, side="left") - (old < value)
+        equal[moved] = self._count(j, value) + 1
+
+        pct = ((less + (less + equal - 1)) + 2.0) / 2.0 / float(n)
+        if not kernel.FEATURE_ASCENDING[j]:
+            pct = 1.0 - pct
+        return assets, (pct - 0.5) * 2.0
+
+    def evaluate(
+        self, pos, vol_mult=1.0, vol24_mult=1.0, util_shift=0.0
+    ) -> Dict[str, np.ndarray]:
+        """Forces and equilibrium outputs for shocked asset(s) at ``pos``.
+
+        Matches rerunning the full pipeline on a market where only that
+        asset was shocked, without touching any other asset.
+        """
+        features = self.shocked_features(pos, vol_mult, vol24_mult, util_shift)
+        units = self.unit_ranks(pos, features)
+        return kernel.equilibrium_from_units(units, self._price[pos])
+
+    def grid(
+        self,
+        symbol: str,
+        vol_mults,
+        volat_mults,
+        util_shifts,
+    ) -> ScenarioGrid:
+        """Evaluate every combination of the three scenario sliders at once.
+
+        All grid points are ranked against the pre-sorted base market in one
+        batched ``searchsorted`` per rank input, so the cost is a handful of
+        vectorized passes over the grid rather than one market recompute per
+        point.
+        """
+        vol_mults = np.asarray(vol_mults, dtype=float).ravel()
+        volat_mults = np.asarray(volat_mults, dtype=float).ravel()
+        util_shifts = np.asarray(util_shifts, dtype=float).ravel()
+        outputs = self.evaluate(
+            self.position(symbol),
+            vol_mults[:, None, None],
+            volat_mults[None, :, None],
+            util_shifts[None, None, :],
+        )
+        return ScenarioGrid(
+            symbol=symbol,
+            vol_mult=vol_mults,
+            volat_mult=volat_mults,
+            util_shift=util_shifts,
+            **{
+                field: outputs[col]
+                for field, col in [
+                    ("shift", config.COL_EQ_SHIFT),
+                    ("center", config.COL_EQ_CENTER),
+                    ("lower", config.COL_EQ_LOWER),
+                    ("upper", config.COL_EQ_UPPER),
+                    ("tension", config.COL_TENSION_SCORE),
+                ]
+            },
+        )
+
+    def compare(
+        self, positions, vol_mult=1.0, vol24_mult=1.0, util_shift=0.0
+    ) -> pd.DataFrame:
+        """Base and shocked outputs of several assets under one set of shocks.
+
+        Each asset is shocked in isolation, as in the Scenario Simulator
+        (the rest of the market, the other compared assets included, keeps
+        its base values). Base and shocked values come from one batched
+        ``evaluate`` call, so both are float64 and an identity shock gives
+        identical columns (the resident frame keeps forces as float32).
+        Returns one row per position, in order, with the symbol, name and
+        price, the base forces and equilibrium outputs, and the shocked ones
+        under the same names plus ``SHOCKED_SUFFIX``.
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        # Row 0 is the unshocked base, row 1 the scenario
+        outputs = self.evaluate(
+            positions,
+            np.array([1.0, vol_mult])[:, None],
+            np.array([1.0, vol24_mult])[:, None],
+            np.array([0.0, util_shift])[:, None],
+        )
+        columns = {
+            col: self.df[col].iloc[positions].to_numpy()
+            for col in [config.COL_SYMBOL, config.COL_NAME]
+            if col in self.df.columns
+        }
+        columns[config.COL_CURRENT_PRICE] = self._price[positions]
+        for col in COMPARE_COLS:
+            base, shocked = np.broadcast_to(outputs[col], (2,) + positions.shape)
+            columns[col] = base
+            columns[col + SHOCKED_SUFFIX] = shocked
+        return pd.DataFrame(columns, index=positions)
+
+    def ripple(
+        self, pos: int, vol_mult=1.0, vol24_mult=1.0, util_shift=0.0
+    ) -> pd.DataFrame:
+        """Every asset whose forces change when the asset at ``pos`` is shocked.
+
+        The moved asset takes its shocked rank inputs and each rank input is
+        re-ranked with ``rerank``: only the assets tied with or between its
+        old and new value can move, so the cost is O(log n + k) for k
+        affected assets. Returns a frame like ``compare`` (base outputs, and shocked
+        ones plus ``SHOCKED_SUFFIX``) indexed by row position, the moved
+        asset included; it is empty when no rank input changes.
+        """
+        features = self.shocked_features(pos, vol_mult, vol24_mult, util_shift)
+        updates = [
+            self.rerank(j, pos, features[j]) for j in range(len(kernel.FEATURE_COLS))
+        ]
+        # Row of each moved asset, through a position -> row scratch array;
+        # only touched slots are ever read, so it needs no O(n) fill
+        touched = np.concatenate([moved for moved, _ in updates])
+        slot = np.empty(self.n_assets, dtype=np.intp)
+        slot[touched] = np.arange(len(touched))
+        assets = np.sort(touched[slot[touched] == np.arange(len(touched))])
+        slot[assets] = np.arange(len(assets))
+        base_units = self._base_units()[assets]
+        units = base_units.copy()
+        for j, (moved, new) in enumerate(updates):
+            units[slot[moved], j] = new
+        # Assets inside a moved range whose own rank stays put
+        changed = (units != base_units).any(axis=1)
+        assets, base_units, units = assets[changed], base_units[changed], units[changed]
+
+        price = self._price[assets]
+        base = kernel.equilibrium_from_units(base_units, price)
+        shocked = kernel.equilibrium_from_units(units, price)
+        columns = {
+            col: self.df[col].iloc[assets].to_numpy()
+            for col in [config.COL_SYMBOL, config.COL_NAME]
+            if col in self.df.columns
+        }
+        columns[config.COL_CURRENT_PRICE] = price
+        for col in COMPARE_COLS:
+            columns[col] = base[col]
+            columns[col + SHOCKED_SUFFIX] = shocked[col]
+        return pd.DataFrame(columns, index=assets)
+
+    def _base_units(self) -> np.ndarray:
+        """Unit ranks of the whole base market, computed on first use."""
+        if self._units is None:
+            self._units = kernel.rank_to_unit(
+                self._features, ascending=kernel.FEATURE_ASCENDING
+            )
+        return self._units
+
+    def run(
+        self, symbol: str, vol_mult=1.0, vol24_mult=1.0, util_shift=0.0
+    ) -> pd.Series:
+        """Full scenario row for ``symbol``, as the Scenario Simulator shows it."""
+        return self.run_at(self.position(symbol), vol_mult, vol24_mult, util_shift)
+
+    def run_at(
+        self, pos: int, vol_mult=1.0, vol24_mult=1.0, util_shift=0.0
+    ) -> pd.Series:
+        """``run`` for the asset at row position ``pos`` (duplicate symbols)."""
+        features, (volume, pct_24h, pct_7d, util) = self.shocked_features(
+            pos, vol_mult, vol24_mult, util_shift, return_inputs=True
+        )
+        outputs = kernel.equilibrium_from_units(
+            self.unit_ranks(pos, features), self._price[pos]
+        )
+
+        row = self.df.iloc[pos].copy()
+        row[config.COL_TOTAL_VOLUME] = float(volume)
+        row[config.COL_PCT_CHANGE_24H] = float(pct_24h)
+        row[config.COL_PCT_CHANGE_7D] = float(pct_7d)
+        row[config.COL_SUPPLY_UTILIZATION] = float(util)
+        market_cap = self._inputs[config.COL_MARKET_CAP][pos]
+        row[config.COL_LIQUIDITY_RATIO] = (
+            float(volume / market_cap) if market_cap != 0 else np.nan
+        )
+        row[config.COL_VOLATILITY_24H] = abs(float(pct_24h))
+        row[config.COL_VOLATILITY_7D] = abs(float(pct_7d))
+        row[config.COL_SPECULATION_INDEX] = float(features[5])
+        for col, value in outputs.items():
+            row[col] = float(value)
+        return row
+
+
+class ScenarioCache:
+    """Bounded LRU memo of scenario results, safe to share between threads.
+
+    Keys come from ``key``: the snapshot fingerprint, the asset's row
+    position (symbols are not unique) and the three slider values, rounded
+    so that float noise in slider steps maps to the same entry. Cached
+    values are shared by every caller and must not be mutated.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        self.maxsize = maxsize if maxsize is not None else config.SCENARIO_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        fingerprint: str, pos: int, vol_mult=1.0, vol24_mult=1.0, util_shift=0.0
+    ) -> Tuple:
+        return (
+            fingerprint,
+            int(pos),
+            round(float(vol_mult), 9),
+            round(float(vol24_mult), 9),
+            round(float(util_shift), 9),
+        )
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value for ``key``, calling ``compute()`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        # Computed outside the lock; a concurrent miss on the same key just
+        # computes the same value twice
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
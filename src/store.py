@@ -0,0 +1,264 @@
+"""Layout of processed cache entries, readable without pandas or NumPy.
+
+Everything a warm lookup needs (cache key, file names, the symbol/id index
+and a single-row reader) lives here so that the CLI can answer it without
+importing the data stack; ``data_prep`` builds on it for everything else.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import cache, config
+from .params import DEFAULT_PARAMS, ModelParams
+
+# File holding the processed table inside a cache entry, per storage format
+# (config.PROCESSED_FORMAT)
+PROCESSED_FILES = {
+    "parquet": "equilibrium.parquet",
+    "feather": "equilibrium.arrow",
+}
+
+# Symbol-sorted copy of the processed table used for single-asset lookups,
+# with the case-folded symbol and the row position in the processed table
+LOOKUP_FILE = "lookup.parquet"
+LOOKUP_KEY_COL = "symbol_key"
+LOOKUP_ROW_COL = "row"
+
+# Symbol / id -> row offsets of the processed table (see AssetIndex)
+INDEX_FILE = "index.json"
+
+# Multi-resolution density tiles of the Market Map (see market_map.MapTiles)
+TILES_FILE = "map_tiles.npz"
+
+
+def processed_key(params: ModelParams = DEFAULT_PARAMS) -> str:
+    """Fingerprint of the processed artifact for the current raw file."""
+    return cache.fingerprint(config.DATA_RAW, params, layout=config.PROCESSED_FORMAT)
+
+
+def processed_path(entry: Path, fmt: Optional[str] = None) -> Path:
+    """Path of the processed table inside a cache entry."""
+    fmt = fmt or config.PROCESSED_FORMAT
+    try:
+        return entry / PROCESSED_FILES[fmt]
+    except KeyError:
+        raise ValueError(
+            f"Unknown processed format {fmt!r}; expected one of "
+            f"{sorted(PROCESSED_FILES)}."
+        ) from None
+
+
+def row_filters(
+    rank_range: Optional[Tuple[int, int]] = None,
+    min_tension: Optional[float] = None,
+) -> Optional[List[tuple]]:
+    """Row predicates (pandas/pyarrow form) for the common export filters."""
+    filters = []
+    if rank_range is not None:
+        lo, hi = rank_range
+        filters.append((config.COL_MARKET_CAP_RANK, ">=", lo))
+        filters.append((config.COL_MARKET_CAP_RANK, "<=", hi))
+    if min_tension is not None:
+        filters.append((config.COL_TENSION_SCORE, ">=", min_tension))
+    return filters or None
+
+
+def current_entry(params: ModelParams = DEFAULT_PARAMS) -> Optional[Path]:
+    """Cache entry of the current processed artifact, or None if not built."""
+    return cache.ProcessedCache().get(processed_key(params))
+
+
+@dataclass(frozen=True)
+class AssetIndex:
+    """Row offsets in the processed table by symbol and by id.
+
+    Keys are case-folded (symbols upper-cased as everywhere else, ids
+    lower-cased). Symbols are not unique in the source data, so every key
+    maps to the list of all matching offsets in table order; callers decide
+    what to do with more than one.
+    """
+
+    symbols: Dict[str, List[int]]
+    ids: Dict[str, List[int]]
+    n_rows: int
+
+    @classmethod
+    def build(cls, df) -> "AssetIndex":
+        """Index a processed DataFrame (rows in table order)."""
+
+        def offsets(keys) -> Dict[str, List[int]]:
+            groups = keys.groupby(keys.to_numpy(), sort=False)
+            return {key: pos.tolist() for key, pos in groups.indices.items()}
+
+        return cls(
+            symbols=offsets(df[config.COL_SYMBOL].astype(str).str.upper()),
+            ids=offsets(df[config.COL_ID].astype(str).str.lower()),
+            n_rows=len(df),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "AssetIndex":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls(symbols=data["symbols"], ids=data["ids"], n_rows=data["n_rows"])
+
+    def save(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"n_rows": self.n_rows, "symbols": self.symbols, "ids": self.ids},
+                fh,
+                separators=(",", ":"),
+            )
+
+    def by_symbol(self, symbol: str) -> List[int]:
+        """Offsets of every asset with this symbol (empty if unknown)."""
+        return self.symbols.get(symbol.upper(), [])
+
+    def by_id(self, asset_id: str) -> List[int]:
+        """Offsets of the asset(s) with this id (empty if unknown)."""
+        return self.ids.get(asset_id.lower(), [])
+
+
+@dataclass
+class Selection:
+    """Row offsets matched by a show query, in query order without repeats.
+
+    ``missing`` labels the keys that matched nothing (e.g. ``"Symbol xyz"``);
+    ``ambiguous`` maps the label of each symbol shared by several assets to
+    all of their offsets, of which only the first is selected.
+    """
+
+    offsets: List[int]
+    missing: List[str]
+    ambiguous: Dict[str, List[int]]
+
+
+def select(
+    asset_index: Optional[AssetIndex],
+    symbols: Sequence[str] = (),
+    ids: Sequence[str] = (),
+    indices: Sequence[int] = (),
+    rank_range: Optional[Tuple[int, int]] = None,
+    everything: bool = False,
+    table=None,
+) -> Selection:
+    """Resolve a show query to row offsets.
+
+    Ids, symbols and row indices are resolved with dict lookups in
+    ``asset_index``, then rows in ``rank_range`` (or every row with
+    ``everything``) are appended in table order; only those two need the
+    processed ``table`` (with at least the rank column).
+    """
+    n_rows = asset_index.n_rows
+    offsets: List[int] = []
+    missing: List[str] = []
+    ambiguous: Dict[str, List[int]] = {}
+    for label, matches in [(f"Id {k}", asset_index.by_id(k)) for k in ids] + [
+        (f"Symbol {k}", asset_index.by_symbol(k)) for k in symbols
+    ]:
+        if not matches:
+            missing.append(label)
+            continue
+        if len(matches) > 1:
+            ambiguous[label] = matches
+        offsets.append(matches[0])
+    for index in indices:
+        check_index(index, n_rows)
+        offsets.append(index)
+    if everything:
+        offsets.extend(range(n_rows))
+    elif rank_range is not None:
+        offsets.extend(rank_offsets(table, rank_range))
+    return Selection(list(dict.fromkeys(offsets)), missing, ambiguous)
+
+
+def rank_offsets(table, rank_range: Tuple[int, int]) -> List[int]:
+    """Offsets of the rows with ``lo <= market_cap_rank <= hi``, in table order."""
+    import pyarrow.compute as pc
+
+    lo, hi = rank_range
+    rank = table.column(config.COL_MARKET_CAP_RANK)
+    mask = pc.and_(pc.greater_equal(rank, lo), pc.less_equal(rank, hi))
+    return pc.indices_nonzero(mask.fill_null(False)).to_pylist()
+
+
+def read_table(
+    entry: Path, columns: Optional[Sequence[str]] = None, fmt: Optional[str] = None
+):
+    """The processed table as a pyarrow Table (memory-mapped for feather)."""
+    fmt = fmt or config.PROCESSED_FORMAT
+    path = processed_path(entry, fmt)
+    if fmt == "feather":
+        from pyarrow import feather as pa_feather
+
+        return pa_feather.read_table(path, columns=columns, memory_map=True)
+    from pyarrow import parquet as pq
+
+    # ParquetFile reads the single file directly; pq.read_table goes through
+    # pyarrow.dataset, whose import pulls in pandas
+    with pq.ParquetFile(path) as reader:
+        return reader.read(columns=columns)
+
+
+def rank_order(table, by: str, ascending: bool = False):
+    """Row offsets of ``table`` sorted on column ``by`` (stable, NaN/nulls last)."""
+    import pyarrow.compute as pc
+
+    if by not in table.column_names:
+        raise ValueError(f"Unknown column {by!r}.")
+    order = "ascending" if ascending else "descending"
+    return pc.sort_indices(table, sort_keys=[(by, order)])
+
+
+def take_rows(
+    table, offsets, columns: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """Rows ``offsets`` of ``table`` (restricted to ``columns``) as dicts."""
+    if len(offsets) == 0:
+        return []
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.take(offsets).to_pylist()
+
+
+def read_row(
+    entry: Path,
+    index: int,
+    columns: Optional[Sequence[str]] = None,
+    fmt: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Row ``index`` of the processed table as a plain dict.
+
+    Reads a single parquet row group (or slices the memory-mapped feather
+    table) with pyarrow only, so no pandas import is needed.
+    """
+    fmt = fmt or config.PROCESSED_FORMAT
+    path = processed_path(entry, fmt)
+    if fmt == "feather":
+        from pyarrow import feather as pa_feather
+
+        table = pa_feather.read_table(path, columns=columns, memory_map=True)
+        check_index(index, table.num_rows)
+        return table.slice(index, 1).to_pylist()[0]
+
+    from pyarrow import parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    meta = parquet.metadata
+    check_index(index, meta.num_rows)
+    start = 0
+    for group in range(meta.num_row_groups):
+        rows = meta.row_group(group).num_rows
+        if index < start + rows:
+            break
+        start += rows
+    table = parquet.read_row_group(group, columns=columns)
+    return table.slice(index - start, 1).to_pylist()[0]
+
+
+def check_index(index: int, n_rows: int) -> None:
+    if index < 0 or index >= n_rows:
+        raise IndexError(f"Index {index} out of range for dataset of size {n_rows}.")
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Make src (and the synthetic universes in benchmarks) importable
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import make_universe  # noqa: E402
+from src import equilibrium  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def market():
+    """Processed synthetic market (utilization in percent, like the snapshot)."""
+    return equilibrium.compute_equilibrium(
+        equilibrium.compute_engineered_features(make_universe(500, seed=1))
+    )
+
+
+@pytest.fixture(scope="session")
+def panel():
+    """Processed three-day panel of the synthetic market (raw snapshots too)."""
+    from src import config, data_prep
+
+    snapshots = []
+    for day in ("2025-12-01", "2025-12-02", "2025-12-03"):
+        raw = make_universe(600, seed=int(day[-1]))
+        raw[config.COL_LAST_UPDATED] = f"{day}T12:00:00.000Z"
+        raw.insert(0, config.COL_SNAPSHOT, day)
+        snapshots.append(raw)
+    df_raw = pd.concat(snapshots, ignore_index=True)
+    df = data_prep.clean_and_engineer(
+        df_raw, columnar=True, by=config.COL_SNAPSHOT
+    )
+    return df_raw, df
@@ -0,0 +1,49 @@
+import pytest
+
+from src import api
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"[1, 2]",
+        b'{"rank_range": 5}',
+        b'{"rank_range": [1]}',
+        b'{"indices": ["a"]}',
+        b'{"indices": [true]}',
+        b'{"symbols": "BTC"}',
+        b'{"all": 1}',
+    ],
+)
+def test_batch_query_rejects_malformed_bodies(body):
+    with pytest.raises(api.HttpError) as exc:
+        api.batch_query(body)
+    assert exc.value.status == 400
+
+
+def test_batch_query_defaults():
+    assert api.batch_query(b"") == {
+        "symbols": [],
+        "ids": [],
+        "indices": [],
+        "rank_range": None,
+        "everything": False,
+    }
+    assert api.batch_query(b'{"symbols": ["btc"], "rank_range": [1, 5]}')[
+        "rank_range"
+    ] == [1, 5]
+
+
+@pytest.mark.parametrize("value", ["nan", "NaN", "inf", "-Infinity"])
+def test_scenario_shocks_reject_non_finite(value):
+    with pytest.raises(api.HttpError) as exc:
+        api.scenario_shocks({"util_shift": value})
+    assert exc.value.status == 400
+
+
+def test_scenario_shocks_defaults():
+    assert api.scenario_shocks({"vol_mult": "2"}) == {
+        "vol_mult": 2.0,
+        "vol24_mult": 1.0,
+        "util_shift": 0.0,
+    }
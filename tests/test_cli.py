@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import pytest
+
+from src import data_prep
+from tests.conftest import ROOT
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        ["top-k", "--k", "3"],
+        ["top-k", "--by", "equilibrium_shift", "--ascending"],
+        ["show-equilibrium", "--symbol", "btc"],
+    ],
+)
+def test_warm_lookups_do_not_import_pandas(command):
+    data_prep.processed_entry()
+    script = (
+        "import sys\n"
+        "from src import cli\n"
+        f"sys.argv = ['cli', '--no-daemon', *{command!r}]\n"
+        "cli.main()\n"
+        "assert 'pandas' not in sys.modules, 'pandas was imported'\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
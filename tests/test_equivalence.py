@@ -0,0 +1,251 @@
+"""Fast paths must keep matching the reference pipeline they replace."""
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src import cli, config, daemon, data_prep, equilibrium, export, kernel, scenario
+
+OUTPUT_COLS = kernel.FORCE_COLS + scenario.COMPARE_COLS[len(kernel.FORCE_COLS) :]
+
+
+def assert_close(actual, expected, cols=OUTPUT_COLS):
+    for col in cols:
+        np.testing.assert_allclose(
+            np.asarray(actual[col], dtype=float),
+            np.asarray(expected[col], dtype=float),
+            rtol=1e-12,
+            atol=1e-12,
+            err_msg=col,
+        )
+
+
+def recompute(market, pos, vol_mult, vol24_mult, util_shift):
+    """Full pipeline rerun on a copy of ``market`` with one asset shocked."""
+    return recompute_market(market, pos, vol_mult, vol24_mult, util_shift).iloc[pos]
+
+
+def recompute_market(market, pos, vol_mult, vol24_mult, util_shift):
+    """The whole market rerun, with only the asset at ``pos`` shocked."""
+    shocked = market.copy()
+    row = shocked.index[pos]
+    inputs = [
+        config.COL_TOTAL_VOLUME,
+        config.COL_PCT_CHANGE_24H,
+        config.COL_PCT_CHANGE_7D,
+        config.COL_SUPPLY_UTILIZATION,
+    ]
+    values = scenario.apply_shocks(
+        *shocked.loc[row, inputs].to_numpy(dtype=float),
+        vol_mult,
+        vol24_mult,
+        util_shift,
+        scenario.utilization_max(market[config.COL_SUPPLY_UTILIZATION]),
+    )
+    shocked.loc[row, inputs] = [float(value) for value in values]
+    shocked = equilibrium.compute_engineered_features(shocked)
+    return equilibrium.compute_equilibrium(shocked)
+
+
+SHOCKS = [(1.0, 1.0, 0.0), (2.5, 0.4, -15.0), (0.0, 3.0, 80.0), (0.7, 1.0, -150.0)]
+
+
+def test_kernel_matches_pandas_pipeline(market):
+    features = market.drop(columns=OUTPUT_COLS)
+    # Ties, NaNs and a zero market cap go through the same fills and ranks
+    features.loc[features.index[:40], config.COL_PCT_CHANGE_7D] = 1.0
+    features.loc[features.index[40:60], config.COL_TOTAL_VOLUME] = np.nan
+    features.loc[features.index[60], config.COL_MARKET_CAP] = 0.0
+    features = equilibrium.compute_engineered_features(features)
+    assert_close(
+        kernel.compute_equilibrium(features),
+        equilibrium.compute_equilibrium(features),
+    )
+
+
+@pytest.mark.parametrize("shock", SHOCKS)
+def test_run_at_matches_full_recompute(market, shock):
+    engine = scenario.ScenarioEngine(market)
+    for pos in (0, 17, 250, len(market) - 1):
+        expected = recompute(market, pos, *shock)
+        row = engine.run_at(pos, *shock)
+        assert_close(row, expected, OUTPUT_COLS + kernel.FEATURE_COLS)
+
+
+def test_grid_matches_full_recompute(market):
+    engine = scenario.ScenarioEngine(market)
+    pos = 123
+    vol, volat, util = [0.0, 1.0, 3.0], [0.5, 2.0], [-200.0, 0.0, 35.0]
+    grid = engine.grid(market[config.COL_SYMBOL].iloc[pos], vol, volat, util)
+    for i, j, k in np.ndindex(grid.shift.shape):
+        expected = recompute(market, pos, vol[i], volat[j], util[k])
+        got = {
+            config.COL_EQ_SHIFT: grid.shift[i, j, k],
+            config.COL_EQ_CENTER: grid.center[i, j, k],
+            config.COL_EQ_LOWER: grid.lower[i, j, k],
+            config.COL_EQ_UPPER: grid.upper[i, j, k],
+            config.COL_TENSION_SCORE: grid.tension[i, j, k],
+        }
+        assert_close(got, expected, list(got))
+
+
+@pytest.mark.parametrize("shock", SHOCKS)
+def test_compare_matches_full_recompute(market, shock):
+    engine = scenario.ScenarioEngine(market)
+    positions = [3, 42, 42, 499]
+    compared = engine.compare(positions, *shock)
+    expected = pd.DataFrame([recompute(market, pos, *shock) for pos in positions])
+    shocked = compared[[col + scenario.SHOCKED_SUFFIX for col in OUTPUT_COLS]]
+    shocked.columns = OUTPUT_COLS
+    assert_close(shocked, expected)
+    assert_close(compared, market.iloc[positions])
+
+
+@pytest.mark.parametrize("shock", SHOCKS)
+def test_ripple_matches_full_rerank(market, shock):
+    engine = scenario.ScenarioEngine(market)
+    for pos in (0, 17, 250, len(market) - 1):
+        full = recompute_market(market, pos, *shock)
+        ripple = engine.ripple(pos, *shock)
+        shocked = ripple[[col + scenario.SHOCKED_SUFFIX for col in OUTPUT_COLS]]
+        shocked.columns = OUTPUT_COLS
+        assert_close(shocked, full.iloc[ripple.index])
+        assert_close(ripple, market.iloc[ripple.index])
+        # Every other asset keeps its base outputs
+        rest = np.setdiff1d(np.arange(len(market)), ripple.index)
+        assert_close(full.iloc[rest], market.iloc[rest])
+        if shock == SHOCKS[0]:
+            assert ripple.empty
+
+
+def test_rerank_matches_full_rank(market):
+    engine = scenario.ScenarioEngine(market)
+    features = kernel.pack_features(market)
+    base = kernel.rank_to_unit(features, ascending=kernel.FEATURE_ASCENDING)
+    for j, ascending in enumerate(kernel.FEATURE_ASCENDING):
+        column = features[:, j]
+        # Onto a tie, between values, past both ends, and back to itself
+        for pos, value in [
+            (5, column[9]),
+            (5, column.mean()),
+            (300, column.min() - 1.0),
+            (300, column.max() + 1.0),
+            (42, column[42]),
+        ]:
+            moved = column.copy()
+            moved[pos] = value
+            expected = kernel.rank_to_unit(moved, ascending=bool(ascending))
+            assets, units = engine.rerank(j, pos, value)
+            got = base[:, j].copy()
+            got[assets] = units
+            np.testing.assert_allclose(got, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_panel_matches_single_snapshots(panel):
+    df_raw, df = panel
+    for snapshot, raw in df_raw.groupby(config.COL_SNAPSHOT):
+        single = data_prep.clean_and_engineer(raw)
+        rows = df[df[config.COL_SNAPSHOT] == snapshot]
+        assert len(rows) == len(single)
+        assert_close(rows, single, OUTPUT_COLS + kernel.FEATURE_COLS)
+
+
+def test_identity_shock_reproduces_base(market):
+    engine = scenario.ScenarioEngine(market)
+    assert engine.util_max == 100.0
+    compared = engine.compare(np.arange(len(market)), 1.0, 1.0, 0.0)
+    for col in scenario.COMPARE_COLS:
+        np.testing.assert_allclose(
+            compared[col + scenario.SHOCKED_SUFFIX],
+            market[col].to_numpy(dtype=float),
+            rtol=1e-12,
+            atol=1e-12,
+            err_msg=col,
+        )
+    assert (compared[config.COL_EQ_CENTER] == market[config.COL_EQ_CENTER]).all()
+
+
+def test_compare_on_compact_frame_has_no_float32_noise(market):
+    engine = scenario.ScenarioEngine(data_prep.compact_frame(market))
+    compared = engine.compare(np.arange(len(market)))
+    for col in scenario.COMPARE_COLS:
+        base = compared[col].to_numpy()
+        assert base.dtype == np.float64
+        np.testing.assert_array_equal(compared[col + scenario.SHOCKED_SUFFIX], base)
+        np.testing.assert_allclose(base, market[col], rtol=1e-12, atol=1e-12)
+
+
+def test_ndjson_export_round_trips_exactly(market, tmp_path):
+    table = pa.Table.from_pandas(market, preserve_index=False)
+    out = tmp_path / "out.ndjson"
+    assert export.export(out, table=table, batch_rows=128) == len(market)
+    with open(out, encoding="utf-8") as fh:
+        exported = pd.DataFrame([json.loads(line) for line in fh])
+    for col in market.columns:
+        if market[col].dtype.kind == "f":
+            # Bit-exact, NaN written as null and read back as NaN
+            np.testing.assert_array_equal(
+                exported[col].to_numpy(dtype=float), market[col], err_msg=col
+            )
+        else:
+            assert exported[col].tolist() == market[col].tolist(), col
+
+
+@pytest.fixture(scope="module")
+def daemon_socket(tmp_path_factory):
+    """A query daemon over the current processed snapshot, in a thread."""
+    path = tmp_path_factory.mktemp("daemon") / "daemon.sock"
+    query_daemon = daemon.QueryDaemon()
+    query_daemon.current()
+    server = daemon._make_server(path, query_daemon)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # The CLI silently answers locally when no daemon replies
+    assert daemon.request({"op": "ping"}, path) is not None
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+def run_cli(capsys, *argv):
+    args = cli.build_parser().parse_args([str(arg) for arg in argv])
+    args.func(args)
+    return capsys.readouterr()
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        ["show-equilibrium", "--symbol", "BTC"],
+        ["show-equilibrium", "--symbol", "btc", "eth", "--id", "tether"],
+        ["show-equilibrium", "--index", "7", "--index", "8", "--format", "csv"],
+        ["show-equilibrium", "--rank-range", "90", "140", "--format", "csv"],
+        ["show-equilibrium", "--all", "--format", "json"],
+        ["top-k", "--by", "tension_score", "--k", "25"],
+        ["top-k", "--by", "equilibrium_shift", "--k", "10", "--ascending"],
+    ],
+)
+def test_daemon_output_matches_direct_cli(capsys, daemon_socket, command):
+    direct = run_cli(capsys, "--no-daemon", *command)
+    served = run_cli(capsys, "--daemon-socket", daemon_socket, *command)
+    assert served.out == direct.out
+    assert served.err == direct.err
+
+
+def test_daemon_export_matches_direct_export(capsys, daemon_socket, tmp_path):
+    command = ["export-equilibrium", "--rank-range", "1", "300", "--min-tension", "0"]
+    run_cli(capsys, "--no-daemon", *command, "--out", tmp_path / "direct.csv")
+    served = ["--daemon-socket", daemon_socket, *command]
+    run_cli(capsys, *served, "--out", tmp_path / "served.csv")
+    direct = (tmp_path / "direct.csv").read_bytes()
+    assert direct and (tmp_path / "served.csv").read_bytes() == direct
+
+
+def test_top_k_rejects_negative_k(daemon_socket):
+    with pytest.raises(ValueError, match="k must be >= 0"):
+        daemon.request({"op": "top-k", "by": "tension_score", "k": -2}, daemon_socket)
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(["top-k", "--k", "-2"])
@@ -0,0 +1,30 @@
+"""Partitioned panel store: writes, partition-filtered reads and export."""
+import pandas as pd
+from pyarrow import parquet as pq
+
+from src import config, data_prep, export, store
+
+
+def test_panel_export_reads_only_matching_partitions(panel, tmp_path):
+    _, df = panel
+    root = tmp_path / "panel"
+    data_prep.write_panel_partitions(df, root=root)
+
+    dates, rank_range = ("2025-12-02", "2025-12-03"), (1, 300)
+    filters = data_prep.panel_filters(dates, rank_range) + store.row_filters(
+        rank_range
+    )
+    dataset = data_prep.panel_dataset(root)
+    partitions = data_prep.panel_filters(dates, rank_range)
+    read = list(dataset.get_fragments(filter=pq.filters_to_expression(partitions)))
+    # Two days of the first two rank buckets, out of three days of three
+    assert len(read) == 4 < len(list(dataset.get_fragments()))
+
+    out = tmp_path / "slice.parquet"
+    rows = export.export(out, filters=filters, panel=root)
+    exported = pd.read_parquet(out).sort_values(
+        [config.COL_SNAPSHOT, config.COL_MARKET_CAP_RANK], ignore_index=True
+    )
+    expected = data_prep.load_panel(filters, root=root)
+    assert rows == len(expected) == 2 * 300
+    pd.testing.assert_frame_equal(exported, expected[exported.columns])